@@ -0,0 +1,148 @@
+"""replace comma-separated chore user lists with association tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-01-01 00:00:06.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# (association table, legacy comma-separated column on chores)
+LINK_COLUMNS = [
+    ("chore_assignees", "assigned_to_ids"),
+    ("chore_user_completions", "completed_by_ids"),
+]
+# Assignees keep the order the client listed them in
+ORDERED_TABLE = "chore_assignees"
+
+
+def _parse_ids(value):
+    """User ids in their stored order, without duplicates."""
+    if not value:
+        return []
+    return list(dict.fromkeys(int(x) for x in value.split(",") if x.strip()))
+
+
+def _create_link_table(name: str, *columns: sa.Column) -> None:
+    op.create_table(
+        name,
+        sa.Column("chore_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        *columns,
+        sa.ForeignKeyConstraint(["chore_id"], ["chores.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("chore_id", "user_id"),
+    )
+    op.create_index(f"ix_{name}_user_id_chore_id", name, ["user_id", "chore_id"])
+
+
+def upgrade() -> None:
+    for table, _ in LINK_COLUMNS:
+        columns = []
+        if table == ORDERED_TABLE:
+            columns.append(
+                sa.Column("position", sa.Integer(), nullable=False, server_default="0")
+            )
+        _create_link_table(table, *columns)
+
+    # Backfill from the comma-separated strings, walking chores by id in batches
+    conn = op.get_bind()
+    chores = sa.table(
+        "chores",
+        sa.column("id", sa.Integer),
+        sa.column("assigned_to_ids", sa.Text),
+        sa.column("completed_by_ids", sa.Text),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(chores.c.id, chores.c.assigned_to_ids, chores.c.completed_by_ids)
+            .where(chores.c.id > last_id)
+            .order_by(chores.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for table, column in LINK_COLUMNS:
+            links = []
+            for row in rows:
+                for position, user_id in enumerate(_parse_ids(getattr(row, column))):
+                    link = {"chore_id": row.id, "user_id": user_id}
+                    if table == ORDERED_TABLE:
+                        link["position"] = position
+                    links.append(link)
+            if links:
+                conn.execute(
+                    sa.table(table, *(sa.column(name) for name in links[0])).insert(),
+                    links,
+                )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table("chores") as batch_op:
+        batch_op.drop_column("assigned_to_ids")
+        batch_op.drop_column("completed_by_ids")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("chores") as batch_op:
+        batch_op.add_column(sa.Column("assigned_to_ids", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("completed_by_ids", sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    chores = sa.table(
+        "chores",
+        sa.column("id", sa.Integer),
+        sa.column("assigned_to_ids", sa.Text),
+        sa.column("completed_by_ids", sa.Text),
+    )
+    for table, column in LINK_COLUMNS:
+        links = sa.table(table, sa.column("chore_id"), sa.column("user_id"))
+        order = [links.c.chore_id, links.c.user_id]
+        if table == ORDERED_TABLE:
+            order.insert(1, sa.column("position"))
+        last_id = 0
+        while True:
+            chore_ids = (
+                conn.execute(
+                    sa.select(links.c.chore_id)
+                    .where(links.c.chore_id > last_id)
+                    .group_by(links.c.chore_id)
+                    .order_by(links.c.chore_id)
+                    .limit(BATCH_SIZE)
+                )
+                .scalars()
+                .all()
+            )
+            if not chore_ids:
+                break
+            grouped = {}
+            for chore_id, user_id in conn.execute(
+                sa.select(links.c.chore_id, links.c.user_id)
+                .where(links.c.chore_id.in_(chore_ids))
+                .order_by(*order)
+            ):
+                grouped.setdefault(chore_id, []).append(str(user_id))
+            for chore_id, user_ids in grouped.items():
+                conn.execute(
+                    chores.update()
+                    .where(chores.c.id == chore_id)
+                    .values({column: ",".join(user_ids)})
+                )
+            last_id = chore_ids[-1]
+
+    for table, _ in reversed(LINK_COLUMNS):
+        op.drop_index(f"ix_{table}_user_id_chore_id", table_name=table)
+        op.drop_table(table)
@@ -0,0 +1,57 @@
+"""add denormalized completion counters to chores
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-01-01 00:00:07.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "chores",
+        sa.Column("completion_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "chore_daily_counts",
+        sa.Column("chore_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["chore_id"], ["chores.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("chore_id", "day"),
+    )
+
+    # Seed the counters from the existing completion ledger
+    day = (
+        "date(completed_at)"
+        if op.get_bind().dialect.name == "sqlite"
+        else "CAST(completed_at AS DATE)"
+    )
+    op.execute(
+        "UPDATE chores SET completion_count = ("
+        "SELECT COUNT(*) FROM chore_completions "
+        "WHERE chore_completions.chore_id = chores.id)"
+    )
+    op.execute(
+        "INSERT INTO chore_daily_counts (chore_id, day, count) "
+        f"SELECT chore_id, {day}, COUNT(*) FROM chore_completions "
+        f"GROUP BY chore_id, {day}"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chore_daily_counts")
+    with op.batch_alter_table("chores") as batch_op:
+        batch_op.drop_column("completion_count")
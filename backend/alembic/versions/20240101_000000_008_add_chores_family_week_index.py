@@ -0,0 +1,31 @@
+"""add (family_id, week_start, id) index for chore listing
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-01-01 00:00:08.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backs the filtered, keyset-paginated chore list
+    op.create_index(
+        "ix_chores_family_id_week_start_id",
+        "chores",
+        ["family_id", "week_start", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chores_family_id_week_start_id", table_name="chores")
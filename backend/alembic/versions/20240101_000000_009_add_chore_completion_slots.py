@@ -0,0 +1,52 @@
+"""add unique completion slots to chore_completions
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-01-01 00:00:09.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("chore_completions") as batch_op:
+        batch_op.add_column(sa.Column("slot_day", sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column("slot", sa.Integer(), nullable=True))
+
+    # Number existing completions 1..n within each (chore, day)
+    day = (
+        "date(completed_at)"
+        if op.get_bind().dialect.name == "sqlite"
+        else "CAST(completed_at AS DATE)"
+    )
+    op.execute(f"UPDATE chore_completions SET slot_day = {day}")
+    op.execute(
+        "UPDATE chore_completions SET slot = ("
+        "SELECT COUNT(*) FROM chore_completions AS earlier "
+        "WHERE earlier.chore_id = chore_completions.chore_id "
+        "AND earlier.slot_day = chore_completions.slot_day "
+        "AND earlier.id <= chore_completions.id)"
+    )
+
+    with op.batch_alter_table("chore_completions") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_chore_completions_slot", ["chore_id", "slot_day", "slot"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("chore_completions") as batch_op:
+        batch_op.drop_constraint("uq_chore_completions_slot", type_="unique")
+        batch_op.drop_column("slot")
+        batch_op.drop_column("slot_day")
@@ -0,0 +1,34 @@
+"""add unique (parent_chore_id, week_start) index for weekly rollover
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-01-01 00:00:10.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Makes the weekly rollover idempotent per (template, week) and backs its
+    # "instance already exists" lookup. Templates have a NULL parent, which
+    # unique indexes treat as distinct.
+    op.create_index(
+        "uq_chores_parent_chore_id_week_start",
+        "chores",
+        ["parent_chore_id", "week_start"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_chores_parent_chore_id_week_start", table_name="chores")
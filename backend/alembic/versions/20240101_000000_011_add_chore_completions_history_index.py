@@ -0,0 +1,34 @@
+"""add (chore_id, completed_at, id) index for completion history
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-01-01 00:00:11.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backs the keyset-paginated, newest-first completion history
+    op.create_index(
+        "ix_chore_completions_chore_id_completed_at_id",
+        "chore_completions",
+        ["chore_id", "completed_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_chore_completions_chore_id_completed_at_id",
+        table_name="chore_completions",
+    )
@@ -0,0 +1,41 @@
+"""add pre-aggregated user_point_totals
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-01-01 00:00:12.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_point_totals",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total_points", sa.Integer(), nullable=False),
+        sa.Column("completed_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Seed the totals from the existing points ledger
+    op.execute(
+        "INSERT INTO user_point_totals (user_id, total_points, completed_count) "
+        "SELECT user_id, SUM(points), COUNT(chore_id) FROM points "
+        "WHERE user_id IS NOT NULL GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_point_totals")
@@ -0,0 +1,49 @@
+"""add daily_point_rollups and (user_id, awarded_at) index on points
+
+Revision ID: 013
+Revises: 012
+Create Date: 2024-01-01 00:00:13.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_point_rollups",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("completions", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+    op.create_index("ix_points_user_id_awarded_at", "points", ["user_id", "awarded_at"])
+
+    # Backfill from the existing points ledger
+    day = (
+        "date(awarded_at)"
+        if op.get_bind().dialect.name == "sqlite"
+        else "CAST(awarded_at AS DATE)"
+    )
+    op.execute(
+        "INSERT INTO daily_point_rollups (user_id, day, points, completions) "
+        f"SELECT user_id, {day}, SUM(points), COUNT(chore_id) FROM points "
+        f"WHERE user_id IS NOT NULL GROUP BY user_id, {day}"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_points_user_id_awarded_at", table_name="points")
+    op.drop_table("daily_point_rollups")
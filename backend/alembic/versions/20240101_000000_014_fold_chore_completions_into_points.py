@@ -0,0 +1,201 @@
+"""fold chore_completions into the points ledger
+
+Revision ID: 014
+Revises: 013
+Create Date: 2024-01-01 00:00:14.000000
+
+"""
+
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Completions and their duplicate points were written with separate utcnow()
+# calls, so they are paired by nearest timestamp within this tolerance
+MATCH_TOLERANCE = timedelta(seconds=5)
+
+points = sa.table(
+    "points",
+    sa.column("id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("chore_id", sa.Integer),
+    sa.column("points", sa.Integer),
+    sa.column("awarded_at", sa.DateTime),
+    sa.column("slot_day", sa.Date),
+    sa.column("slot", sa.Integer),
+)
+completions = sa.table(
+    "chore_completions",
+    sa.column("id", sa.Integer),
+    sa.column("chore_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("completed_at", sa.DateTime),
+    sa.column("points_awarded", sa.Integer),
+    sa.column("slot_day", sa.Date),
+    sa.column("slot", sa.Integer),
+)
+
+
+def _fold_batch(conn, rows) -> None:
+    """Tag each completion's duplicate point with its slot, or insert one."""
+    lo = min(row.completed_at for row in rows) - MATCH_TOLERANCE
+    hi = max(row.completed_at for row in rows) + MATCH_TOLERANCE
+    candidates = {}
+    for point in conn.execute(
+        sa.select(points.c.id, points.c.chore_id, points.c.user_id, points.c.awarded_at)
+        .where(
+            points.c.chore_id.in_({row.chore_id for row in rows}),
+            points.c.slot.is_(None),
+            points.c.awarded_at.between(lo, hi),
+        )
+        .order_by(points.c.id)
+    ):
+        candidates.setdefault((point.chore_id, point.user_id), []).append(point)
+
+    tagged, missing = [], []
+    for row in rows:
+        pool = candidates.get((row.chore_id, row.user_id), [])
+        best = min(
+            pool, key=lambda p: abs(p.awarded_at - row.completed_at), default=None
+        )
+        slot = {"slot_day": row.slot_day, "slot": row.slot}
+        if (
+            best is not None
+            and abs(best.awarded_at - row.completed_at) <= MATCH_TOLERANCE
+        ):
+            pool.remove(best)
+            tagged.append({"point_id": best.id, **slot})
+        else:
+            missing.append(
+                {
+                    "user_id": row.user_id,
+                    "chore_id": row.chore_id,
+                    "points": row.points_awarded,
+                    "awarded_at": row.completed_at,
+                    **slot,
+                }
+            )
+
+    if tagged:
+        conn.execute(
+            points.update()
+            .where(points.c.id == sa.bindparam("point_id"))
+            .values(slot_day=sa.bindparam("slot_day"), slot=sa.bindparam("slot")),
+            tagged,
+        )
+    if missing:
+        conn.execute(points.insert(), missing)
+
+
+def _rebuild_aggregates() -> None:
+    """Recompute the point aggregates, since folding may add points."""
+    day = (
+        "date(awarded_at)"
+        if op.get_bind().dialect.name == "sqlite"
+        else "CAST(awarded_at AS DATE)"
+    )
+    op.execute("DELETE FROM user_point_totals")
+    op.execute(
+        "INSERT INTO user_point_totals (user_id, total_points, completed_count) "
+        "SELECT user_id, SUM(points), COUNT(chore_id) FROM points "
+        "WHERE user_id IS NOT NULL GROUP BY user_id"
+    )
+    op.execute("DELETE FROM daily_point_rollups")
+    op.execute(
+        "INSERT INTO daily_point_rollups (user_id, day, points, completions) "
+        f"SELECT user_id, {day}, SUM(points), COUNT(chore_id) FROM points "
+        f"WHERE user_id IS NOT NULL GROUP BY user_id, {day}"
+    )
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("points") as batch_op:
+        batch_op.add_column(sa.Column("slot_day", sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column("slot", sa.Integer(), nullable=True))
+
+    # Walk the completions by id in batches, folding each into its point
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(completions)
+            .where(completions.c.id > last_id)
+            .order_by(completions.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        _fold_batch(conn, rows)
+        last_id = rows[-1].id
+
+    _rebuild_aggregates()
+
+    with op.batch_alter_table("points") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_points_slot", ["chore_id", "slot_day", "slot"]
+        )
+    op.create_index(
+        "ix_points_chore_id_awarded_at_id", "points", ["chore_id", "awarded_at", "id"]
+    )
+
+    op.drop_index(
+        "ix_chore_completions_chore_id_completed_at_id",
+        table_name="chore_completions",
+    )
+    op.drop_table("chore_completions")
+
+
+def downgrade() -> None:
+    op.create_table(
+        "chore_completions",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("chore_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=False),
+        sa.Column("points_awarded", sa.Integer(), nullable=False),
+        sa.Column("slot_day", sa.Date(), nullable=True),
+        sa.Column("slot", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["chore_id"], ["chores.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "chore_id", "slot_day", "slot", name="uq_chore_completions_slot"
+        ),
+    )
+    # The indexes from 004 and 011, which their downgrades drop again
+    op.create_index("ix_chore_completions_chore_id", "chore_completions", ["chore_id"])
+    op.create_index("ix_chore_completions_user_id", "chore_completions", ["user_id"])
+    op.create_index(
+        "ix_chore_completions_completed_at", "chore_completions", ["completed_at"]
+    )
+    op.create_index(
+        "ix_chore_completions_chore_id_completed_at_id",
+        "chore_completions",
+        ["chore_id", "completed_at", "id"],
+    )
+
+    # Completions keep their points rows, as before this migration
+    op.execute(
+        "INSERT INTO chore_completions "
+        "(chore_id, user_id, completed_at, points_awarded, slot_day, slot) "
+        "SELECT chore_id, user_id, COALESCE(awarded_at, CURRENT_TIMESTAMP), "
+        "points, slot_day, slot FROM points "
+        "WHERE slot_day IS NOT NULL ORDER BY id"
+    )
+
+    op.drop_index("ix_points_chore_id_awarded_at_id", table_name="points")
+    with op.batch_alter_table("points") as batch_op:
+        batch_op.drop_constraint("uq_points_slot", type_="unique")
+        batch_op.drop_column("slot")
+        batch_op.drop_column("slot_day")
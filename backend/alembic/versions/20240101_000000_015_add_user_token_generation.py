@@ -0,0 +1,32 @@
+"""add token_generation to users
+
+Revision ID: 015
+Revises: 014
+Create Date: 2024-01-01 00:00:15.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tokens carry the generation they were issued at; bumping it revokes them
+    op.add_column(
+        "users",
+        sa.Column("token_generation", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("token_generation")
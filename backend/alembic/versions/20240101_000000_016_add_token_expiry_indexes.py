@@ -0,0 +1,35 @@
+"""add expires_at indexes to qr_code_sessions and password_reset_tokens
+
+Revision ID: 016
+Revises: 015
+Create Date: 2024-01-01 00:00:16.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Back the reaper's batched deletes of expired rows
+    op.create_index(
+        "ix_qr_code_sessions_expires_at", "qr_code_sessions", ["expires_at"]
+    )
+    op.create_index(
+        "ix_password_reset_tokens_expires_at", "password_reset_tokens", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_password_reset_tokens_expires_at", table_name="password_reset_tokens"
+    )
+    op.drop_index("ix_qr_code_sessions_expires_at", table_name="qr_code_sessions")
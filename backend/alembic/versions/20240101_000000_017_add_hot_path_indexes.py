@@ -0,0 +1,53 @@
+"""add indexes for family-scoped events, users, goals and per-user chore points
+
+Revision ID: 017
+Revises: 016
+Create Date: 2024-01-01 00:00:17.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# chores (family_id, week_start) and points (user_id, awarded_at) already
+# exist from 008 and 013
+INDEXES = [
+    (
+        "ix_events_family_id_start_time_end_time",
+        "events",
+        ["family_id", "start_time", "end_time"],
+    ),
+    ("ix_users_family_id", "users", ["family_id"]),
+    ("ix_goals_family_id", "goals", ["family_id"]),
+    ("ix_points_chore_id_user_id", "points", ["chore_id", "user_id"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction on PostgreSQL,
+    # but it doesn't block writes to these tables while it builds
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
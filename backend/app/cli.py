@@ -0,0 +1,132 @@
+"""
+Maintenance commands for the Tapestry backend.
+
+Usage:
+    python -m app.cli reconcile-chore-counters
+    python -m app.cli reconcile-point-totals
+    python -m app.cli backfill-point-rollups
+    python -m app.cli rollover [--week YYYY-MM-DD]
+    python -m app.cli purge-expired
+"""
+
+import argparse
+import json
+import sys
+from datetime import date
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables before importing config
+load_dotenv()
+
+from .config import settings  # noqa: E402
+from .db.session import SessionLocal  # noqa: E402
+from .logging_config import setup_logging  # noqa: E402
+from .services.chore_counters import rebuild_completion_counters  # noqa: E402
+from .services.point_totals import (  # noqa: E402
+    rebuild_point_rollups,
+    rebuild_point_totals,
+)
+from .services.reaper import run_purge  # noqa: E402
+from .services.rollover import run_rollover  # noqa: E402
+
+
+def reconcile_chore_counters(args: argparse.Namespace) -> Dict[str, int]:
+    """Rebuild recurring chore completion counters from the ledger."""
+    db = SessionLocal()
+    try:
+        result = rebuild_completion_counters(db)
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def reconcile_point_totals(args: argparse.Namespace) -> Dict[str, int]:
+    """Repair per-user point totals that drifted from the points ledger."""
+    db = SessionLocal()
+    try:
+        result = rebuild_point_totals(db)
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def backfill_point_rollups(args: argparse.Namespace) -> Dict[str, int]:
+    """Rebuild the daily point rollups from the points ledger."""
+    db = SessionLocal()
+    try:
+        result = rebuild_point_rollups(db)
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def rollover(args: argparse.Namespace) -> Dict[str, int]:
+    """Materialize recurring chore instances for a week (default: next week)."""
+    return run_rollover(args.week)
+
+
+def purge_expired(args: argparse.Namespace) -> Dict[str, int]:
+    """Delete expired QR code sessions and password reset tokens."""
+    return run_purge()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli", description="Tapestry maintenance commands"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = subparsers.add_parser(
+        "reconcile-chore-counters",
+        help="Rebuild chore completion counters from the points ledger",
+    )
+    reconcile.set_defaults(handler=reconcile_chore_counters)
+
+    reconcile_points = subparsers.add_parser(
+        "reconcile-point-totals",
+        help="Detect and repair drift in user_point_totals",
+    )
+    reconcile_points.set_defaults(handler=reconcile_point_totals)
+
+    backfill_rollups = subparsers.add_parser(
+        "backfill-point-rollups",
+        help="Rebuild daily_point_rollups from the points table",
+    )
+    backfill_rollups.set_defaults(handler=backfill_point_rollups)
+
+    rollover_parser = subparsers.add_parser(
+        "rollover", help="Create next week's instances of recurring chores"
+    )
+    rollover_parser.add_argument(
+        "--week",
+        type=date.fromisoformat,
+        help="Any day of the week to materialize (default: next week)",
+    )
+    rollover_parser.set_defaults(handler=rollover)
+
+    purge = subparsers.add_parser(
+        "purge-expired",
+        help="Delete expired QR code sessions and password reset tokens",
+    )
+    purge.set_defaults(handler=purge_expired)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging(
+        level=settings.log_level, log_format=settings.log_format, app_name="tapestry"
+    )
+    result = args.handler(args)
+    print(json.dumps({"command": args.command, **result}, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -40,6 +40,22 @@ class Settings(BaseSettings):
     )
     db_pool_size: int = Field(default=5, description="Database connection pool size")
     db_max_overflow: int = Field(default=10, description="Max overflow connections")
+    sqlite_wal_enabled: bool = Field(
+        default=False,
+        description="SQLite in WAL mode with one writer and a pool of readers",
+    )
+    sqlite_reader_pool_size: int = Field(
+        default=4, description="Read-only SQLite connections in WAL mode"
+    )
+    sqlite_busy_timeout_ms: int = Field(
+        default=5000, description="How long SQLite waits on a lock before failing"
+    )
+    sqlite_cache_size_kib: int = Field(
+        default=65536, description="SQLite page cache per connection, in KiB"
+    )
+    sqlite_mmap_size_bytes: int = Field(
+        default=268435456, description="SQLite memory-mapped I/O size per connection"
+    )
 
     # Rate limiting
     rate_limit_enabled: bool = Field(default=True, description="Enable rate limiting")
@@ -50,6 +66,53 @@ class Settings(BaseSettings):
     log_level: str = Field(default="INFO", description="Logging level")
     log_format: str = Field(default="json", description="Log format (json or text)")
 
+    # Authentication
+    bcrypt_rounds: int = Field(
+        default=12, description="bcrypt cost; older hashes are upgraded on login"
+    )
+    password_hash_workers: int = Field(
+        default=2, description="Processes hashing passwords (0 hashes inline)"
+    )
+    password_hash_queue_limit: int = Field(
+        default=4,
+        description="Password hashes waiting beyond the workers; each one holds "
+        "a request thread, so keep the total well below the threadpool's 40",
+    )
+    principal_cache_enabled: bool = Field(
+        default=True, description="Cache authenticated users in process"
+    )
+    principal_cache_size: int = Field(
+        default=10000, description="Max cached authenticated users"
+    )
+    principal_cache_ttl_seconds: float = Field(
+        default=60, description="Seconds a cached authenticated user stays valid"
+    )
+
+    token_cache_enabled: bool = Field(
+        default=True, description="Cache verified JWT claims in process"
+    )
+    token_cache_size: int = Field(default=10000, description="Max cached JWTs")
+    token_cache_ttl_seconds: float = Field(
+        default=60,
+        description="Seconds before a cached JWT is checked against revocations again",
+    )
+
+    # Background jobs
+    rollover_enabled: bool = Field(
+        default=False,
+        description="Materialize next week's recurring chores on a schedule",
+    )
+    rollover_interval_seconds: int = Field(
+        default=3600, description="Seconds between weekly rollover runs"
+    )
+    reaper_enabled: bool = Field(
+        default=True,
+        description="Purge expired QR code sessions and reset tokens on a schedule",
+    )
+    reaper_interval_seconds: int = Field(
+        default=900, description="Seconds between purges of expired rows"
+    )
+
     # Security headers
     enable_security_headers: bool = Field(
         default=True, description="Enable security headers"
@@ -72,6 +135,13 @@ class Settings(BaseSettings):
             raise ValueError(f"log_level must be one of {allowed}")
         return v
 
+    @field_validator("bcrypt_rounds")
+    @classmethod
+    def validate_bcrypt_rounds(cls, v: int) -> int:
+        if not 4 <= v <= 31:
+            raise ValueError("bcrypt_rounds must be between 4 and 31")
+        return v
+
     @field_validator("secret_key")
     @classmethod
     def validate_secret_key(cls, v: str) -> str:
@@ -125,12 +195,32 @@ def get_settings() -> Settings:
             "  DATABASE_URL - Database connection URL (default: sqlite:///./data.db)",
             file=sys.stderr,
         )
+        print(
+            "  SQLITE_WAL_ENABLED - SQLite WAL mode with a reader pool (default: false)",
+            file=sys.stderr,
+        )
         print("  CORS_ORIGINS - Comma-separated allowed origins", file=sys.stderr)
         print(
             "  LOG_LEVEL - DEBUG, INFO, WARNING, ERROR, CRITICAL (default: INFO)",
             file=sys.stderr,
         )
         print("  LOG_FORMAT - json or text (default: json)", file=sys.stderr)
+        print(
+            "  BCRYPT_ROUNDS - bcrypt cost for new password hashes (default: 12)",
+            file=sys.stderr,
+        )
+        print(
+            "  PRINCIPAL_CACHE_ENABLED - Cache authenticated users (default: true)",
+            file=sys.stderr,
+        )
+        print(
+            "  ROLLOVER_ENABLED - Run the weekly chore rollover job (default: false)",
+            file=sys.stderr,
+        )
+        print(
+            "  REAPER_ENABLED - Purge expired login tokens in-process (default: true)",
+            file=sys.stderr,
+        )
         print(
             "  RATE_LIMIT_ENABLED - Enable rate limiting (default: true)",
             file=sys.stderr,
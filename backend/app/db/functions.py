@@ -0,0 +1,58 @@
+"""
+Portable SQL functions that compile differently on SQLite and PostgreSQL.
+"""
+
+from sqlalchemy import Date
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+
+def upsert(db: Session):
+    """Dialect-specific ``insert`` supporting ON CONFLICT for the session's bind."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return postgresql_insert
+
+
+class calendar_date(FunctionElement):
+    """Calendar date of a DATETIME expression, returned as a ``date``."""
+
+    type = Date()
+    inherit_cache = True
+    name = "calendar_date"
+
+
+@compiles(calendar_date)
+def _calendar_date_default(element, compiler, **kw):
+    return "CAST(%s AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(calendar_date, "sqlite")
+def _calendar_date_sqlite(element, compiler, **kw):
+    return "date(%s)" % compiler.process(element.clauses, **kw)
+
+
+class week_start_date(FunctionElement):
+    """Sunday starting the week of a DATETIME expression, as a ``date``."""
+
+    type = Date()
+    inherit_cache = True
+    name = "week_start_date"
+
+
+@compiles(week_start_date)
+def _week_start_date_default(element, compiler, **kw):
+    # date_trunc weeks start on Monday; shift by a day to start on Sunday
+    return (
+        "CAST(date_trunc('week', %s + interval '1 day') - interval '1 day' AS DATE)"
+        % (compiler.process(element.clauses, **kw))
+    )
+
+
+@compiles(week_start_date, "sqlite")
+def _week_start_date_sqlite(element, compiler, **kw):
+    value = compiler.process(element.clauses, **kw)
+    return "date(%s, '-' || strftime('%%w', %s) || ' days')" % (value, value)
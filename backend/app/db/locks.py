@@ -0,0 +1,48 @@
+"""
+Row locking for read-check-write sequences.
+
+PostgreSQL takes row-level ``SELECT ... FOR UPDATE`` locks, so only writers
+touching the same rows wait on each other. SQLite has no row locks; there the
+transaction is opened with ``BEGIN IMMEDIATE`` so concurrent writers queue on
+the busy timeout up front instead of failing when they try to upgrade a read
+lock mid-transaction.
+"""
+
+from typing import Iterable, List, Type, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .session import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+def begin_immediate(db: Session) -> None:
+    """Start a write transaction on SQLite unless one is already open."""
+    conn = db.connection()
+    if conn.dialect.name != "sqlite":
+        return
+    if not conn.connection.driver_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def lock_rows(db: Session, model: Type[ModelT], ids: Iterable[int]) -> List[ModelT]:
+    """
+    Lock rows by primary key for the rest of the transaction and reload them,
+    so checks made afterwards see the latest committed state.
+    Rows are locked in id order to avoid deadlocks between concurrent batches.
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        return []
+    begin_immediate(db)
+    return list(
+        db.execute(
+            select(model)
+            .where(model.id.in_(ids))
+            .order_by(model.id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).scalars()
+    )
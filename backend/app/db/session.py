@@ -1,11 +1,19 @@
 """
 Database session configuration with connection pooling support.
 Supports SQLite (development) and PostgreSQL (production).
+
+SQLite can also run in WAL mode (``SQLITE_WAL_ENABLED``) for small production
+deployments: one writer connection plus a pool of read-only connections, so
+reads no longer serialize behind writes. ``RoutingSession`` sends each
+statement to the right engine.
 """
 
 import logging
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from typing import List, Optional
+
+from sqlalchemy import Select, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
 from sqlalchemy.pool import QueuePool, StaticPool
 
 from ..config import settings
@@ -26,7 +34,10 @@ def create_database_engine():
     """
     database_url = settings.database_url
 
-    if settings.is_sqlite:
+    if settings.is_sqlite and sqlite_wal_mode():
+        logger.info("Using SQLite database in WAL mode")
+        engine = create_sqlite_engine(database_url, pool_size=1)
+    elif settings.is_sqlite:
         # SQLite configuration (development)
         logger.info("Using SQLite database")
         engine = create_engine(
@@ -64,11 +75,101 @@ def create_database_engine():
     return engine
 
 
+def sqlite_wal_mode() -> bool:
+    """WAL mode needs a database file; in-memory databases keep the default."""
+    return settings.sqlite_wal_enabled and ":memory:" not in settings.database_url
+
+
+def _sqlite_pragmas(read_only: bool) -> List[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_bytes}",
+        "PRAGMA foreign_keys=ON",
+    ]
+    if read_only:
+        return pragmas + ["PRAGMA query_only=ON"]
+    # journal_mode is stored in the file, so every later connection uses WAL
+    return ["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"] + pragmas
+
+
+def create_sqlite_engine(
+    database_url: str, pool_size: int, read_only: bool = False
+) -> Engine:
+    """A pooled SQLite engine in WAL mode; one connection makes a single writer."""
+    sqlite_engine = create_engine(
+        database_url,
+        echo=settings.debug,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+
+    @event.listens_for(sqlite_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in _sqlite_pragmas(read_only):
+            cursor.execute(pragma)
+        cursor.close()
+
+    return sqlite_engine
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the reader engine and everything else to the writer.
+    A transaction that has written stays on the writer, so it reads its own
+    uncommitted changes.
+    """
+
+    def __init__(self, *args, writer: Engine, reader: Optional[Engine], **kw):
+        super().__init__(*args, **kw)
+        self.writer = writer
+        self.reader = reader
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.reader is not None
+            and not self.wrote
+            and not self._flushing
+            and isinstance(clause, Select)
+        ):
+            return self.reader
+        self.wrote = True
+        return self.writer
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_routing(session: RoutingSession, transaction) -> None:
+    if transaction.parent is None:
+        session.wrote = False
+
+
 # Create engine instance
 engine = create_database_engine()
 
+# Read-only connections for WAL mode
+reader_engine: Optional[Engine] = None
+if settings.is_sqlite and sqlite_wal_mode():
+    reader_engine = create_sqlite_engine(
+        settings.database_url,
+        pool_size=settings.sqlite_reader_pool_size,
+        read_only=True,
+    )
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if reader_engine is not None:
+    SessionLocal = sessionmaker(
+        class_=RoutingSession,
+        writer=engine,
+        reader=reader_engine,
+        autocommit=False,
+        autoflush=False,
+    )
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 def get_db():
@@ -38,6 +38,11 @@ from .middleware import (  # noqa: E402
 # Import routers
 from .routers import auth, users, families, calendars, chores, points, goals  # noqa: E402
 from .db.session import engine, Base  # noqa: E402
+from .pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER  # noqa: E402
+from .tasks import start_background_jobs, stop_background_jobs  # noqa: E402
+from .services.passwords import password_hasher  # noqa: E402
+from .services.principal_cache import principal_cache  # noqa: E402
+from .services.token_cache import revoked_tokens, token_cache  # noqa: E402
 
 # Initialize rate limiter
 limiter = Limiter(
@@ -64,9 +69,13 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/verified")
 
+    background_jobs = start_background_jobs()
+
     yield
 
     # Shutdown
+    await stop_background_jobs(background_jobs)
+    password_hasher.shutdown()
     logger.info("Application shutting down")
 
 
@@ -120,6 +129,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             "detail": exc.detail,
             "request_id": get_request_id(),
         },
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -189,7 +199,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Request-ID"],
+    expose_headers=["X-Request-ID", NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 
@@ -215,6 +225,17 @@ def ready():
     return {"status": "ready"}
 
 
+# In-process counters (not rate limited)
+@app.get("/metricz", tags=["health"])
+def metrics():
+    """Counters of in-process caches and pools, per worker."""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "token_cache": {**token_cache.stats(), "revoked": len(revoked_tokens)},
+        "password_hashing": password_hasher.stats(),
+    }
+
+
 # API versioned routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
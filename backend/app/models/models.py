@@ -4,15 +4,29 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime
 from ..db.session import Base
 
 
+def _parse_ids(value: str | None) -> list[int]:
+    """Parse a comma-separated list of user IDs."""
+    if not value:
+        return []
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def _join_ids(ids: list[int]) -> str | None:
+    """Render user IDs as the comma-separated string exposed by the API."""
+    return ",".join(str(x) for x in ids) if ids else None
+
+
 class FamilyGroup(Base):
     __tablename__ = "family_groups"
 
@@ -40,6 +54,8 @@ class FamilyGroup(Base):
 
 class User(Base):
     __tablename__ = "users"
+    # Backs every family-scoped member listing and join
+    __table_args__ = (Index("ix_users_family_id", "family_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     family_id: Mapped[int | None] = mapped_column(ForeignKey("family_groups.id"))
@@ -50,6 +66,10 @@ class User(Base):
     profile_image_url: Mapped[str | None] = mapped_column(Text)
     icon_emoji: Mapped[str | None] = mapped_column(String)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Bumped to invalidate every token issued to the user so far
+    token_generation: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     family: Mapped["FamilyGroup"] = relationship("FamilyGroup", back_populates="users")
     events: Mapped[list["EventParticipant"]] = relationship(
@@ -63,6 +83,15 @@ class User(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    # Backs the week view: family_id = ? AND start_time < ? AND end_time > ?
+    __table_args__ = (
+        Index(
+            "ix_events_family_id_start_time_end_time",
+            "family_id",
+            "start_time",
+            "end_time",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("family_groups.id"))
@@ -97,6 +126,14 @@ class Chore(Base):
         CheckConstraint(
             "point_value BETWEEN 1 AND 10", name="chk_chore_points_between_1_10"
         ),
+        Index("ix_chores_family_id_week_start_id", "family_id", "week_start", "id"),
+        # One materialized instance per recurring template and week
+        Index(
+            "uq_chores_parent_chore_id_week_start",
+            "parent_chore_id",
+            "week_start",
+            unique=True,
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -108,18 +145,12 @@ class Chore(Base):
     assigned_to: Mapped[int | None] = mapped_column(
         ForeignKey("users.id")
     )  # Legacy single assignee
-    assigned_to_ids: Mapped[str | None] = mapped_column(
-        Text
-    )  # Comma-separated user IDs for multiple assignees
     is_group_chore: Mapped[bool] = mapped_column(
         Boolean, default=True
     )  # True = one completion for all, False = each person completes individually
     completed: Mapped[bool] = mapped_column(
         Boolean, default=False
     )  # For group chores or when all individuals complete
-    completed_by_ids: Mapped[str | None] = mapped_column(
-        Text
-    )  # For individual chores: comma-separated IDs of who completed
     week_start: Mapped[datetime] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -149,40 +180,181 @@ class Chore(Base):
     max_completions: Mapped[int | None] = mapped_column(
         Integer
     )  # max number of times this chore can be completed (for recurring chores)
+    completion_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )  # lifetime completions of a recurring chore, kept in step with the points ledger
 
     family: Mapped["FamilyGroup"] = relationship("FamilyGroup", back_populates="chores")
     assignee: Mapped["User"] = relationship("User", back_populates="chores_assigned")
     points: Mapped[list["Point"]] = relationship("Point", back_populates="chore")
+    assignee_links: Mapped[list["ChoreAssignee"]] = relationship(
+        "ChoreAssignee",
+        cascade="all, delete-orphan",
+        order_by="ChoreAssignee.position",
+        lazy="selectin",
+    )  # Multiple assignees
+    completion_links: Mapped[list["ChoreUserCompletion"]] = relationship(
+        "ChoreUserCompletion",
+        cascade="all, delete-orphan",
+        order_by="ChoreUserCompletion.user_id",
+        lazy="selectin",
+    )  # For individual chores: who has completed
+    daily_counts: Mapped[list["ChoreDailyCount"]] = relationship(
+        "ChoreDailyCount", back_populates="chore", cascade="all, delete-orphan"
+    )  # per-day completion counters for recurring chores
+    instances: Mapped[list["Chore"]] = relationship(
+        "Chore", cascade="all, delete-orphan"
+    )  # weekly rollover instances of a recurring template
+
+    @property
+    def assignee_ids(self) -> list[int]:
+        return [link.user_id for link in self.assignee_links]
+
+    @property
+    def completed_by_user_ids(self) -> list[int]:
+        return [link.user_id for link in self.completion_links]
+
+    @property
+    def assigned_to_ids(self) -> str | None:
+        return _join_ids(self.assignee_ids)
+
+    @assigned_to_ids.setter
+    def assigned_to_ids(self, value: str | None) -> None:
+        self.set_assignees(_parse_ids(value))
+
+    @property
+    def completed_by_ids(self) -> str | None:
+        return _join_ids(self.completed_by_user_ids)
+
+    @completed_by_ids.setter
+    def completed_by_ids(self, value: str | None) -> None:
+        self.set_completed_by(_parse_ids(value))
+
+    def set_assignees(self, user_ids: list[int]) -> None:
+        """Replace the assignees, keeping their order and unchanged links."""
+        keep = {link.user_id: link for link in self.assignee_links}
+        links = []
+        for position, uid in enumerate(dict.fromkeys(user_ids)):
+            link = keep.get(uid) or ChoreAssignee(user_id=uid)
+            link.position = position
+            links.append(link)
+        self.assignee_links = links
+
+    def set_completed_by(self, user_ids: list[int]) -> None:
+        """Replace the set of users who completed an individual chore."""
+        keep = {link.user_id: link for link in self.completion_links}
+        self.completion_links = [
+            keep.get(uid) or ChoreUserCompletion(user_id=uid)
+            for uid in sorted(set(user_ids))
+        ]
+
+
+class ChoreAssignee(Base):
+    __tablename__ = "chore_assignees"
+    __table_args__ = (
+        Index("ix_chore_assignees_user_id_chore_id", "user_id", "chore_id"),
+    )
 
+    chore_id: Mapped[int] = mapped_column(
+        ForeignKey("chores.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    position: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )  # order of the user in the chore's assigned_to_ids
 
-class ChoreCompletion(Base):
-    __tablename__ = "chore_completions"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    chore_id: Mapped[int] = mapped_column(ForeignKey("chores.id"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    completed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    points_awarded: Mapped[int] = mapped_column(Integer, nullable=False)
+class ChoreUserCompletion(Base):
+    __tablename__ = "chore_user_completions"
+    __table_args__ = (
+        Index("ix_chore_user_completions_user_id_chore_id", "user_id", "chore_id"),
+    )
+
+    chore_id: Mapped[int] = mapped_column(
+        ForeignKey("chores.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
 
-    chore: Mapped["Chore"] = relationship("Chore")
-    user: Mapped["User"] = relationship("User")
 
+class ChoreDailyCount(Base):
+    __tablename__ = "chore_daily_counts"
 
+    chore_id: Mapped[int] = mapped_column(
+        ForeignKey("chores.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    chore: Mapped["Chore"] = relationship("Chore", back_populates="daily_counts")
+
+
+class UserPointTotal(Base):
+    __tablename__ = "user_point_totals"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_points: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )  # points rows tied to a chore
+
+
+class DailyPointRollup(Base):
+    __tablename__ = "daily_point_rollups"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)  # date of awarded_at
+    points: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completions: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )  # points rows tied to a chore
+
+
+# The points ledger. Recurring chore completions are points rows with a
+# completion slot (slot_day/slot); manual awards and one-off chore points have none.
 class Point(Base):
     __tablename__ = "points"
+    __table_args__ = (
+        UniqueConstraint("chore_id", "slot_day", "slot", name="uq_points_slot"),
+        # Backs per-user recent history and awarded_at windows
+        Index("ix_points_user_id_awarded_at", "user_id", "awarded_at"),
+        # Backs the keyset-paginated completion history of a chore
+        Index("ix_points_chore_id_awarded_at_id", "chore_id", "awarded_at", "id"),
+        # Backs revoking one user's points for a chore
+        Index("ix_points_chore_id_user_id", "chore_id", "user_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     chore_id: Mapped[int | None] = mapped_column(ForeignKey("chores.id"))
     points: Mapped[int] = mapped_column(Integer, nullable=False)
     awarded_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    slot_day: Mapped[date | None] = mapped_column(
+        Date
+    )  # recurring completions: day the slot counts toward
+    slot: Mapped[int | None] = mapped_column(
+        Integer
+    )  # 1-based position within the day's recurrence_count slots
 
     user: Mapped["User"] = relationship("User", back_populates="points")
     chore: Mapped["Chore"] = relationship("Chore", back_populates="points")
 
+    @classmethod
+    def is_completion(cls):
+        """SQL criterion selecting recurring chore completions."""
+        return cls.slot_day.is_not(None)
+
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (Index("ix_goals_family_id", "family_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("family_groups.id"))
@@ -215,13 +387,24 @@ class PasswordResetToken(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     token: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
-    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     used: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     user: Mapped["User"] = relationship("User")
 
 
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    jti: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )  # the token's exp; the row is useless afterwards
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class QRCodeSession(Base):
     __tablename__ = "qr_code_sessions"
 
@@ -230,7 +413,7 @@ class QRCodeSession(Base):
         String, unique=True, nullable=False, index=True
     )
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
-    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     scanned: Mapped[bool] = mapped_column(Boolean, default=False)
     scanned_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
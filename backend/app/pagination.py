@@ -0,0 +1,41 @@
+"""
+Keyset pagination helpers.
+
+Cursors are opaque, URL-safe tokens encoding the sort key of the last row a
+client has seen. List endpoints keep returning plain JSON arrays and report
+the cursor for the next page in the ``X-Next-Cursor`` response header, and
+optionally the size of the whole collection in ``X-Total-Count``.
+"""
+
+import base64
+import json
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode sort-key values (JSON-serializable or dates) into a cursor."""
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, rejecting malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    """Expose the next page's cursor to the client, if there is one."""
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,13 +1,13 @@
 import logging
 import secrets
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
-import bcrypt
 
 from ..config import settings
 from ..db.session import get_db
@@ -25,6 +25,10 @@ from ..schemas.schemas import (
     QRCodeScanRequest,
     QRCodeStatusResponse,
 )
+from ..services.passwords import password_hasher
+from ..services.principal_cache import principal_cache
+from ..services.qr_waiters import qr_waiters, wait_for_scan
+from ..services.token_cache import revoked_tokens, token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -32,36 +36,25 @@ router = APIRouter()
 security = HTTPBearer()
 
 
-# Password hashing - use bcrypt directly to avoid passlib initialization issues
-def _truncate_password(password: str) -> bytes:
-    """Truncate password to 72 bytes (bcrypt limit)."""
-    password_bytes = password.encode("utf-8")
-    if len(password_bytes) > 72:
-        return password_bytes[:72]
-    return password_bytes
-
-
 # JWT settings from centralized configuration
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
+# Long-poll duration for QR code logins; clients wait again after a timeout
+QR_WAIT_SECONDS = 25
+QR_WAIT_MAX_SECONDS = 60
 
+
+# Password hashing runs on a bounded process pool and may raise 503 when busy
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
-    try:
-        plain_bytes = _truncate_password(plain_password)
-        hashed_bytes = hashed_password.encode("utf-8")
-        return bcrypt.checkpw(plain_bytes, hashed_bytes)
-    except Exception:
-        return False
+    """Verify a password against a bcrypt hash."""
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
-    password_bytes = _truncate_password(password)
-    salt = bcrypt.gensalt(rounds=12)
-    return bcrypt.hashpw(password_bytes, salt).decode("utf-8")
+    """Hash a password using bcrypt at the configured cost."""
+    return password_hasher.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -73,12 +66,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     # JWT exp field must be a Unix timestamp (integer), not a datetime object
     to_encode.update({"exp": int(expire.timestamp())})
+    # A unique id lets logout revoke this one token
+    to_encode.setdefault("jti", secrets.token_urlsafe(12))
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def decode_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
+def create_user_token(user: User) -> str:
+    """Access token for a user, valid until their token generation changes."""
+    return create_access_token(data={"sub": str(user.id), "gen": user.token_generation})
+
+
+def decode_token(token: str, db: Session) -> Optional[dict]:
+    """Decode and verify a JWT token, unless it has been revoked."""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = _load_token(db, token)
+    return _unless_revoked(payload)
+
+
+def _load_token(db: Session, token: str) -> Optional[dict]:
+    """Verify a token the cache missed and check the durable revocations."""
+    payload = _verify_token(token)
+    if payload is None or revoked_tokens.load(db, payload.get("jti")):
+        return None
+    token_cache.put(token, payload)
+    return payload
+
+
+def _unless_revoked(payload: Optional[dict]) -> Optional[dict]:
+    # Logouts handled by this process apply to cached tokens at once
+    if payload is None or revoked_tokens.is_revoked(payload.get("jti")):
+        return None
+    return payload
+
+
+def _verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -96,7 +119,11 @@ async def get_current_user(
 ) -> User:
     """Get the current authenticated user from the token."""
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = token_cache.get(token)
+    if payload is None:
+        # A miss reads the revocation table; keep it off the event loop
+        payload = await run_in_threadpool(_load_token, db, token)
+    payload = _unless_revoked(payload)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -122,7 +149,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.get(User, user_id)
+    user = principal_cache.cached(db, user_id)
+    if user is None:
+        # Only a cache miss touches the database; keep it off the event loop
+        user = await run_in_threadpool(principal_cache.load, db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -130,6 +160,14 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Tokens issued before the last password reset are no longer valid
+    if payload.get("gen", 0) != user.token_generation:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     return user
 
 
@@ -159,7 +197,7 @@ def signup(payload: SignupRequest, db: Session = Depends(get_db)):
     db.refresh(user)
 
     # Generate token
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_user_token(user)
     return Token(access_token=access_token)
 
 
@@ -180,11 +218,35 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
 
+    # Upgrade hashes made at an older cost now that the password is known
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password_hash = get_password_hash(payload.password)
+        db.commit()
+
     # Generate token
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_user_token(user)
     return Token(access_token=access_token)
 
 
+@router.post("/logout", response_model=Message)
+def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+):
+    """Revoke the presented token until it expires."""
+    payload = decode_token(credentials.credentials, db)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if payload.get("jti"):
+        revoked_tokens.revoke(db, payload["jti"], payload["exp"])
+        db.commit()
+    return Message(message="Logged out")
+
+
 @router.get("/me", response_model=UserOut)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current authenticated user information."""
@@ -204,6 +266,10 @@ def admin_login(payload: AdminLoginRequest, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin credentials"
         )
 
+    if password_hasher.needs_rehash(fam.admin_password_hash):
+        fam.admin_password_hash = get_password_hash(payload.admin_password)
+        db.commit()
+
     # Generate token with family admin subject
     access_token = create_access_token(data={"sub": f"family-admin:{fam.id}"})
     return Token(access_token=access_token)
@@ -268,8 +334,9 @@ def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db))
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    # Update password
+    # Update password and invalidate every token issued before the reset
     user.password_hash = get_password_hash(payload.new_password)
+    user.token_generation += 1
 
     # Mark token as used
     reset_token.used = True
@@ -356,13 +423,12 @@ def scan_qr_code(payload: QRCodeScanRequest, db: Session = Depends(get_db)):
     qr_session.user_id = payload.user_id
 
     db.commit()
+    qr_waiters.notify(payload.session_token)
 
     return Message(message="QR code scanned successfully")
 
 
-@router.get("/qr-code/status/{session_token}", response_model=QRCodeStatusResponse)
-def check_qr_code_status(session_token: str, db: Session = Depends(get_db)):
-    """Check the status of a QR code session (polling endpoint)."""
+def _qr_code_status(db: Session, session_token: str) -> QRCodeStatusResponse:
     qr_session = db.execute(
         select(QRCodeSession).where(QRCodeSession.session_token == session_token)
     ).scalar_one_or_none()
@@ -377,7 +443,46 @@ def check_qr_code_status(session_token: str, db: Session = Depends(get_db)):
     # Check if scanned
     if qr_session.scanned and qr_session.user_id:
         # Generate auth token for the user
-        access_token = create_access_token(data={"sub": str(qr_session.user_id)})
-        return QRCodeStatusResponse(status="scanned", access_token=access_token)
+        user = db.get(User, qr_session.user_id)
+        if user is None:
+            return QRCodeStatusResponse(status="expired")
+        return QRCodeStatusResponse(
+            status="scanned", access_token=create_user_token(user)
+        )
+
+    return QRCodeStatusResponse(status="pending", expires_at=qr_session.expires_at)
+
+
+@router.get("/qr-code/status/{session_token}", response_model=QRCodeStatusResponse)
+def check_qr_code_status(session_token: str, db: Session = Depends(get_db)):
+    """Check the status of a QR code session (polling endpoint)."""
+    return _qr_code_status(db, session_token)
 
-    return QRCodeStatusResponse(status="pending")
+
+@router.get("/qr-code/wait/{session_token}", response_model=QRCodeStatusResponse)
+async def wait_for_qr_code_scan(
+    session_token: str,
+    timeout: int = Query(QR_WAIT_SECONDS, ge=1, le=QR_WAIT_MAX_SECONDS),
+    db: Session = Depends(get_db),
+):
+    """
+    Long-poll a QR code session: returns as soon as it is scanned, or with
+    "pending" after ``timeout`` seconds, when the client should wait again.
+    """
+
+    def check() -> QRCodeStatusResponse:
+        result = _qr_code_status(db, session_token)
+        # Give the connection back to the pool while the request waits
+        db.commit()
+        return result
+
+    # Subscribe first, so a scan committing right after the check still wakes us
+    with qr_waiters.subscribe(session_token) as scanned:
+        result = await run_in_threadpool(check)
+        if result.status != "pending":
+            return result
+
+        remaining = (result.expires_at - datetime.utcnow()).total_seconds()
+        await wait_for_scan(scanned, max(min(timeout, remaining), 0))
+    # One check either way: a scan may have landed on another worker
+    return await run_in_threadpool(check)
@@ -1,71 +1,244 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from datetime import date, datetime
-from typing import List
+from typing import List, Optional
 
+from ..db.locks import lock_rows
 from ..db.session import get_db
-from ..models.models import Chore, Point, User, ChoreCompletion
+from ..pagination import (
+    TOTAL_COUNT_HEADER,
+    decode_cursor,
+    encode_cursor,
+    set_next_cursor,
+)
+from ..models.models import Chore, ChoreAssignee, Point, User
 from ..schemas.schemas import (
     ChoreCreate,
     ChoreOut,
     ChoreUpdate,
     Message,
     ChoreCompletionOut,
+    ChoreOccurrenceOut,
+    ChoreBatchCompleteRequest,
+    ChoreBatchCompleteResult,
 )
+from ..services.chore_completion import CompletionBatch, load_chores
+from ..services.chore_counters import recount_completions
+from ..services.chore_status import completed_today_clause, with_completed_today
+from ..services.point_totals import detach_points
+from ..services.recurrence import expand, week_start_of
+from ..services.rollover import superseded
 from .auth import get_current_user
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 100
+MAX_OCCURRENCE_WINDOW_DAYS = 366
+COMPLETION_STREAM_BATCH = 500
+# Fields whose change makes update_chore recount the completion counters
+SCHEDULE_FIELDS = frozenset(
+    {
+        "is_recurring",
+        "recurrence_type",
+        "recurrence_interval",
+        "recurrence_count",
+        "recurrence_days",
+        "recurrence_end_date",
+    }
+)
+
+
+def _commit_chore(db: Session) -> None:
+    """Commit a created or edited chore."""
+    try:
+        db.flush()
+    except IntegrityError:
+        # The unique (parent_chore_id, week_start) index: the rollover (or
+        # another client) already made this template's instance for the week
+        raise HTTPException(
+            status_code=409, detail="Template already has an instance that week"
+        )
+    db.commit()
+
 
 @router.get("/", response_model=List[ChoreOut])
 def list_chores(
+    response: Response,
+    week_start_from: Optional[date] = Query(
+        None,
+        description="Only chores whose week_start is on or after this date, "
+        "plus recurring chores still running then",
+    ),
+    week_start_to: Optional[date] = Query(
+        None, description="Only chores whose week_start is on or before this date"
+    ),
+    assignee_id: Optional[int] = Query(None, description="Only chores assigned to"),
+    is_recurring: Optional[bool] = Query(None),
+    completed: Optional[bool] = Query(
+        None, description="Only chores that are (not) done for today"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables paging)"
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the last page"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    List chores for the user's family, ordered by (week_start, id).
+    Supports filtering and keyset pagination; when more rows remain, the
+    cursor for the next page is returned in the X-Next-Cursor header.
+    A week_start range also returns recurring chores that overlap it;
+    templates with a rolled-over instance in the range are replaced by it.
+    Requires authentication.
+    """
+    if not current_user.family_id:
+        return []
+
+    # A rolled-over instance stands in for its template in its week
+    query = select(Chore).where(
+        Chore.family_id == current_user.family_id,
+        ~superseded(week_start_from, week_start_to),
+    )
+    if week_start_from is not None:
+        # A recurring chore anchored earlier still has occurrences from here on
+        query = query.where(
+            or_(
+                Chore.week_start >= week_start_from,
+                and_(
+                    Chore.is_recurring.is_(True),
+                    or_(
+                        Chore.recurrence_end_date.is_(None),
+                        Chore.recurrence_end_date >= week_start_from,
+                    ),
+                ),
+            )
+        )
+    if week_start_to is not None:
+        query = query.where(Chore.week_start <= week_start_to)
+    if assignee_id is not None:
+        assigned = select(ChoreAssignee.chore_id).where(
+            ChoreAssignee.user_id == assignee_id
+        )
+        query = query.where(
+            or_(Chore.id.in_(assigned), Chore.assigned_to == assignee_id)
+        )
+    if is_recurring is not None:
+        query = query.where(Chore.is_recurring.is_(is_recurring))
+    if completed is not None:
+        # Same rule as completed_today: recurring chores are done per day
+        done = completed_today_clause()
+        query = query.where(done if completed else ~done)
+    if cursor is not None:
+        last_week_start, last_id = decode_cursor(cursor, 2)
+        try:
+            after = (date.fromisoformat(last_week_start), int(last_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Chore.week_start, Chore.id) > tuple_(*after))
+
+    query = query.order_by(Chore.week_start, Chore.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = db.execute(query).scalars().all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].week_start, rows[-1].id))
+    return with_completed_today(db, rows)
+
+
+@router.get("/mine", response_model=List[ChoreOut])
+def list_my_chores(
     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
-    """List chores for the user's family. Requires authentication."""
+    """
+    List chores in the user's family that are assigned to the current user.
+    Templates that have rolled-over instances are listed as those instances.
+    """
     if not current_user.family_id:
         return []
+    assigned = select(ChoreAssignee.chore_id).where(
+        ChoreAssignee.user_id == current_user.id
+    )
     rows = (
-        db.execute(select(Chore).where(Chore.family_id == current_user.family_id))
+        db.execute(
+            select(Chore).where(
+                Chore.family_id == current_user.family_id,
+                ~superseded(),
+                or_(Chore.id.in_(assigned), Chore.assigned_to == current_user.id),
+            )
+        )
         .scalars()
         .all()
     )
-    
-    # Augment with completed_today status
-    today_start = datetime.combine(date.today(), datetime.min.time())
-    today_end = datetime.combine(date.today(), datetime.max.time())
+    return with_completed_today(db, rows)
 
-    results = []
-    for chore in rows:
-        # Default to existing completed status
-        is_completed_today = chore.completed
-
-        if chore.is_recurring:
-            # For recurring chores, check if completion limit is reached FOR TODAY
-            daily_limit = chore.recurrence_count if chore.recurrence_count else 1
-            
-            completions_today = (
-                db.query(ChoreCompletion)
-                .filter(
-                    ChoreCompletion.chore_id == chore.id,
-                    ChoreCompletion.completed_at >= today_start,
-                    ChoreCompletion.completed_at <= today_end
-                )
-                .count()
-            )
-            
-            if completions_today >= daily_limit:
-                is_completed_today = True
-            else:
-                is_completed_today = False
-        
-        # Create a temporary object with the extra field
-        # We use the Pydantic model's constructor to include the extra field
-        chore_dict = {c.name: getattr(chore, c.name) for c in chore.__table__.columns}
-        chore_dict["completed_today"] = is_completed_today
-        results.append(chore_dict)
 
-    return results
+@router.get("/occurrences", response_model=List[ChoreOccurrenceOut])
+def list_chore_occurrences(
+    start: date = Query(..., description="First day of the window"),
+    end: date = Query(..., description="Last day of the window (inclusive)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Expand the family's chores into dated occurrences for [start, end].
+    Recurring chores are expanded server-side with the recurrence engine; in
+    weeks that were rolled over, the instance's occurrences replace the
+    template's.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= MAX_OCCURRENCE_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Window must be shorter than {MAX_OCCURRENCE_WINDOW_DAYS} days",
+        )
+    if not current_user.family_id:
+        return []
+
+    chores = (
+        db.execute(
+            select(Chore).where(
+                Chore.family_id == current_user.family_id,
+                Chore.week_start <= end,
+                or_(
+                    Chore.week_start >= start,
+                    and_(
+                        Chore.is_recurring,
+                        or_(
+                            Chore.recurrence_end_date.is_(None),
+                            Chore.recurrence_end_date >= start,
+                        ),
+                    ),
+                ),
+            )
+        )
+        .scalars()
+        .all()
+    )
+    time_of_day = {c.id: c.recurrence_time_of_day for c in chores}
+    # Weeks covered by an instance (it covers the rest of its anchor's week)
+    rolled_over = {
+        (c.parent_chore_id, week_start_of(c.week_start))
+        for c in chores
+        if c.parent_chore_id is not None
+    }
+    return [
+        ChoreOccurrenceOut(
+            chore_id=occ.chore_id,
+            date=occ.day,
+            slots=occ.slots,
+            time_of_day=time_of_day[occ.chore_id],
+        )
+        for occ in expand(chores, start, end)
+        if (occ.chore_id, week_start_of(occ.day)) not in rolled_over
+    ]
 
 
 @router.post("/", response_model=ChoreOut)
@@ -111,7 +284,7 @@ def create_chore(
         max_completions=payload.max_completions,
     )
     db.add(chore)
-    db.commit()
+    _commit_chore(db)
     db.refresh(chore)
     return chore
 
@@ -137,9 +310,17 @@ def update_chore(
         pv = updates["point_value"]
         if pv is not None and (pv < 1 or pv > 10):
             raise HTTPException(status_code=400, detail="point_value must be 1..10")
+    rescheduled = not SCHEDULE_FIELDS.isdisjoint(updates)
+    if rescheduled:
+        # Hold the row so no completion lands between the recount and commit
+        lock_rows(db, Chore, [chore.id])
     for k, v in updates.items():
         setattr(chore, k, v)
-    db.commit()
+    if rescheduled:
+        # Slots from the old schedule may have been revoked or keyed
+        # differently since; count what the ledger actually holds
+        recount_completions(db, chore)
+    _commit_chore(db)
     db.refresh(chore)
     return chore
 
@@ -159,6 +340,10 @@ def delete_chore(
     if current_user.family_id != chore.family_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
+    # Points earned on the chore (and its rolled-over instances) are kept but
+    # no longer count as completions
+    chore_ids = [chore.id] + [instance.id for instance in chore.instances]
+    detach_points(db, Point.chore_id.in_(chore_ids))
     db.delete(chore)
     db.commit()
     return Message(message="deleted")
@@ -167,12 +352,22 @@ def delete_chore(
 @router.get("/{chore_id}/completions", response_model=List[ChoreCompletionOut])
 def get_chore_completions(
     chore_id: int,
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables paging)"
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the last page"),
+    format: str = Query(
+        "json", pattern="^(json|ndjson)$", description="ndjson streams one row per line"
+    ),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
     Get completion history for a chore (particularly useful for recurring chores).
-    Returns list of completions with user info and timestamps.
+    Returns completions with user info, newest first, with keyset pagination on
+    (completed_at, id). X-Total-Count carries the chore's lifetime completion
+    count. With format=ndjson the rows after the cursor are streamed instead.
     """
     chore = db.get(Chore, chore_id)
     if not chore:
@@ -182,25 +377,122 @@ def get_chore_completions(
     if current_user.family_id != chore.family_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    completions = (
-        db.query(ChoreCompletion, User)
-        .join(User, ChoreCompletion.user_id == User.id)
-        .filter(ChoreCompletion.chore_id == chore_id)
-        .order_by(ChoreCompletion.completed_at.desc())
-        .all()
+    query = (
+        select(
+            Point.id,
+            Point.user_id,
+            User.name.label("user_name"),
+            User.icon_emoji.label("user_emoji"),
+            Point.awarded_at.label("completed_at"),
+            Point.points.label("points_awarded"),
+        )
+        .join(User, Point.user_id == User.id)
+        .where(Point.chore_id == chore_id, Point.is_completion())
     )
+    if cursor is not None:
+        last_completed_at, last_id = decode_cursor(cursor, 2)
+        try:
+            before = (datetime.fromisoformat(last_completed_at), int(last_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Point.awarded_at, Point.id) < tuple_(*before))
+    query = query.order_by(Point.awarded_at.desc(), Point.id.desc())
+
+    # The denormalized lifetime counter stands in for a COUNT over the ledger
+    total = {TOTAL_COUNT_HEADER: str(chore.completion_count)}
+
+    if format == "ndjson":
+        if limit is not None:
+            query = query.limit(limit)
+        rows = db.execute(query.execution_options(yield_per=COMPLETION_STREAM_BATCH))
+
+        # The session stays open while this streams: since FastAPI 0.118,
+        # yield dependencies are closed after the response is sent
+        def stream():
+            for row in rows:
+                yield ChoreCompletionOut.model_validate(row).model_dump_json() + "\n"
+
+        return StreamingResponse(
+            stream(), media_type="application/x-ndjson", headers=total
+        )
 
-    return [
-        ChoreCompletionOut(
-            id=completion.id,
-            user_id=completion.user_id,
-            user_name=user.name,
-            user_emoji=user.icon_emoji,
-            completed_at=completion.completed_at,
-            points_awarded=completion.points_awarded,
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = db.execute(query).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].completed_at, rows[-1].id))
+    response.headers.update(total)
+    return [ChoreCompletionOut.model_validate(row) for row in rows]
+
+
+@router.post("/complete-batch", response_model=List[ChoreBatchCompleteResult])
+def complete_chores_batch(
+    payload: ChoreBatchCompleteRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Complete many chores in one transaction, e.g. when a parent confirms a
+    child's checklist. Each item follows the same rules as
+    POST /{chore_id}/complete and may name the family member it is for.
+    Items that fail are reported individually; the rest are committed.
+    """
+    if len(payload.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BATCH_SIZE} items per batch"
         )
-        for completion, user in completions
-    ]
+
+    chores = load_chores(db, [item.chore_id for item in payload.items])
+    user_ids = {item.user_id for item in payload.items if item.user_id is not None}
+    family_user_ids = set()
+    if user_ids and current_user.family_id:
+        family_user_ids = set(
+            db.execute(
+                select(User.id).where(
+                    User.id.in_(user_ids), User.family_id == current_user.family_id
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    batch = CompletionBatch(db, list(chores.values()))
+    results = []
+    for item in payload.items:
+        user_id = item.user_id if item.user_id is not None else current_user.id
+        chore = chores.get(item.chore_id)
+        try:
+            if not chore:
+                raise HTTPException(status_code=404, detail="Chore not found")
+            if current_user.family_id != chore.family_id:
+                raise HTTPException(status_code=403, detail="Access denied")
+            if user_id != current_user.id and user_id not in family_user_ids:
+                raise HTTPException(status_code=403, detail="User not in family")
+            batch.complete(chore, user_id)
+        except HTTPException as exc:
+            result = ChoreBatchCompleteResult(
+                chore_id=item.chore_id,
+                user_id=user_id,
+                ok=False,
+                status_code=exc.status_code,
+                detail=exc.detail,
+            )
+        else:
+            # Snapshot now: a chore can appear more than once in a batch and
+            # each item reports the state its own completion left behind
+            result = ChoreBatchCompleteResult(
+                chore_id=item.chore_id,
+                user_id=user_id,
+                ok=True,
+                status_code=200,
+                chore=ChoreOut.model_validate(chore),
+            )
+        results.append(result)
+    batch.flush()
+
+    db.commit()
+    return results
 
 
 @router.post("/{chore_id}/complete", response_model=ChoreOut)
@@ -223,159 +515,9 @@ def complete_chore(
     if current_user.family_id != chore.family_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Get all assignee IDs
-    assignee_ids = []
-    if chore.assigned_to_ids:
-        assignee_ids = [int(x) for x in chore.assigned_to_ids.split(",") if x.strip()]
-    elif chore.assigned_to:
-        assignee_ids = [chore.assigned_to]
-
-    # RECURRING CHORE: Create a completion record if under max limit
-    if chore.is_recurring:
-        # Check completion count for TODAY (if daily recurrence)
-        # This prevents spamming completions on the same day if recurrence_count is limited
-        today_start = datetime.combine(date.today(), datetime.min.time())
-        today_end = datetime.combine(date.today(), datetime.max.time())
-        
-        completions_today = (
-            db.query(ChoreCompletion)
-            .filter(
-                ChoreCompletion.chore_id == chore_id,
-                ChoreCompletion.completed_at >= today_start,
-                ChoreCompletion.completed_at <= today_end
-            )
-            .count()
-        )
-        
-        # If it's a daily chore, respect the daily limit (default to 1 if not specified)
-        # recurrence_count handles "2x per day" etc.
-        daily_limit = chore.recurrence_count if chore.recurrence_count else 1
-        
-        if completions_today >= daily_limit:
-             raise HTTPException(
-                status_code=400,
-                detail=f"Daily completion limit reached ({daily_limit}). Come back tomorrow!",
-            )
-
-        # Check total completion count (overall limit)
-        current_completions = (
-            db.query(ChoreCompletion)
-            .filter(ChoreCompletion.chore_id == chore_id)
-            .count()
-        )
-
-        # Check if max completions reached
-        if (
-            chore.max_completions is not None
-            and current_completions >= chore.max_completions
-        ):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Maximum completions reached ({chore.max_completions}). This chore cannot be completed again.",
-            )
-
-        # Create a completion record for the current user
-        completion = ChoreCompletion(
-            chore_id=chore_id,
-            user_id=current_user.id,
-            completed_at=datetime.utcnow(),
-            points_awarded=chore.point_value,
-        )
-        db.add(completion)
-
-        # Also add to Points table for leaderboard compatibility
-        point = Point(
-            user_id=current_user.id,
-            chore_id=chore_id,
-            points=chore.point_value,
-            awarded_at=datetime.utcnow(),
-        )
-        db.add(point)
-
-        # Check if we've now hit the max - if so, mark as completed
-        new_completion_count = current_completions + 1
-        if (
-            chore.max_completions is not None
-            and new_completion_count >= chore.max_completions
-        ):
-            chore.completed = True
-        else:
-            chore.completed = False
-
-        db.commit()
-        db.refresh(chore)
-        return chore
-
-    # NON-RECURRING CHORE LOGIC (existing behavior)
-    if chore.is_group_chore:
-        # GROUP CHORE: Toggle completion for everyone
-        chore.completed = not chore.completed
-
-        if chore.completed:
-            # Award points to all assignees (or current user if unassigned)
-            users_to_award = assignee_ids if assignee_ids else [current_user.id]
-            for user_id in users_to_award:
-                existing_point = (
-                    db.query(Point)
-                    .filter(Point.chore_id == chore_id, Point.user_id == user_id)
-                    .first()
-                )
-                if not existing_point:
-                    point = Point(
-                        user_id=user_id,
-                        chore_id=chore_id,
-                        points=chore.point_value,
-                        awarded_at=datetime.utcnow(),
-                    )
-                    db.add(point)
-        else:
-            # Remove points when uncompleting
-            db.query(Point).filter(Point.chore_id == chore_id).delete()
-    else:
-        # INDIVIDUAL CHORE: Toggle completion for current user only
-        completed_ids = set()
-        if chore.completed_by_ids:
-            completed_ids = set(
-                int(x) for x in chore.completed_by_ids.split(",") if x.strip()
-            )
-
-        user_id = current_user.id
-
-        if user_id in completed_ids:
-            # User is uncompleting their part
-            completed_ids.discard(user_id)
-            # Remove their points
-            db.query(Point).filter(
-                Point.chore_id == chore_id, Point.user_id == user_id
-            ).delete()
-        else:
-            # User is completing their part
-            completed_ids.add(user_id)
-            # Award points to this user
-            existing_point = (
-                db.query(Point)
-                .filter(Point.chore_id == chore_id, Point.user_id == user_id)
-                .first()
-            )
-            if not existing_point:
-                point = Point(
-                    user_id=user_id,
-                    chore_id=chore_id,
-                    points=chore.point_value,
-                    awarded_at=datetime.utcnow(),
-                )
-                db.add(point)
-
-        # Update completed_by_ids
-        chore.completed_by_ids = (
-            ",".join(str(x) for x in sorted(completed_ids)) if completed_ids else None
-        )
-
-        # Mark fully complete if all assignees have completed (or if unassigned)
-        if assignee_ids:
-            chore.completed = all(aid in completed_ids for aid in assignee_ids)
-        else:
-            chore.completed = len(completed_ids) > 0
+    batch = CompletionBatch(db, [chore])
+    batch.complete(chore, current_user.id)
+    batch.flush()
 
     db.commit()
     db.refresh(chore)
@@ -6,7 +6,8 @@ from datetime import datetime
 
 from ..db.session import get_db
 from ..models.models import Goal, User
-from ..schemas.schemas import GoalCreate, GoalUpdate, GoalOut
+from ..schemas.schemas import GoalCreate, GoalUpdate, GoalOut, GoalProgressOut
+from ..services.goal_progress import family_goal_progress
 from .auth import get_current_user
 
 router = APIRouter()
@@ -26,6 +27,20 @@ def list_goals(
     )
 
 
+@router.get("/progress", response_model=List[GoalProgressOut])
+def get_goal_progress(
+    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+):
+    """
+    Progress of every family member towards every family goal, with a
+    projected completion date based on their last four weeks of points.
+    Requires authentication.
+    """
+    if not current_user.family_id:
+        return []
+    return family_goal_progress(db, current_user.family_id)
+
+
 @router.post("/", response_model=GoalOut)
 def create_goal(
     payload: GoalCreate,
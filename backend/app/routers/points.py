@@ -1,32 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 from ..db.session import get_db
 from ..models.models import Point, User, Chore
-from ..schemas.schemas import PointCreate, PointOut, LeaderboardEntry, CompletedChoreOut
+from ..pagination import decode_cursor, encode_cursor, set_next_cursor
+from ..schemas.schemas import (
+    PointCreate,
+    PointOut,
+    LeaderboardEntry,
+    PointAggregateOut,
+)
+from ..services.ledger import aggregate_family_points, export_csv, family_points
+from ..services.leaderboard import build_leaderboard, resolve_window
+from ..services.point_totals import add_to_totals
 from .auth import get_current_user
 
 router = APIRouter()
 
+DEFAULT_RECENT_LIMIT = 20
+MAX_RECENT_LIMIT = 100
+MAX_PAGE_SIZE = 500
+
 
 @router.get("/", response_model=List[PointOut])
 def list_points(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables paging)"
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the last page"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    """List points for the user's family. Requires authentication."""
+    """
+    List points for the user's family, ordered by id. Requires authentication.
+    Pass limit to page through the ledger; the next page's cursor is returned
+    in the X-Next-Cursor header.
+    """
     if not current_user.family_id:
         return []
-    # Get points for users in the same family
-    family_users = (
-        db.execute(select(User.id).where(User.family_id == current_user.family_id))
-        .scalars()
-        .all()
-    )
-    return (
-        db.execute(select(Point).where(Point.user_id.in_(family_users))).scalars().all()
+    query = family_points(current_user.family_id)
+    if cursor is not None:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(Point.id > last_id)
+    query = query.order_by(Point.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = db.execute(query).scalars().all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].id))
+    return rows
+
+
+@router.get("/aggregate", response_model=List[PointAggregateOut])
+def aggregate_points(
+    group_by: str = Query(..., pattern="^(user|day|week|chore)$"),
+    from_: Optional[date] = Query(None, alias="from", description="First day"),
+    to: Optional[date] = Query(None, description="Last day (inclusive)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Sum the family's points per user, day, week (starting Sunday) or chore,
+    optionally within [from, to]. Requires authentication.
+    """
+    if from_ and to and to < from_:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    if not current_user.family_id:
+        return []
+    return aggregate_family_points(db, current_user.family_id, group_by, from_, to)
+
+
+@router.get("/export")
+def export_points(
+    ledger: str = Query("points", pattern="^(points|completions)$"),
+    from_: Optional[date] = Query(None, alias="from", description="First day"),
+    to: Optional[date] = Query(None, description="Last day (inclusive)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Download the family's points or chore completion history as CSV,
+    optionally within [from, to]. Rows are streamed as they are read.
+    Requires authentication.
+    """
+    if from_ and to and to < from_:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="User must belong to a family")
+    return StreamingResponse(
+        export_csv(db, current_user.family_id, ledger, from_, to),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="tapestry-{ledger}.csv"'
+        },
     )
 
 
@@ -61,6 +135,8 @@ def add_points(
         awarded_at=datetime.utcnow(),
     )
     db.add(p)
+    db.flush()
+    add_to_totals(db, [p])
     db.commit()
     db.refresh(p)
     return p
@@ -68,61 +144,29 @@ def add_points(
 
 @router.get("/leaderboard", response_model=List[LeaderboardEntry])
 def get_leaderboard(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    window: str = Query(
+        "all",
+        pattern="^(all|week|month|custom)$",
+        description="all, the current week or month, or a custom start/end",
+    ),
+    start: Optional[date] = Query(None, description="First day of a custom window"),
+    end: Optional[date] = Query(None, description="Last day of a custom window"),
+    recent_limit: int = Query(
+        DEFAULT_RECENT_LIMIT,
+        ge=0,
+        le=MAX_RECENT_LIMIT,
+        description="Most recent completed chores to include per user",
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """
-    Get leaderboard with users' total points and completed chores.
-    Returns users sorted by total points (descending).
+    Get leaderboard with users' points and recently completed chores for a
+    window (all time by default).
+    Returns users sorted by points (descending).
     Requires authentication and returns only users from the same family.
     """
+    period = resolve_window(window, start, end)
     if not current_user.family_id:
         return []
-
-    # Get all users in the same family with their total points
-    users_with_points = (
-        db.query(
-            User.id,
-            User.name,
-            User.icon_emoji,
-            func.coalesce(func.sum(Point.points), 0).label("total_points"),
-        )
-        .outerjoin(Point, User.id == Point.user_id)
-        .filter(User.family_id == current_user.family_id)
-        .group_by(User.id, User.name, User.icon_emoji)
-        .order_by(func.coalesce(func.sum(Point.points), 0).desc())
-        .all()
-    )
-
-    leaderboard = []
-    for user_id, name, icon_emoji, total_points in users_with_points:
-        # Get all completed chores for this user (points with chore_id)
-        points_with_chores = (
-            db.query(Point, Chore)
-            .join(Chore, Point.chore_id == Chore.id)
-            .filter(Point.user_id == user_id)
-            .order_by(Point.awarded_at.desc())
-            .all()
-        )
-
-        completed_chores = [
-            CompletedChoreOut(
-                id=point.id,  # Use Point.id for unique keys (same chore can be completed multiple times)
-                title=chore.title,
-                emoji=chore.emoji,
-                point_value=point.points,
-                awarded_at=point.awarded_at,
-            )
-            for point, chore in points_with_chores
-        ]
-
-        leaderboard.append(
-            LeaderboardEntry(
-                user_id=user_id,
-                name=name,
-                icon_emoji=icon_emoji,
-                total_points=int(total_points),
-                completed_chores=completed_chores,
-            )
-        )
-
-    return leaderboard
+    return build_leaderboard(db, current_user.family_id, recent_limit, period)
@@ -2,15 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..db.session import get_db
 from ..models.models import User, FamilyGroup
-from ..schemas.schemas import UserCreate, UserOut, UserUpdate
+from ..schemas.schemas import UserBulkCreate, UserCreate, UserOut, UserUpdate
+from ..services.passwords import UNUSABLE_PASSWORD, password_hasher
 from typing import List
 from datetime import datetime
 from sqlalchemy import select
 from .auth import get_current_user, get_password_hash
-import secrets
 
 router = APIRouter()
 
+MAX_BULK_USERS = 500
+
 
 @router.post("/", response_model=UserOut)
 def create_user(
@@ -56,13 +58,9 @@ def create_user(
             status_code=404, detail=f"Family with id {family_id} not found"
         )
 
-    # For children, use a placeholder password hash (they can't log in)
-    # For parents, use the provided password
+    # Children can't log in, so they get an unusable password instead of a hash
     if payload.role == "child":
-        # Generate a random password hash that will never be used for login
-        # This satisfies the database constraint but ensures children can't authenticate
-        placeholder_password = secrets.token_urlsafe(32)
-        password_hash = get_password_hash(placeholder_password)
+        password_hash = UNUSABLE_PASSWORD
     else:
         password_hash = get_password_hash(payload.password)
 
@@ -82,6 +80,79 @@ def create_user(
     return user
 
 
+@router.post("/bulk", response_model=List[UserOut])
+def create_users_bulk(
+    payload: UserBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Create many members of the current user's family in one transaction."""
+    members = payload.users
+    if not members:
+        return []
+    if len(members) > MAX_BULK_USERS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BULK_USERS} users per request"
+        )
+    if not current_user.family_id:
+        raise HTTPException(
+            status_code=400, detail="You must belong to a family to add members"
+        )
+    if any(
+        m.family_id is not None and m.family_id != current_user.family_id
+        for m in members
+    ):
+        raise HTTPException(
+            status_code=403, detail="Cannot add members to a different family"
+        )
+    for m in members:
+        if m.role == "parent" and not (m.password and m.email):
+            raise HTTPException(
+                status_code=400, detail="Email and password are required for parents"
+            )
+
+    # Emails must be unique within the request and against existing users
+    emails = [m.email for m in members if m.email]
+    if len(set(emails)) != len(emails):
+        raise HTTPException(status_code=400, detail="Duplicate emails in request")
+    if emails:
+        taken = sorted(
+            db.execute(select(User.email).where(User.email.in_(emails))).scalars()
+        )
+        if taken:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Email already registered: {', '.join(taken)}",
+            )
+
+    # Parents' hashes are computed in parallel; children can't log in
+    parent_hashes = iter(
+        password_hasher.hash_many([m.password for m in members if m.role == "parent"])
+    )
+    now = datetime.utcnow()
+    users = [
+        User(
+            family_id=current_user.family_id,
+            name=m.name,
+            email=m.email,
+            password_hash=(
+                next(parent_hashes) if m.role == "parent" else UNUSABLE_PASSWORD
+            ),
+            role=m.role,
+            profile_image_url=m.profile_image_url,
+            icon_emoji=m.icon_emoji,
+            created_at=now,
+        )
+        for m in members
+    ]
+    db.add_all(users)
+    db.flush()
+    # Serialize before commit expires the rows and each one is reloaded
+    created = [UserOut.model_validate(user) for user in users]
+    db.commit()
+    return created
+
+
 @router.get("/{user_id}", response_model=UserOut)
 def get_user(
     user_id: int,
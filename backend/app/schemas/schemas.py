@@ -22,6 +22,10 @@ class UserCreate(UserBase):
     family_id: Optional[int] = None
 
 
+class UserBulkCreate(BaseModel):
+    users: List[UserCreate]
+
+
 class UserUpdate(BaseModel):
     name: Optional[str] = None
     profile_image_url: Optional[str] = None
@@ -108,6 +112,7 @@ class QRCodeScanRequest(BaseModel):
 class QRCodeStatusResponse(BaseModel):
     status: Literal["pending", "scanned", "expired"]
     access_token: Optional[str] = None
+    expires_at: Optional[datetime] = None  # while pending
 
 
 # Events
@@ -226,6 +231,33 @@ class ChoreCompletionOut(BaseModel):
         from_attributes = True
 
 
+class ChoreOccurrenceOut(BaseModel):
+    chore_id: int
+    date: date
+    slots: int  # times the chore can be completed that day
+    time_of_day: Optional[Literal["morning", "afternoon", "evening", "anytime"]] = None
+
+
+class ChoreBatchCompleteItem(BaseModel):
+    chore_id: int
+    user_id: Optional[int] = (
+        None  # Family member the completion is for (default: caller)
+    )
+
+
+class ChoreBatchCompleteRequest(BaseModel):
+    items: List[ChoreBatchCompleteItem]
+
+
+class ChoreBatchCompleteResult(BaseModel):
+    chore_id: int
+    user_id: int
+    ok: bool
+    status_code: int
+    detail: Optional[str] = None
+    chore: Optional[ChoreOut] = None
+
+
 # Points
 class PointCreate(BaseModel):
     user_id: int
@@ -241,6 +273,17 @@ class PointOut(PointCreate):
         from_attributes = True
 
 
+class PointAggregateOut(BaseModel):
+    """One group of a points aggregate; which key is set depends on group_by."""
+
+    user_id: Optional[int] = None
+    chore_id: Optional[int] = None
+    day: Optional[date] = None  # the day, or the Sunday starting the week
+    name: Optional[str] = None  # user name or chore title
+    points: int
+    entries: int
+
+
 # Leaderboard
 class CompletedChoreOut(BaseModel):
     id: int
@@ -258,6 +301,7 @@ class LeaderboardEntry(BaseModel):
     name: str
     icon_emoji: Optional[str] = None
     total_points: int
+    completed_count: int = 0
     completed_chores: List[CompletedChoreOut]
 
     class Config:
@@ -292,6 +336,25 @@ class GoalOut(GoalBase):
         from_attributes = True
 
 
+class GoalMemberProgress(BaseModel):
+    user_id: int
+    name: str
+    icon_emoji: Optional[str] = None
+    points: int
+    remaining: Optional[int] = None  # None when the goal has no point requirement
+    percent: Optional[float] = None
+    achieved: bool = False
+    projected_completion_date: Optional[date] = None
+
+
+class GoalProgressOut(BaseModel):
+    goal_id: int
+    name: str
+    prize: Optional[str] = None
+    point_requirement: Optional[int] = None
+    members: List[GoalMemberProgress]
+
+
 # Calendars
 class ICalConnectRequest(BaseModel):
     url: str
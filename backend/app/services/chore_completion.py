@@ -0,0 +1,184 @@
+"""
+Chore completion rules shared by the single and batch completion endpoints.
+
+A ``CompletionBatch`` applies the recurring, group and individual completion
+rules to any number of chores. It locks the chores it touches, preloads what
+the rules need in a fixed number of queries and writes points ledger rows
+with a bulk insert. Nothing is committed here; callers own the transaction.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..db.locks import lock_rows
+from ..models.models import Chore, Point
+from .chore_counters import LimitReached, claim_completion_slot
+from .chore_status import utc_today
+from .point_totals import delete_points, record_points
+
+
+class CompletionBatch:
+    """Applies completions to a set of chores and flushes ledger rows in bulk."""
+
+    def __init__(self, db: Session, chores: List[Chore], today: Optional[date] = None):
+        self.db = db
+        self.today = today or utc_today()
+        self._points: List[dict] = []
+
+        chore_ids = {c.id for c in chores}
+        # Lock the chores and reload them, so toggles and limit checks act on
+        # the latest committed state even with concurrent writers
+        lock_rows(self.db, Chore, chore_ids)
+
+        # (chore_id, user_id) pairs that already hold points, so group and
+        # individual chores never award twice
+        self._awarded: Set[Tuple[int, int]] = set()
+        if chore_ids:
+            self._awarded = set(
+                self.db.execute(
+                    select(Point.chore_id, Point.user_id).where(
+                        Point.chore_id.in_(chore_ids)
+                    )
+                ).all()
+            )
+
+    def complete(self, chore: Chore, user_id: int) -> None:
+        """
+        Mark a chore as complete for a user. Behavior depends on chore type:
+        - Recurring chore: records a completion and awards points, within limits
+        - Non-recurring group chore: toggles completion for everyone
+        - Non-recurring individual chore: toggles completion for that user only
+        Raises HTTPException when a limit prevents the completion.
+        """
+        if chore.is_recurring:
+            self._complete_recurring(chore, user_id)
+        elif chore.is_group_chore:
+            self._toggle_group(chore, user_id)
+        else:
+            self._toggle_individual(chore, user_id)
+
+    def flush(self) -> None:
+        """Write pending ledger rows with one bulk INSERT."""
+        try:
+            record_points(self.db, self._points)
+            self.db.flush()
+        except IntegrityError:
+            # A completion slot was taken concurrently; the unique
+            # (chore_id, slot_day, slot) key is the last line of defense
+            raise HTTPException(
+                status_code=409, detail="Chore was completed concurrently, retry"
+            )
+        self._points = []
+
+    def _complete_recurring(self, chore: Chore, user_id: int) -> None:
+        # Reserve a slot within the daily limit (recurrence_count handles
+        # "2x per day" etc.) and the overall max_completions limit
+        try:
+            slot = claim_completion_slot(self.db, chore, self.today)
+        except LimitReached as exc:
+            if exc.kind == "daily":
+                detail = (
+                    f"Daily completion limit reached ({exc.limit}). Come back tomorrow!"
+                )
+            else:
+                detail = f"Maximum completions reached ({exc.limit}). This chore cannot be completed again."
+            raise HTTPException(status_code=400, detail=detail)
+
+        # The points row is the completion record, tagged with its slot
+        self._add_point(chore, user_id, datetime.utcnow(), self.today, slot)
+
+        # Mark as completed once the max is hit
+        chore.completed = (
+            chore.max_completions is not None
+            and chore.completion_count >= chore.max_completions
+        )
+
+    def _toggle_group(self, chore: Chore, user_id: int) -> None:
+        chore.completed = not chore.completed
+        if chore.completed:
+            # Award points to all assignees (or the completing user if unassigned)
+            now = datetime.utcnow()
+            for uid in self._assignee_ids(chore) or [user_id]:
+                if (chore.id, uid) not in self._awarded:
+                    self._add_point(chore, uid, now)
+        else:
+            # Remove points when uncompleting
+            self._revoke(chore.id)
+
+    def _toggle_individual(self, chore: Chore, user_id: int) -> None:
+        completed_ids = set(chore.completed_by_user_ids)
+        if user_id in completed_ids:
+            # User is uncompleting their part
+            completed_ids.discard(user_id)
+            self._revoke(chore.id, user_id)
+        else:
+            # User is completing their part
+            completed_ids.add(user_id)
+            if (chore.id, user_id) not in self._awarded:
+                self._add_point(chore, user_id, datetime.utcnow())
+        chore.set_completed_by(completed_ids)
+
+        # Mark fully complete if all assignees have completed (or if unassigned)
+        assignee_ids = self._assignee_ids(chore)
+        if assignee_ids:
+            chore.completed = all(aid in completed_ids for aid in assignee_ids)
+        else:
+            chore.completed = len(completed_ids) > 0
+
+    @staticmethod
+    def _assignee_ids(chore: Chore) -> List[int]:
+        if chore.assignee_ids:
+            return chore.assignee_ids
+        return [chore.assigned_to] if chore.assigned_to else []
+
+    def _add_point(
+        self,
+        chore: Chore,
+        user_id: int,
+        awarded_at: datetime,
+        slot_day: Optional[date] = None,
+        slot: Optional[int] = None,
+    ) -> None:
+        self._points.append(
+            {
+                "user_id": user_id,
+                "chore_id": chore.id,
+                "points": chore.point_value,
+                "awarded_at": awarded_at,
+                "slot_day": slot_day,
+                "slot": slot,
+            }
+        )
+        self._awarded.add((chore.id, user_id))
+
+    def _revoke(self, chore_id: int, user_id: Optional[int] = None) -> None:
+        """Delete a chore's points (optionally for one user), pending or stored."""
+
+        def matches(row: dict) -> bool:
+            return row["chore_id"] == chore_id and (
+                user_id is None or row["user_id"] == user_id
+            )
+
+        self._points = [row for row in self._points if not matches(row)]
+        criteria = [Point.chore_id == chore_id]
+        if user_id is not None:
+            criteria.append(Point.user_id == user_id)
+        delete_points(self.db, *criteria)
+        self._awarded = {
+            (cid, uid)
+            for cid, uid in self._awarded
+            if not (cid == chore_id and (user_id is None or uid == user_id))
+        }
+
+
+def load_chores(db: Session, chore_ids: List[int]) -> Dict[int, Chore]:
+    """Load chores by id in one query."""
+    if not chore_ids:
+        return {}
+    rows = db.execute(select(Chore).where(Chore.id.in_(set(chore_ids)))).scalars()
+    return {chore.id: chore for chore in rows}
@@ -0,0 +1,136 @@
+"""
+Denormalized completion counters for recurring chores.
+
+Every recurring completion bumps ``Chore.completion_count`` and the matching
+``ChoreDailyCount`` bucket in the same transaction that inserts its points
+row, so limit checks never have to scan the ledger. The
+bumps are conditional, which makes the limit checks race-free as well.
+"""
+
+import logging
+from datetime import date
+from typing import Dict
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..db.functions import upsert
+from ..models.models import Chore, ChoreDailyCount, Point
+from .chore_status import daily_limit
+
+logger = logging.getLogger(__name__)
+
+
+class LimitReached(Exception):
+    """Raised when a recurring chore has no completion slot left."""
+
+    def __init__(self, kind: str, limit: int):
+        super().__init__(kind, limit)
+        self.kind = kind  # "daily" or "max"
+        self.limit = limit
+
+
+def claim_completion_slot(db: Session, chore: Chore, day: date) -> int:
+    """
+    Atomically reserve the next completion slot for a chore on a day.
+
+    The per-day bucket is bumped with a conditional upsert and the lifetime
+    count with a conditional UPDATE, so two concurrent completions can never
+    both pass the daily limit or ``max_completions``. Returns the slot number
+    (1-based position within the day) or raises LimitReached.
+    """
+    limit = daily_limit(chore)
+    bucket = ChoreDailyCount.__table__
+    slot = db.execute(
+        upsert(db)(bucket)
+        .values(chore_id=chore.id, day=day, count=1)
+        .on_conflict_do_update(
+            index_elements=[bucket.c.chore_id, bucket.c.day],
+            set_={"count": bucket.c.count + 1},
+            where=bucket.c.count < limit,
+        )
+        .returning(bucket.c.count)
+    ).scalar_one_or_none()
+    if slot is None:
+        raise LimitReached("daily", limit)
+
+    chores = Chore.__table__
+    total = db.execute(
+        update(chores)
+        .where(
+            chores.c.id == chore.id,
+            or_(
+                chores.c.max_completions.is_(None),
+                chores.c.completion_count < chores.c.max_completions,
+            ),
+        )
+        .values(completion_count=chores.c.completion_count + 1)
+        .returning(chores.c.completion_count)
+    ).scalar_one_or_none()
+    if total is None:
+        # Give the daily slot back; this transaction still holds the row
+        db.execute(
+            update(bucket)
+            .where(bucket.c.chore_id == chore.id, bucket.c.day == day)
+            .values(count=bucket.c.count - 1)
+        )
+        raise LimitReached("max", chore.max_completions)
+
+    set_committed_value(chore, "completion_count", total)
+    return slot
+
+
+def recount_completions(db: Session, chore: Chore) -> None:
+    """
+    Recompute one chore's counters from its completions in the ledger, e.g.
+    after its schedule changed. The caller holds the chore's row lock.
+    """
+    completed = (
+        select(Point.slot_day, func.count(Point.id))
+        .where(Point.chore_id == chore.id, Point.is_completion())
+        .group_by(Point.slot_day)
+    )
+    days = db.execute(completed).all()
+    db.execute(delete(ChoreDailyCount).where(ChoreDailyCount.chore_id == chore.id))
+    if days:
+        db.execute(
+            insert(ChoreDailyCount),
+            [{"chore_id": chore.id, "day": day, "count": n} for day, n in days],
+        )
+    chore.completion_count = sum(n for _, n in days)
+
+
+def rebuild_completion_counters(db: Session) -> Dict[str, int]:
+    """
+    Rebuild every chore's counters from the completions in the points ledger.
+    Returns how many chores had a drifted lifetime count and how many daily
+    buckets were written. The caller is responsible for committing.
+    """
+    lifetime = (
+        select(func.count(Point.id))
+        .where(Point.chore_id == Chore.id, Point.is_completion())
+        .scalar_subquery()
+    )
+    drifted = db.execute(
+        update(Chore)
+        .where(Chore.completion_count != lifetime)
+        .values(completion_count=lifetime)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    db.execute(delete(ChoreDailyCount))
+    buckets = db.execute(
+        insert(ChoreDailyCount).from_select(
+            ["chore_id", "day", "count"],
+            select(Point.chore_id, Point.slot_day, func.count(Point.id))
+            .where(Point.is_completion())
+            .group_by(Point.chore_id, Point.slot_day),
+        )
+    ).rowcount
+
+    logger.info(
+        "Chore completion counters rebuilt",
+        extra={"drifted_chores": drifted, "daily_buckets": buckets},
+    )
+    return {"drifted_chores": drifted, "daily_buckets": buckets}
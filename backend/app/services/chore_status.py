@@ -0,0 +1,94 @@
+"""
+Chore status service.
+
+Computes per-day completion state for a family's chores in bulk so that list
+endpoints never issue one query per chore.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, not_, or_, select
+from sqlalchemy.orm import Session
+
+from ..models.models import Chore, ChoreDailyCount
+from ..schemas.schemas import ChoreOut
+
+
+def utc_today() -> date:
+    """
+    Today's date in UTC. Completion days are UTC dates everywhere, like the
+    ledger's ``awarded_at``, so the result doesn't depend on the server's zone.
+    """
+    return datetime.utcnow().date()
+
+
+def completion_counts_for_day(
+    db: Session, chore_ids: Iterable[int], day: Optional[date] = None
+) -> Dict[int, int]:
+    """
+    Read the per-day completion counters for many chores in one query.
+    Chores without completions on that day are absent from the result.
+    """
+    chore_ids = list(chore_ids)
+    if not chore_ids:
+        return {}
+
+    rows = db.execute(
+        select(ChoreDailyCount.chore_id, ChoreDailyCount.count).where(
+            ChoreDailyCount.chore_id.in_(chore_ids),
+            ChoreDailyCount.day == (day or utc_today()),
+        )
+    ).all()
+    return {chore_id: count for chore_id, count in rows}
+
+
+def daily_limit(chore: Chore) -> int:
+    """Number of completions a recurring chore allows per day (default 1)."""
+    return chore.recurrence_count if chore.recurrence_count else 1
+
+
+def is_completed_today(chore: Chore, completions_today: int) -> bool:
+    """Whether a chore should be shown as done for today."""
+    if chore.is_recurring:
+        return completions_today >= daily_limit(chore)
+    return bool(chore.completed)
+
+
+def completed_today_clause(day: Optional[date] = None):
+    """
+    SQL form of ``is_completed_today`` for filtering chores in a query.
+    Recurring chores read their counter for the day (by primary key).
+    """
+    completions = (
+        select(ChoreDailyCount.count)
+        .where(
+            ChoreDailyCount.chore_id == Chore.id,
+            ChoreDailyCount.day == (day or utc_today()),
+        )
+        .scalar_subquery()
+    )
+    limit = func.coalesce(func.nullif(Chore.recurrence_count, 0), 1)
+    return or_(
+        and_(Chore.is_recurring.is_(True), func.coalesce(completions, 0) >= limit),
+        and_(not_(Chore.is_recurring.is_(True)), Chore.completed.is_(True)),
+    )
+
+
+def with_completed_today(
+    db: Session, chores: List[Chore], day: Optional[date] = None
+) -> List[ChoreOut]:
+    """
+    Serialize chores and attach ``completed_today``.
+    Daily counters for all recurring chores come from a single query.
+    """
+    counts = completion_counts_for_day(
+        db, (c.id for c in chores if c.is_recurring), day
+    )
+
+    results = []
+    for chore in chores:
+        out = ChoreOut.model_validate(chore)
+        out.completed_today = is_completed_today(chore, counts.get(chore.id, 0))
+        results.append(out)
+    return results
@@ -0,0 +1,110 @@
+"""
+Goal progress for a whole family.
+
+Every member's all-time points and recent earning rate come from one grouped
+query over the pre-aggregated ``user_point_totals`` and ``daily_point_rollups``.
+Progress for each goal and member is then derived in memory, so the cost does
+not grow with the number of goals or the size of the ledger.
+"""
+
+import math
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.models import DailyPointRollup, Goal, User, UserPointTotal
+from ..schemas.schemas import GoalMemberProgress, GoalProgressOut
+from .chore_status import utc_today
+
+# Projections assume members keep earning at their average over this window
+RATE_WINDOW_DAYS = 28
+
+
+def project_completion(
+    remaining: int, recent_points: int, today: date
+) -> Optional[date]:
+    """Day the remaining points are reached at the recent daily rate, if any."""
+    if remaining <= 0:
+        return today
+    if recent_points <= 0:
+        return None
+    per_day = recent_points / RATE_WINDOW_DAYS
+    return today + timedelta(days=math.ceil(remaining / per_day))
+
+
+def member_progress(
+    member, requirement: Optional[int], today: date
+) -> GoalMemberProgress:
+    progress = GoalMemberProgress(
+        user_id=member.id,
+        name=member.name,
+        icon_emoji=member.icon_emoji,
+        points=member.points,
+    )
+    if requirement:
+        remaining = max(requirement - member.points, 0)
+        progress.remaining = remaining
+        progress.percent = round(min(member.points / requirement, 1) * 100, 1)
+        progress.achieved = remaining == 0
+        progress.projected_completion_date = project_completion(
+            remaining, member.recent_points, today
+        )
+    return progress
+
+
+def family_goal_progress(
+    db: Session, family_id: int, today: Optional[date] = None
+) -> List[GoalProgressOut]:
+    """Progress of every family member towards every family goal."""
+    # The earning rate sums rollups, whose days are UTC dates
+    today = today or utc_today()
+    goals = (
+        db.execute(select(Goal).where(Goal.family_id == family_id).order_by(Goal.id))
+        .scalars()
+        .all()
+    )
+    if not goals:
+        return []
+
+    recent = (
+        select(
+            DailyPointRollup.user_id,
+            func.sum(DailyPointRollup.points).label("points"),
+        )
+        .join(User, DailyPointRollup.user_id == User.id)
+        .where(
+            User.family_id == family_id,
+            DailyPointRollup.day > today - timedelta(days=RATE_WINDOW_DAYS),
+        )
+        .group_by(DailyPointRollup.user_id)
+        .subquery()
+    )
+    members = db.execute(
+        select(
+            User.id,
+            User.name,
+            User.icon_emoji,
+            func.coalesce(UserPointTotal.total_points, 0).label("points"),
+            func.coalesce(recent.c.points, 0).label("recent_points"),
+        )
+        .outerjoin(UserPointTotal, User.id == UserPointTotal.user_id)
+        .outerjoin(recent, User.id == recent.c.user_id)
+        .where(User.family_id == family_id)
+        .order_by(User.id)
+    ).all()
+
+    return [
+        GoalProgressOut(
+            goal_id=goal.id,
+            name=goal.name,
+            prize=goal.prize,
+            point_requirement=goal.point_requirement,
+            members=[
+                member_progress(member, goal.point_requirement, today)
+                for member in members
+            ],
+        )
+        for goal in goals
+    ]
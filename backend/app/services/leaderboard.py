@@ -0,0 +1,173 @@
+"""
+Family leaderboard.
+
+Built in a fixed number of queries regardless of family size or history: one
+read of pre-aggregated points for every member and one windowed query for
+each member's most recent completions (``row_number()`` partitioned by user),
+so the response stays bounded by ``recent_limit``.
+
+All-time totals come from ``user_point_totals``. Week, month and custom
+windows sum ``daily_point_rollups``, i.e. at most one row per user and day.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.models import Chore, DailyPointRollup, Point, User, UserPointTotal
+from ..schemas.schemas import CompletedChoreOut, LeaderboardEntry
+from .chore_status import utc_today
+from .recurrence import week_start_of
+
+MAX_CUSTOM_WINDOW_DAYS = 366
+
+
+class Window(NamedTuple):
+    start: date
+    end: date  # inclusive
+
+
+def resolve_window(
+    window: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    today: Optional[date] = None,
+) -> Optional[Window]:
+    """
+    Turn a window name into a date range; None means all time.
+    "week" is the current Sunday-to-Saturday week, "month" the current
+    calendar month and "custom" the given start/end (inclusive).
+    """
+    # Rollup days are UTC dates, so the current week and month are too
+    today = today or utc_today()
+    if window == "week":
+        first = week_start_of(today)
+        return Window(first, first + timedelta(days=6))
+    if window == "month":
+        first = today.replace(day=1)
+        next_month = (first + timedelta(days=32)).replace(day=1)
+        return Window(first, next_month - timedelta(days=1))
+    if window == "custom":
+        if start is None or end is None:
+            raise HTTPException(
+                status_code=400, detail="start and end are required for custom"
+            )
+        if end < start:
+            raise HTTPException(status_code=400, detail="end must not be before start")
+        if (end - start).days >= MAX_CUSTOM_WINDOW_DAYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Window must be shorter than {MAX_CUSTOM_WINDOW_DAYS} days",
+            )
+        return Window(start, end)
+    return None
+
+
+def recent_completions(
+    db: Session, family_id: int, limit: int, window: Optional[Window] = None
+) -> Dict[int, List[CompletedChoreOut]]:
+    """Each family member's ``limit`` most recent chore points, newest first."""
+    ranked = (
+        select(
+            Point.id,
+            Point.user_id,
+            Point.points,
+            Point.awarded_at,
+            Chore.title,
+            Chore.emoji,
+            func.row_number()
+            .over(
+                partition_by=Point.user_id,
+                order_by=(Point.awarded_at.desc(), Point.id.desc()),
+            )
+            .label("rank"),
+        )
+        .join(Chore, Point.chore_id == Chore.id)
+        .join(User, Point.user_id == User.id)
+        .where(User.family_id == family_id)
+    )
+    if window is not None:
+        ranked = ranked.where(
+            Point.awarded_at >= datetime.combine(window.start, time.min),
+            Point.awarded_at
+            < datetime.combine(window.end + timedelta(days=1), time.min),
+        )
+    ranked = ranked.subquery()
+    rows = db.execute(
+        select(ranked)
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.user_id, ranked.c.rank)
+    )
+
+    recent: Dict[int, List[CompletedChoreOut]] = defaultdict(list)
+    for row in rows:
+        recent[row.user_id].append(
+            CompletedChoreOut(
+                id=row.id,  # Point.id: the same chore can be completed many times
+                title=row.title,
+                emoji=row.emoji,
+                point_value=row.points,
+                awarded_at=row.awarded_at,
+            )
+        )
+    return recent
+
+
+def _totals(family_id: int, window: Optional[Window]):
+    """(points, completions) per user, all time or summed over the window."""
+    if window is None:
+        return UserPointTotal.__table__.alias("totals")
+    # Scoped to the family so the rollups are searched per member, not scanned
+    return (
+        select(
+            DailyPointRollup.user_id,
+            func.sum(DailyPointRollup.points).label("total_points"),
+            func.sum(DailyPointRollup.completions).label("completed_count"),
+        )
+        .join(User, DailyPointRollup.user_id == User.id)
+        .where(
+            User.family_id == family_id,
+            DailyPointRollup.day.between(window.start, window.end),
+        )
+        .group_by(DailyPointRollup.user_id)
+        .subquery("totals")
+    )
+
+
+def build_leaderboard(
+    db: Session, family_id: int, recent_limit: int, window: Optional[Window] = None
+) -> List[LeaderboardEntry]:
+    """Family members sorted by points (descending) with recent chores."""
+    totals = _totals(family_id, window)
+    total_points = func.coalesce(totals.c.total_points, 0)
+    rows = db.execute(
+        select(
+            User.id,
+            User.name,
+            User.icon_emoji,
+            total_points.label("total_points"),
+            func.coalesce(totals.c.completed_count, 0).label("completed_count"),
+        )
+        .outerjoin(totals, User.id == totals.c.user_id)
+        .where(User.family_id == family_id)
+        .order_by(total_points.desc(), User.id)
+    ).all()
+
+    recent = (
+        recent_completions(db, family_id, recent_limit, window) if recent_limit else {}
+    )
+    return [
+        LeaderboardEntry(
+            user_id=row.id,
+            name=row.name,
+            icon_emoji=row.icon_emoji,
+            total_points=int(row.total_points),
+            completed_count=int(row.completed_count),
+            completed_chores=recent.get(row.id, []),
+        )
+        for row in rows
+    ]
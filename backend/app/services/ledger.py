@@ -0,0 +1,146 @@
+"""
+Read queries over the points ledger.
+
+Family scoping is a join on ``User.family_id`` and grouping happens in SQL, so
+clients get chart-sized results instead of raw ledger rows. Exports stream
+CSV from a server-side cursor, so memory stays flat however long the history.
+"""
+
+import csv
+import io
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from ..db.functions import calendar_date, week_start_date
+from ..models.models import Chore, Point, User
+from ..schemas.schemas import PointAggregateOut
+
+
+def in_range(query: Select, column, start: Optional[date], end: Optional[date]):
+    """Restrict a DATETIME column to the days [start, end]."""
+    if start is not None:
+        query = query.where(column >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.where(
+            column < datetime.combine(end + timedelta(days=1), time.min)
+        )
+    return query
+
+
+def family_points(family_id: int) -> Select:
+    """Points rows of a family's members."""
+    return (
+        select(Point)
+        .join(User, Point.user_id == User.id)
+        .where(User.family_id == family_id)
+    )
+
+
+def aggregate_family_points(
+    db: Session,
+    family_id: int,
+    group_by: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[PointAggregateOut]:
+    """Sum a family's points per user, day, week or chore within [start, end]."""
+    if group_by == "user":
+        keys = [User.id.label("user_id"), User.name.label("name")]
+    elif group_by == "chore":
+        # Manual awards have no chore and form their own group
+        keys = [Point.chore_id.label("chore_id"), Chore.title.label("name")]
+    elif group_by == "week":
+        keys = [week_start_date(Point.awarded_at).label("day")]
+    else:
+        keys = [calendar_date(Point.awarded_at).label("day")]
+
+    query = (
+        select(
+            *keys,
+            func.sum(Point.points).label("points"),
+            func.count(Point.id).label("entries"),
+        )
+        .join(User, Point.user_id == User.id)
+        .where(User.family_id == family_id)
+    )
+    if group_by == "chore":
+        query = query.outerjoin(Chore, Point.chore_id == Chore.id)
+    query = in_range(query, Point.awarded_at, start, end)
+    query = query.group_by(*keys).order_by(*keys)
+
+    return [PointAggregateOut(**row._mapping) for row in db.execute(query)]
+
+
+EXPORT_BATCH_SIZE = 500
+
+
+def _export_query(family_id: int, ledger: str) -> Tuple[Select, Any]:
+    """The export query for a ledger and the timestamp column to filter on."""
+    if ledger == "completions":
+        return (
+            select(
+                Point.id,
+                Point.awarded_at.label("completed_at"),
+                Point.chore_id,
+                Chore.title.label("chore_title"),
+                Point.user_id,
+                User.name.label("user_name"),
+                Point.points.label("points_awarded"),
+            )
+            .join(Chore, Point.chore_id == Chore.id)
+            .join(User, Point.user_id == User.id)
+            .where(Chore.family_id == family_id, Point.is_completion())
+            .order_by(Point.awarded_at, Point.id)
+        ), Point.awarded_at
+    return (
+        select(
+            Point.id,
+            Point.awarded_at,
+            Point.user_id,
+            User.name.label("user_name"),
+            Point.chore_id,
+            Chore.title.label("chore_title"),
+            Point.points,
+        )
+        .join(User, Point.user_id == User.id)
+        .outerjoin(Chore, Point.chore_id == Chore.id)
+        .where(User.family_id == family_id)
+        .order_by(Point.awarded_at, Point.id)
+    ), Point.awarded_at
+
+
+def _cell(value: Any) -> Any:
+    """Keep spreadsheets from evaluating user text (titles, names) as formulas."""
+    # Leading tab and carriage return count too (OWASP CSV injection)
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+def export_csv(
+    db: Session,
+    family_id: int,
+    ledger: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[str]:
+    """Yield a ledger ("points" or "completions") as CSV, one line at a time."""
+    query, timestamp = _export_query(family_id, ledger)
+    query = in_range(query, timestamp, start, end)
+    rows = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow([_cell(value) for value in values])
+        return buffer.getvalue()
+
+    yield line(rows.keys())
+    for row in rows:
+        yield line(row)
@@ -0,0 +1,181 @@
+"""
+Password hashing off the request threads.
+
+bcrypt at cost 12 takes hundreds of milliseconds of CPU. Hashes and checks run
+in a dedicated, size-bounded process pool so a burst of logins cannot starve
+the threads serving other requests. Admission is bounded too: at most
+``workers + queue_limit`` operations are in flight, and anything beyond that
+is shed with a 503 instead of queueing without limit. Each admitted call
+still blocks its request thread until the pool answers, so the default limit
+is a small multiple of the workers, far below the 40 threads that serve sync
+routes.
+
+With ``workers=0`` the work runs inline on the calling thread, still behind
+the same admission limit.
+
+Accounts that can never log in (children) store ``UNUSABLE_PASSWORD`` instead
+of a hash of a random password; it matches nothing and costs nothing.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from typing import Dict, List, Optional
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from ..config import settings
+
+# bcrypt only looks at the first 72 bytes of a password
+MAX_PASSWORD_BYTES = 72
+
+# Never a valid bcrypt hash, so no password verifies against it
+UNUSABLE_PASSWORD = "!"
+
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:MAX_PASSWORD_BYTES]
+
+
+def _hash(password: str, rounds: int) -> str:
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode("utf-8")
+
+
+def _check(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(_password_bytes(password), hashed.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def hash_cost(hashed: str) -> Optional[int]:
+    """The cost factor of a ``$2b$12$...`` hash, or None if it isn't bcrypt."""
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """bcrypt on a bounded process pool with load shedding and latency stats."""
+
+    def __init__(self, workers: int, queue_limit: int, rounds: int):
+        self.workers = workers
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_limit)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+        }
+
+    def hash(self, password: str) -> str:
+        with self._admitted():
+            if self.workers:
+                return self._executor().submit(_hash, password, self.rounds).result()
+            return _hash(password, self.rounds)
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash several passwords in parallel, holding one queue slot per
+        password in flight. The batch goes in rounds of at most one password
+        per worker, so it never holds the slots other requests queue in; a
+        round that finds no free slot is shed with 503 like any other call.
+        """
+        hashes: List[str] = []
+        while len(hashes) < len(passwords):
+            wanted = min(len(passwords) - len(hashes), max(self.workers, 1))
+            with self._admitted(wanted) as granted:
+                chunk = passwords[len(hashes) : len(hashes) + granted]
+                if self.workers:
+                    hashes += self._executor().map(_hash, chunk, repeat(self.rounds))
+                else:
+                    hashes += [_hash(password, self.rounds) for password in chunk]
+        return hashes
+
+    def verify(self, password: str, hashed: str) -> bool:
+        if hashed.startswith(UNUSABLE_PASSWORD):
+            return False
+        with self._admitted():
+            if self.workers:
+                return self._executor().submit(_check, password, hashed).result()
+            return _check(password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether a hash was made at a different cost than the configured one."""
+        cost = hash_cost(hashed)
+        return cost is not None and cost != self.rounds
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Fork would copy the parent's threads, locks and DB connections
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    @contextmanager
+    def _admitted(self, wanted: int = 1):
+        """
+        Hold queue slots for the block: one, or up to ``wanted`` if free.
+        Yields how many were granted; sheds the request with 503 if none are.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        granted = 1
+        while granted < wanted and self._slots.acquire(blocking=False):
+            granted += 1
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._stats["in_flight"] += granted
+        try:
+            yield granted
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self._stats["in_flight"] -= granted
+                self._stats["completed"] += granted
+                self._stats["total_seconds"] += elapsed * granted
+                self._stats["max_seconds"] = max(self._stats["max_seconds"], elapsed)
+            for _ in range(granted):
+                self._slots.release()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        completed = stats["completed"]
+        stats["mean_seconds"] = stats["total_seconds"] / completed if completed else 0.0
+        stats.update(workers=self.workers, rounds=self.rounds)
+        return stats
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    queue_limit=settings.password_hash_queue_limit,
+    rounds=settings.bcrypt_rounds,
+)
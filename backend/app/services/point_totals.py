@@ -0,0 +1,209 @@
+"""
+Pre-aggregated per-user point totals and daily rollups.
+
+``UserPointTotal`` mirrors ``SUM(points)`` and the number of chore-linked
+points per user; ``DailyPointRollup`` holds the same per user and calendar
+day of ``awarded_at``, so windowed leaderboards never scan the ledger.
+
+Every write to the ``points`` table goes through ``record_points``,
+``add_to_totals``, ``delete_points`` or ``detach_points``, so both change in the same transaction
+as the ledger, using atomic increments that are safe under concurrent
+writers. ``rebuild_point_totals`` repairs drifted totals and
+``rebuild_point_rollups`` rebuilds the rollups.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..db.functions import calendar_date, upsert
+from ..models.models import DailyPointRollup, Point, UserPointTotal
+from .chore_status import utc_today
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert_counts(db: Session, model, keys: List[str], rows: List[dict]) -> None:
+    """Add each row's counts to the matching row of ``model``, creating it."""
+    if not rows:
+        return
+    table = model.__table__
+    stmt = upsert(db)(table)
+    counts = [name for name in rows[0] if name not in keys]
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c[key] for key in keys],
+            set_={name: table.c[name] + stmt.excluded[name] for name in counts},
+        ),
+        rows,
+    )
+
+
+def _apply(db: Session, rows: Iterable, sign: int) -> None:
+    """
+    Apply (user_id, points, chore_id, awarded_at) ledger rows to the
+    per-user totals and the daily rollups.
+    """
+    totals: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+    daily: Dict[Tuple[int, date], List[int]] = defaultdict(lambda: [0, 0])
+    for user_id, points, chore_id, awarded_at in rows:
+        if user_id is None:
+            continue
+        for bucket in (totals[user_id], daily[user_id, _day(awarded_at)]):
+            bucket[0] += sign * points
+            bucket[1] += sign * (chore_id is not None)
+
+    _upsert_counts(
+        db,
+        UserPointTotal,
+        ["user_id"],
+        [
+            {"user_id": user_id, "total_points": pts, "completed_count": done}
+            for user_id, (pts, done) in sorted(totals.items())
+        ],
+    )
+    _upsert_counts(
+        db,
+        DailyPointRollup,
+        ["user_id", "day"],
+        [
+            {"user_id": user_id, "day": day, "points": pts, "completions": done}
+            for (user_id, day), (pts, done) in sorted(daily.items())
+        ],
+    )
+
+
+def _day(awarded_at: Optional[datetime]) -> date:
+    # awarded_at is naive UTC, so this is the UTC day the chore counters use
+    return awarded_at.date() if awarded_at else utc_today()
+
+
+def record_points(db: Session, rows: List[dict]) -> None:
+    """Insert Point rows (dicts of Point columns) and count them."""
+    if not rows:
+        return
+    db.execute(insert(Point), rows)
+    _apply(
+        db,
+        (
+            (r["user_id"], r["points"], r.get("chore_id"), r.get("awarded_at"))
+            for r in rows
+        ),
+        1,
+    )
+
+
+def add_to_totals(db: Session, points: Iterable[Point]) -> None:
+    """Count Point objects that were added through the ORM."""
+    _apply(db, ((p.user_id, p.points, p.chore_id, p.awarded_at) for p in points), 1)
+
+
+def delete_points(db: Session, *criteria) -> int:
+    """Delete the Point rows matching criteria and take them off the counts."""
+    removed = db.execute(
+        delete(Point)
+        .where(*criteria)
+        .returning(Point.user_id, Point.points, Point.chore_id, Point.awarded_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    _apply(db, removed, -1)
+    return len(removed)
+
+
+def detach_points(db: Session, *criteria) -> int:
+    """
+    Unlink the Point rows matching criteria from their chore, e.g. before
+    the chore is deleted. The points stay; they stop counting as completions.
+    """
+    detached = db.execute(
+        update(Point)
+        .where(*criteria, Point.chore_id.is_not(None))
+        .values(chore_id=None, slot_day=None, slot=None)
+        .returning(Point.user_id, Point.awarded_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    # No points change hands; each row only drops out of the completion counts
+    _apply(db, ((user_id, 0, True, awarded_at) for user_id, awarded_at in detached), -1)
+    return len(detached)
+
+
+def rebuild_point_totals(db: Session) -> Dict[str, int]:
+    """
+    Recompute every user's totals from the points ledger.
+    Returns how many users had missing or drifted totals. The caller commits.
+    """
+    actual = (
+        select(
+            Point.user_id,
+            func.sum(Point.points).label("total_points"),
+            func.count(Point.chore_id).label("completed_count"),
+        )
+        .where(Point.user_id.is_not(None))
+        .group_by(Point.user_id)
+        .subquery()
+    )
+
+    missing = db.execute(
+        insert(UserPointTotal).from_select(
+            ["user_id", "total_points", "completed_count"],
+            select(actual).where(
+                ~exists().where(UserPointTotal.user_id == actual.c.user_id)
+            ),
+        )
+    ).rowcount
+
+    def recomputed(column):
+        return func.coalesce(
+            select(column)
+            .where(actual.c.user_id == UserPointTotal.user_id)
+            .scalar_subquery(),
+            0,
+        )
+
+    points, completed = (
+        recomputed(actual.c.total_points),
+        recomputed(actual.c.completed_count),
+    )
+    drifted = db.execute(
+        update(UserPointTotal)
+        .where(
+            or_(
+                UserPointTotal.total_points != points,
+                UserPointTotal.completed_count != completed,
+            )
+        )
+        .values(total_points=points, completed_count=completed)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    logger.info(
+        "User point totals rebuilt",
+        extra={"missing_users": missing, "drifted_users": drifted},
+    )
+    return {"missing_users": missing, "drifted_users": drifted}
+
+
+def rebuild_point_rollups(db: Session) -> Dict[str, int]:
+    """
+    Rebuild the daily rollups from the points ledger, e.g. after a backfill.
+    Returns how many daily rows were written. The caller commits.
+    """
+    day = calendar_date(Point.awarded_at)
+    db.execute(delete(DailyPointRollup))
+    rows = db.execute(
+        insert(DailyPointRollup).from_select(
+            ["user_id", "day", "points", "completions"],
+            select(
+                Point.user_id, day, func.sum(Point.points), func.count(Point.chore_id)
+            )
+            .where(Point.user_id.is_not(None))
+            .group_by(Point.user_id, day),
+        )
+    ).rowcount
+
+    logger.info("Daily point rollups rebuilt", extra={"daily_rows": rows})
+    return {"daily_rows": rows}
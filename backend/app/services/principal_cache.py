@@ -0,0 +1,159 @@
+"""
+In-process cache of authenticated principals.
+
+``get_current_user`` needs the token's ``User`` row on every request, mostly
+for ``family_id`` and ``role``. This keeps a TTL/LRU map from user id to a
+snapshot of the row's columns; a hit rebuilds the user and attaches it to the
+request session without a SELECT, so routers still get a live ORM object.
+``cached`` never does I/O and is safe on the event loop; ``load`` is not.
+
+Entries are evicted by SQLAlchemy events whenever a ``User`` is updated or
+deleted through the ORM, including bulk ``update(User)`` / ``delete(User)``:
+once at flush and again after the commit, since a request that loads the
+user in between still sees, and would re-cache, the committed old row.
+Writes from other processes are only bounded by the TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from ..config import settings
+from ..models.models import User
+
+_COLUMNS = [column.key for column in inspect(User).column_attrs]
+# Session.info key for user ids to evict again once the transaction commits;
+# None stands for "everyone"
+_PENDING = "principal_cache_pending"
+
+
+class PrincipalCache:
+    """Thread-safe TTL/LRU map from user id to a User column snapshot."""
+
+    def __init__(self, max_size: int, ttl_seconds: float, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> Optional[User]:
+        """The user attached to ``db``, from the cache or the database."""
+        user = self.cached(db, user_id)
+        if user is None:
+            user = self.load(db, user_id)
+        return user
+
+    def cached(self, db: Session, user_id: int) -> Optional[User]:
+        """The cached user attached to ``db``, without any I/O; None on a miss."""
+        if not self.enabled:
+            return None
+        snapshot = self._lookup(user_id)
+        if snapshot is None:
+            return None
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def load(self, db: Session, user_id: int) -> Optional[User]:
+        """Load the user from the database and cache it."""
+        user = db.get(User, user_id)
+        if user is not None and self.enabled:
+            self.put(user)
+        return user
+
+    def _lookup(self, user_id: int) -> Optional[dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: User) -> None:
+        snapshot = {key: getattr(user, key) for key in _COLUMNS}
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[user.id] = (expires, snapshot)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    enabled=settings.principal_cache_enabled,
+)
+
+
+def _evict_after_commit(session: Session, user_id: Optional[int]) -> None:
+    session.info.setdefault(_PENDING, set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_user(mapper, connection, target: User) -> None:
+    principal_cache.evict(target.id)
+    session = object_session(target)
+    if session is not None:
+        _evict_after_commit(session, target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _evict_bulk(state) -> None:
+    # Bulk statements don't say which rows they touch, so drop everything
+    if (state.is_update or state.is_delete) and any(
+        mapper.class_ is User for mapper in state.all_mappers
+    ):
+        principal_cache.clear()
+        _evict_after_commit(state.session, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING, ())
+    if None in pending:
+        principal_cache.clear()
+    for user_id in pending:
+        if user_id is not None:
+            principal_cache.evict(user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_rolled_back(session: Session, transaction) -> None:
+    # A rolled-back transaction changed nothing worth evicting
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
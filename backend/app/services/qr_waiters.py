@@ -0,0 +1,68 @@
+"""
+Wake-ups for kiosks waiting on a QR-code login.
+
+A kiosk long-polls ``/api/auth/qr-code/wait/{token}`` instead of asking for
+the session's status every couple of seconds. Each wait parks on an
+``asyncio.Event`` keyed by session token; ``scan_qr_code`` runs on the
+threadpool, so once its commit lands it sets the event with
+``call_soon_threadsafe``. Waiters on the same token share one event.
+
+Subscribe before checking the session's status: a scan that commits after
+the check then still finds the event to set.
+
+The registry is per process. A scan handled by another worker never sets the
+event, so the waiter's single DB check at timeout is what catches it.
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+class QRWaiters:
+    """In-process registry of events that scans of a session token set."""
+
+    def __init__(self):
+        self._waiting: Dict[str, List] = {}  # token -> [loop, event, waiters]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, token: str) -> Iterator[asyncio.Event]:
+        """Register for scans of ``token`` for the block; yields the event."""
+        with self._lock:
+            entry = self._waiting.get(token)
+            if entry is None:
+                entry = [asyncio.get_running_loop(), asyncio.Event(), 0]
+                self._waiting[token] = entry
+            entry[2] += 1
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                entry[2] -= 1
+                if not entry[2] and self._waiting.get(token) is entry:
+                    del self._waiting[token]
+
+    def notify(self, token: str) -> None:
+        """Wake everyone waiting on a token; safe to call from any thread."""
+        with self._lock:
+            entry = self._waiting.get(token)
+        if entry is not None:
+            loop, event, _ = entry
+            loop.call_soon_threadsafe(event.set)
+
+    def __len__(self) -> int:
+        return len(self._waiting)
+
+
+async def wait_for_scan(event: asyncio.Event, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds for a scan; True if one was signalled."""
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+qr_waiters = QRWaiters()
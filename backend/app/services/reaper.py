@@ -0,0 +1,72 @@
+"""
+Purge of expired login artifacts.
+
+QR-code sessions, password reset tokens and logout revocations are only
+useful until ``expires_at``; afterwards every lookup already rejects them (a
+revoked JWT has expired by then). The reaper
+deletes them in bounded batches (``DELETE ... WHERE id IN (SELECT id ...
+LIMIT n)``, backed by the ``expires_at`` indexes) and commits after each one,
+so a large backlog never holds a long write lock.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..db.session import SessionLocal
+from ..models.models import PasswordResetToken, QRCodeSession, RevokedToken
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# Result key -> model; all of them expire through ``expires_at``
+EXPIRING = {
+    "qr_code_sessions": QRCodeSession,
+    "password_reset_tokens": PasswordResetToken,
+    "revoked_tokens": RevokedToken,
+}
+
+
+def purge_expired(
+    db: Session, now: Optional[datetime] = None, batch_size: int = BATCH_SIZE
+) -> Dict[str, int]:
+    """Delete expired rows batch by batch, committing each; returns counts."""
+    now = now or datetime.utcnow()
+    purged = {}
+    for name, model in EXPIRING.items():
+        expired = (
+            select(model.id)
+            .where(model.expires_at < now)
+            .order_by(model.expires_at)
+            .limit(batch_size)
+        )
+        purged[name] = 0
+        while True:
+            deleted = db.execute(
+                delete(model)
+                .where(model.id.in_(expired.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            purged[name] += deleted
+            if deleted < batch_size:
+                break
+
+    logger.info("Expired login artifacts purged", extra=purged)
+    return purged
+
+
+def run_purge() -> Dict[str, int]:
+    """Purge expired rows in a session of its own."""
+    db = SessionLocal()
+    try:
+        return purge_expired(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
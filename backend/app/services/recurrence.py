@@ -0,0 +1,165 @@
+"""
+Recurrence engine for chores.
+
+Compiles a chore's recurrence fields into an immutable rule once and expands
+it lazily for any date window. The rules mirror the frontend's
+``isChoreOnDay`` helper so both sides agree on when a chore is due:
+
+- ``week_start`` is the anchor; nothing occurs before it or after
+  ``recurrence_end_date``.
+- daily: every ``recurrence_interval`` days from the anchor.
+- weekly: on ``recurrence_days`` (0=Sunday .. 6=Saturday, defaulting to the
+  anchor's weekday) of every ``recurrence_interval``-th week.
+- monthly: on the anchor's day of month every ``recurrence_interval`` months.
+- ``recurrence_count`` is the number of slots (times per day) per occurrence.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import FrozenSet, Iterator, NamedTuple, Optional
+
+from ..models.models import Chore
+
+RULE_CACHE_SIZE = 4096
+
+
+class Occurrence(NamedTuple):
+    chore_id: int
+    day: date
+    slots: int
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    chore_id: int
+    anchor: date
+    until: Optional[date]
+    kind: Optional[str]  # daily | weekly | monthly | None for one-off chores
+    interval: int
+    weekdays: FrozenSet[int]  # Python weekdays (0=Monday)
+    slots: int
+
+    def occurrences(self, start: date, end: date) -> Iterator[Occurrence]:
+        """Lazily yield occurrences between start and end (inclusive)."""
+        lo = max(start, self.anchor)
+        hi = min(end, self.until) if self.until else end
+        if lo > hi:
+            return
+
+        if self.kind == "daily":
+            days = _expand_daily(self.anchor, self.interval, lo, hi)
+        elif self.kind == "weekly":
+            days = _expand_weekly(self.anchor, self.interval, self.weekdays, lo, hi)
+        elif self.kind == "monthly":
+            days = _expand_monthly(self.anchor, self.interval, lo, hi)
+        else:
+            days = iter([self.anchor] if lo <= self.anchor <= hi else [])
+
+        for day in days:
+            yield Occurrence(self.chore_id, day, self.slots)
+
+
+def _expand_daily(anchor: date, interval: int, lo: date, hi: date) -> Iterator[date]:
+    offset = (lo - anchor).days
+    day = lo + timedelta(days=-offset % interval)
+    step = timedelta(days=interval)
+    while day <= hi:
+        yield day
+        day += step
+
+
+def _expand_weekly(
+    anchor: date, interval: int, weekdays: FrozenSet[int], lo: date, hi: date
+) -> Iterator[date]:
+    # Weeks are counted in 7-day blocks from the anchor, like date-fns
+    # differenceInWeeks, so a "week" need not start on Sunday.
+    block = (lo - anchor).days // 7
+    block += -block % interval
+    while True:
+        block_start = anchor + timedelta(days=block * 7)
+        if block_start > hi:
+            return
+        for i in range(7):
+            day = block_start + timedelta(days=i)
+            if day > hi:
+                return
+            if day >= lo and day.weekday() in weekdays:
+                yield day
+        block += interval
+
+
+def _expand_monthly(anchor: date, interval: int, lo: date, hi: date) -> Iterator[date]:
+    anchor_index = anchor.year * 12 + anchor.month - 1
+    index = lo.year * 12 + lo.month - 1
+    index += -(index - anchor_index) % interval
+    while True:
+        year, month = divmod(index, 12)
+        if date(year, month + 1, 1) > hi:
+            return
+        try:
+            day = date(year, month + 1, anchor.day)
+        except ValueError:
+            day = None  # e.g. the 31st in a 30-day month
+        if day is not None and lo <= day <= hi:
+            yield day
+        index += interval
+
+
+def week_start_of(day: date) -> date:
+    """Sunday on or before the given day (weeks start on Sunday, as in the UI)."""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def _parse_weekdays(value: Optional[str], anchor: date) -> FrozenSet[int]:
+    """Convert 0=Sunday day numbers into Python weekdays."""
+    days = [int(x) for x in value.split(",") if x.strip()] if value else []
+    if not days:
+        return frozenset({anchor.weekday()})
+    return frozenset((d - 1) % 7 for d in days)
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def _compile(
+    chore_id: int,
+    anchor: date,
+    is_recurring: bool,
+    kind: Optional[str],
+    interval: Optional[int],
+    days: Optional[str],
+    count: Optional[int],
+    until: Optional[date],
+) -> RecurrenceRule:
+    return RecurrenceRule(
+        chore_id=chore_id,
+        anchor=anchor,
+        until=until if is_recurring else None,
+        kind=kind if is_recurring else None,
+        interval=max(interval or 1, 1),
+        weekdays=_parse_weekdays(days, anchor),
+        slots=max(count or 1, 1),
+    )
+
+
+def compile_rule(chore: Chore) -> RecurrenceRule:
+    """
+    Compile a chore's recurrence fields into a rule.
+    Rules are cached on every field they depend on, so editing a chore
+    produces a new cache entry rather than a stale rule.
+    """
+    return _compile(
+        chore.id,
+        chore.week_start,
+        bool(chore.is_recurring),
+        chore.recurrence_type,
+        chore.recurrence_interval,
+        chore.recurrence_days,
+        chore.recurrence_count,
+        chore.recurrence_end_date,
+    )
+
+
+def expand(chores, start: date, end: date) -> Iterator[Occurrence]:
+    """Lazily yield occurrences of many chores within [start, end]."""
+    for chore in chores:
+        yield from compile_rule(chore).occurrences(start, end)
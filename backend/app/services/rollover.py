@@ -0,0 +1,194 @@
+"""
+Weekly rollover of recurring chore templates.
+
+A template is a recurring chore without ``parent_chore_id``. Rolling over a
+week creates one instance per template that is due that week, linked back via
+``parent_chore_id`` and copying the template's assignees. Inserts are
+set-based (INSERT ... SELECT in chunks of template ids) and idempotent per
+(template, week): existing instances are skipped and a unique constraint on
+``(parent_chore_id, week_start)`` backs that up.
+
+The recurrence engine (and the frontend) anchor a chore's schedule on
+``week_start``, so an instance is anchored on its template's first occurrence
+in the week and ends with the week. Weekly instances list the exact weekdays
+the template falls on that week with an interval of 1, because every-N-weeks
+blocks count from the template's own anchor.
+
+Listings show an instance in place of its template: a template is left out
+of any week range that holds one of its instances (see ``superseded``).
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, exists, insert, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from ..db.session import SessionLocal
+from ..models.models import Chore, ChoreAssignee
+from .chore_status import utc_today
+from .recurrence import compile_rule, week_start_of
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+# Columns copied verbatim from a template onto its weekly instance
+COPIED_COLUMNS = [
+    "family_id",
+    "title",
+    "description",
+    "emoji",
+    "point_value",
+    "assigned_to",
+    "is_group_chore",
+    "is_recurring",
+    "recurrence_type",
+    "recurrence_interval",
+    "recurrence_count",
+    "recurrence_days",
+    "recurrence_time_of_day",
+    "max_completions",
+]
+
+
+def next_week_start(today: Optional[date] = None) -> date:
+    """The week after today's UTC week, the day convention of the counters."""
+    return week_start_of(today or utc_today()) + timedelta(days=7)
+
+
+def superseded(week_from: Optional[date] = None, week_to: Optional[date] = None):
+    """
+    Criterion matching templates with an instance anchored in the range
+    (unbounded ends match any instance); listings show the instance instead.
+    """
+    instance = aliased(Chore)
+    criteria = [instance.parent_chore_id == Chore.id]
+    if week_from is not None:
+        criteria.append(instance.week_start >= week_from)
+    if week_to is not None:
+        criteria.append(instance.week_start <= week_to)
+    return exists().where(*criteria)
+
+
+def _due_templates(
+    db: Session, week: date
+) -> Dict[Tuple[date, Optional[str]], List[int]]:
+    """
+    Ids of templates with at least one occurrence in the week, grouped by
+    the instance's anchor and, for weekly templates, its recurrence_days.
+    """
+    week_end = week + timedelta(days=6)
+    templates = db.execute(
+        select(
+            Chore.id,
+            Chore.week_start,
+            Chore.is_recurring,
+            Chore.recurrence_type,
+            Chore.recurrence_interval,
+            Chore.recurrence_days,
+            Chore.recurrence_count,
+            Chore.recurrence_end_date,
+        )
+        .where(
+            Chore.is_recurring,
+            Chore.parent_chore_id.is_(None),
+            Chore.week_start <= week_end,
+            or_(
+                Chore.recurrence_end_date.is_(None),
+                Chore.recurrence_end_date >= week,
+            ),
+        )
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    due: Dict[Tuple[date, Optional[str]], List[int]] = {}
+    for row in templates:
+        days = [occ.day for occ in compile_rule(row).occurrences(week, week_end)]
+        if not days:
+            continue
+        weekdays = None
+        if row.recurrence_type == "weekly":
+            weekdays = ",".join(str((day.weekday() + 1) % 7) for day in days)
+        due.setdefault((days[0], weekdays), []).append(row.id)
+    return due
+
+
+def materialize_week(db: Session, week: date) -> Dict[str, int]:
+    """
+    Create the week's instances for every due template across all families.
+    Returns counts of instances and assignee links created. The caller commits.
+    """
+    week = week_start_of(week)
+    week_end = week + timedelta(days=6)
+    now = datetime.utcnow()
+    instance = aliased(Chore)
+    in_week = instance.week_start.between(week, week_end)
+    ends = case(
+        (Chore.recurrence_end_date < week_end, Chore.recurrence_end_date),
+        else_=literal(week_end),
+    )
+
+    created = 0
+    for (anchor, weekdays), due in _due_templates(db, week).items():
+        columns = {name: getattr(Chore, name) for name in COPIED_COLUMNS}
+        if weekdays is not None:
+            columns["recurrence_days"] = literal(weekdays)
+            columns["recurrence_interval"] = literal(1)
+        columns.update(
+            week_start=literal(anchor),
+            recurrence_end_date=ends,
+            parent_chore_id=Chore.id,
+            completed=literal(False),
+            completion_count=literal(0),
+            created_at=literal(now),
+        )
+        already_done = exists().where(instance.parent_chore_id == Chore.id, in_week)
+        for i in range(0, len(due), CHUNK_SIZE):
+            template_ids = due[i : i + CHUNK_SIZE]
+            created += db.execute(
+                insert(Chore).from_select(
+                    list(columns),
+                    select(*columns.values()).where(
+                        Chore.id.in_(template_ids), ~already_done
+                    ),
+                )
+            ).rowcount
+
+    # Copy assignees onto this week's instances that have none yet
+    template_link = aliased(ChoreAssignee)
+    has_links = exists().where(ChoreAssignee.chore_id == instance.id)
+    links = db.execute(
+        insert(ChoreAssignee).from_select(
+            ["chore_id", "user_id", "position"],
+            select(instance.id, template_link.user_id, template_link.position)
+            .join(template_link, template_link.chore_id == instance.parent_chore_id)
+            .where(
+                and_(
+                    in_week,
+                    instance.parent_chore_id.is_not(None),
+                    ~has_links,
+                )
+            ),
+        )
+    ).rowcount
+
+    logger.info(
+        "Weekly chore rollover complete",
+        extra={"week_start": week.isoformat(), "instances": created, "links": links},
+    )
+    return {"instances": created, "assignee_links": links}
+
+
+def run_rollover(week: Optional[date] = None) -> Dict[str, int]:
+    """Materialize a week (default: next week) in its own transaction."""
+    db = SessionLocal()
+    try:
+        result = materialize_week(db, week or next_week_start())
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,158 @@
+"""
+Verified-JWT cache and token revocation.
+
+Decoding a JWT means parsing it and checking its HMAC on every request, even
+when a kiosk sends the same token thousands of times a day. ``TokenCache``
+maps a token's SHA-256 digest to its verified claims until the token's
+``exp`` (or the cache TTL, if sooner), in a bounded LRU.
+
+Revocation never needs the database per request:
+
+- Logout stores the token's ``jti`` in ``revoked_tokens`` until the token
+  would have expired anyway, so it survives restarts and is shared by every
+  worker; the reaper purges expired rows. ``RevocationList`` is a per-process
+  cache in front of it: a token is looked up in the table only when it misses
+  the ``TokenCache``, so a logout on another worker takes effect there within
+  the cache TTL.
+- Every user token carries ``gen``, the user's ``token_generation`` when it
+  was issued. Bumping the column (password reset) invalidates all earlier
+  tokens; ``get_current_user`` compares it against the cached principal.
+"""
+
+import calendar
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..db.functions import upsert
+from ..models.models import RevokedToken
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    """Thread-safe LRU from token digest to claims, expiring with ``exp``."""
+
+    def __init__(
+        self, max_size: int, enabled: bool = True, ttl_seconds: Optional[float] = None
+    ):
+        self.max_size = max_size
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, claims: dict) -> None:
+        # Tokens without an expiry are verified every time
+        if not self.enabled or "exp" not in claims:
+            return
+        expires = float(claims["exp"])
+        if self.ttl_seconds is not None:
+            expires = min(expires, time.time() + self.ttl_seconds)
+        key = _digest(token)
+        with self._lock:
+            self._entries[key] = (expires, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class RevocationList:
+    """
+    Token ids revoked before their expiry: the ``revoked_tokens`` table, with
+    the ids seen by this process cached until they expire.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, db: Session, jti: str, exp: float) -> None:
+        """Record a revocation; the caller commits."""
+        table = RevokedToken.__table__
+        db.execute(
+            upsert(db)(table)
+            .values(jti=jti, expires_at=datetime.utcfromtimestamp(exp))
+            .on_conflict_do_nothing(index_elements=[table.c.jti])
+        )
+        self._remember(jti, exp)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """Whether this process knows the token is revoked; no I/O."""
+        return jti is not None and jti in self._revoked
+
+    def load(self, db: Session, jti: Optional[str]) -> bool:
+        """Whether the token is revoked, asking the database if not cached."""
+        if jti is None:
+            return False
+        if self.is_revoked(jti):
+            return True
+        expires_at = db.execute(
+            select(RevokedToken.expires_at).where(RevokedToken.jti == jti)
+        ).scalar_one_or_none()
+        if expires_at is None:
+            return False
+        self._remember(jti, calendar.timegm(expires_at.timetuple()))
+        return True
+
+    def _remember(self, jti: str, exp: float) -> None:
+        now = time.time()
+        with self._lock:
+            # Expired tokens fail verification anyway; drop them as we go
+            for stale in [j for j, e in self._revoked.items() if e <= now]:
+                del self._revoked[stale]
+            self._revoked[jti] = exp
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+token_cache = TokenCache(
+    max_size=settings.token_cache_size,
+    enabled=settings.token_cache_enabled,
+    ttl_seconds=settings.token_cache_ttl_seconds,
+)
+revoked_tokens = RevocationList()
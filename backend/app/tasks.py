@@ -0,0 +1,57 @@
+"""
+In-process periodic jobs started from the application lifespan.
+
+Jobs are plain synchronous callables run in the threadpool. They must be
+idempotent: every worker process runs its own copy of the schedule.
+"""
+
+import asyncio
+import logging
+from typing import Callable, List
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .services.reaper import run_purge
+from .services.rollover import run_rollover
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(name: str, interval: float, job: Callable[[], object]):
+    """Run a job now and then every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            result = await run_in_threadpool(job)
+            logger.info("Periodic job finished", extra={"job": name, "result": result})
+        except Exception:
+            logger.exception("Periodic job failed", extra={"job": name})
+        await asyncio.sleep(interval)
+
+
+def start_background_jobs() -> List[asyncio.Task]:
+    """Schedule the enabled periodic jobs on the running event loop."""
+    tasks = []
+    if settings.rollover_enabled:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "chore-rollover", settings.rollover_interval_seconds, run_rollover
+                )
+            )
+        )
+    if settings.reaper_enabled:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "expired-token-reaper", settings.reaper_interval_seconds, run_purge
+                )
+            )
+        )
+    return tasks
+
+
+async def stop_background_jobs(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
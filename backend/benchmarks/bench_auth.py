@@ -0,0 +1,138 @@
+"""
+Benchmark authenticated requests under concurrent load.
+
+Seeds a throwaway SQLite database with users and fires concurrent requests
+at ``/api/auth/me`` through the ASGI app, with the principal cache off so
+every request loads its user. A heartbeat coroutine measures event loop lag
+meanwhile: any blocking I/O on the loop shows up there.
+
+Runs twice: "inline" loads the user on the event loop, as
+``get_current_user`` used to, and "threadpool" is the current code. An
+artificial per-query delay stands in for the network round trip to a
+database server.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_auth [--requests 2000] [--concurrency 50]
+        [--db-latency-ms 2]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+_db_dir = tempfile.mkdtemp(prefix="tapestry-bench-")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-minimum-32-characters")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/auth.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("PRINCIPAL_CACHE_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.db.session import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.models import User  # noqa: E402
+from app.routers import auth  # noqa: E402
+
+USERS = 100
+
+
+def seed() -> list:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "id": u,
+                    "name": f"User {u}",
+                    "password_hash": "!",
+                    "role": "parent",
+                    "created_at": datetime.utcnow(),
+                }
+                for u in range(1, USERS + 1)
+            ],
+        )
+    return [
+        auth.create_access_token(data={"sub": str(u), "gen": 0})
+        for u in range(1, USERS + 1)
+    ]
+
+
+async def _inline(fn, *args):
+    return fn(*args)
+
+
+async def heartbeat(lags: list, stop: asyncio.Event) -> None:
+    interval = 0.005
+    while not stop.is_set():
+        began = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - began - interval)
+
+
+async def run(tokens: list, requests: int, concurrency: int) -> tuple:
+    lags: list = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    slots = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+
+        async def one(i: int) -> None:
+            async with slots:
+                token = tokens[i % len(tokens)]
+                response = await client.get(
+                    "/api/auth/me", headers={"Authorization": f"Bearer {token}"}
+                )
+                assert response.status_code == 200, response.text
+
+        began = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - began
+
+    stop.set()
+    await beat
+    lags.sort()
+    return elapsed, lags[len(lags) // 2], lags[int(len(lags) * 0.99)], lags[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    tokens = seed()
+    delay = args.db_latency_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def round_trip(*_):
+        time.sleep(delay)
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"{args.db_latency_ms} ms per query"
+    )
+    threadpool = auth.run_in_threadpool
+    for mode, offload in (("inline", _inline), ("threadpool", threadpool)):
+        auth.run_in_threadpool = offload
+        elapsed, p50, p99, worst = asyncio.run(
+            run(tokens, args.requests, args.concurrency)
+        )
+        print(
+            f"{mode:>10}: {args.requests / elapsed:8.1f} req/s"
+            f"  loop lag p50 {p50 * 1000:6.2f} ms"
+            f"  p99 {p99 * 1000:6.2f} ms  max {worst * 1000:6.2f} ms"
+        )
+    auth.run_in_threadpool = threadpool
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark password hashing throughput at different bcrypt costs.
+
+For each cost, a fixed number of hashes is submitted from many threads at
+once, the way concurrent logins arrive, first inline on the calling threads
+and then through the bounded process pool. Reports hashes per second and
+mean/max latency. The queue limit is lifted so nothing is shed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_passwords [--rounds 10 11 12] [--hashes 64]
+        [--workers 4] [--threads 32]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-minimum-32-characters")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.services.passwords import PasswordHasher  # noqa: E402
+
+
+def run(hasher: PasswordHasher, hashes: int, threads: int) -> float:
+    hasher.hash("warm up")  # start the worker processes outside the timing
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as callers:
+        list(callers.map(hasher.hash, (f"password {i}" for i in range(hashes))))
+    return time.perf_counter() - began
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12])
+    parser.add_argument("--hashes", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"{args.hashes} hashes from {args.threads} threads")
+    for rounds in args.rounds:
+        for workers in (0, args.workers):
+            hasher = PasswordHasher(workers, queue_limit=args.threads, rounds=rounds)
+            try:
+                elapsed = run(hasher, args.hashes, args.threads)
+            finally:
+                hasher.shutdown()
+            stats = hasher.stats()
+            mode = f"{workers} processes" if workers else "inline"
+            print(
+                f"cost {rounds:2d} {mode:>12}: {args.hashes / elapsed:8.1f} hashes/s"
+                f"  mean {stats['mean_seconds'] * 1000:8.1f} ms"
+                f"  max {stats['max_seconds'] * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
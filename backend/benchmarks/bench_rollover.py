@@ -0,0 +1,126 @@
+"""
+Benchmark the weekly chore rollover.
+
+Seeds a throwaway SQLite database with families that each own a handful of
+recurring templates (one assignee each), then materializes a week twice: the
+first run inserts every instance, the second finds nothing to do.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_rollover [--families 10000] [--templates 5]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime
+
+_db_dir = tempfile.mkdtemp(prefix="tapestry-bench-")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-minimum-32-characters")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/rollover.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.models import Chore, ChoreAssignee, FamilyGroup, User  # noqa: E402
+from app.services.rollover import materialize_week  # noqa: E402
+
+RULES = [
+    {"recurrence_type": "daily", "recurrence_count": 2},
+    {"recurrence_type": "weekly", "recurrence_days": "1,3,5"},
+    {"recurrence_type": "weekly", "recurrence_interval": 2, "recurrence_days": "0"},
+    {"recurrence_type": "monthly"},
+    {"recurrence_type": "daily", "recurrence_interval": 3},
+]
+
+
+def seed(families: int, templates: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(FamilyGroup),
+            [
+                {
+                    "id": f,
+                    "name": f"Family {f}",
+                    "admin_password_hash": "x",
+                    "created_at": now,
+                }
+                for f in range(1, families + 1)
+            ],
+        )
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "id": f,
+                    "name": f"User {f}",
+                    "email": f"user{f}@example.com",
+                    "family_id": f,
+                    "password_hash": "x",
+                    "role": "parent",
+                    "created_at": now,
+                }
+                for f in range(1, families + 1)
+            ],
+        )
+        chores = []
+        for f in range(1, families + 1):
+            for t in range(templates):
+                rule = {
+                    "recurrence_type": None,
+                    "recurrence_interval": None,
+                    "recurrence_count": None,
+                    "recurrence_days": None,
+                    **RULES[t % len(RULES)],
+                }
+                chores.append(
+                    {
+                        "id": (f - 1) * templates + t + 1,
+                        "family_id": f,
+                        "title": f"Chore {t}",
+                        "point_value": 1,
+                        "week_start": date(2024, 1, 1 + t),
+                        "is_recurring": True,
+                        "created_at": now,
+                        **rule,
+                    }
+                )
+        conn.execute(insert(Chore), chores)
+        conn.execute(
+            insert(ChoreAssignee),
+            [{"chore_id": c["id"], "user_id": c["family_id"]} for c in chores],
+        )
+
+
+def run(week: date) -> tuple[float, dict]:
+    db = SessionLocal()
+    try:
+        began = time.perf_counter()
+        result = materialize_week(db, week)
+        db.commit()
+        return time.perf_counter() - began, result
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--families", type=int, default=10000)
+    parser.add_argument("--templates", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.families, args.templates)
+    week = date(2024, 3, 3)
+    first, created = run(week)
+    second, repeat = run(week)
+
+    print(f"{args.families} families x {args.templates} templates")
+    print(f"first run:  {first * 1000:9.2f} ms  {created}")
+    print(f"second run: {second * 1000:9.2f} ms  {repeat}")
+
+
+if __name__ == "__main__":
+    main()
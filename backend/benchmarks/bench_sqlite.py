@@ -0,0 +1,175 @@
+"""
+Benchmark SQLite under concurrent reads and writes.
+
+Seeds a throwaway database with families, members and points, then runs
+reader threads (a leaderboard-style aggregate per family) next to writer
+threads (one point per transaction) for a fixed time. Compares the default
+single shared connection (``StaticPool``) with WAL mode, one writer and a
+pool of read-only connections.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_sqlite [--seconds 5] [--readers 8] [--writers 2]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+_db_dir = tempfile.mkdtemp(prefix="tapestry-bench-")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-minimum-32-characters")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/unused.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import create_engine, event, func, insert, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.session import (  # noqa: E402
+    Base,
+    RoutingSession,
+    create_sqlite_engine,
+)
+from app.models.models import FamilyGroup, Point, User  # noqa: E402
+
+FAMILIES = 200
+MEMBERS = 4
+POINTS_PER_MEMBER = 50
+
+
+def seed(url: str) -> None:
+    seed_engine = create_engine(url)
+    Base.metadata.create_all(bind=seed_engine)
+    now = datetime.utcnow()
+    with seed_engine.begin() as conn:
+        conn.execute(
+            insert(FamilyGroup),
+            [
+                {"id": f, "name": f"Family {f}", "admin_password_hash": "x"}
+                for f in range(1, FAMILIES + 1)
+            ],
+        )
+        users = FAMILIES * MEMBERS
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "id": u,
+                    "family_id": (u - 1) // MEMBERS + 1,
+                    "name": f"User {u}",
+                    "password_hash": "!",
+                    "role": "child",
+                }
+                for u in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            insert(Point),
+            [
+                {"user_id": u, "points": 1, "awarded_at": now - timedelta(hours=i)}
+                for u in range(1, users + 1)
+                for i in range(POINTS_PER_MEMBER)
+            ],
+        )
+    seed_engine.dispose()
+
+
+def default_sessions(url: str):
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    return sessionmaker(bind=engine, autoflush=False), [engine]
+
+
+def wal_sessions(url: str, readers: int):
+    writer = create_sqlite_engine(url, pool_size=1)
+    reader = create_sqlite_engine(url, pool_size=readers, read_only=True)
+    factory = sessionmaker(
+        class_=RoutingSession, writer=writer, reader=reader, autoflush=False
+    )
+    return factory, [writer, reader]
+
+
+def run(factory, seconds: float, readers: int, writers: int) -> dict:
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def read() -> None:
+        family = random.randint(1, FAMILIES)
+        with factory() as db:
+            db.execute(
+                select(User.id, func.coalesce(func.sum(Point.points), 0))
+                .outerjoin(Point, Point.user_id == User.id)
+                .where(User.family_id == family)
+                .group_by(User.id)
+            ).all()
+        return "reads"
+
+    def write() -> None:
+        with factory() as db:
+            db.execute(
+                insert(Point),
+                [{"user_id": random.randint(1, FAMILIES * MEMBERS), "points": 1}],
+            )
+            db.commit()
+        return "writes"
+
+    def worker(op) -> None:
+        while time.perf_counter() < deadline:
+            try:
+                key = op()
+            except Exception:
+                key = "errors"
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=worker, args=(read,)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=(write,)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(
+        f"{FAMILIES} families, {args.readers} readers, {args.writers} writers, "
+        f"{args.seconds:g} s each"
+    )
+    for mode in ("default", "wal"):
+        url = f"sqlite:///{_db_dir}/{mode}.db"
+        seed(url)
+        if mode == "wal":
+            factory, engines = wal_sessions(url, args.readers)
+        else:
+            factory, engines = default_sessions(url)
+        counts = run(factory, args.seconds, args.readers, args.writers)
+        for engine in engines:
+            engine.dispose()
+        print(
+            f"{mode:>8}: {counts['reads'] / args.seconds:8.1f} reads/s"
+            f"  {counts['writes'] / args.seconds:8.1f} writes/s"
+            f"  {counts['errors']} errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
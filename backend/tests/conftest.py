@@ -6,7 +6,7 @@ import os
 import pytest
 from typing import Generator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 # Set test environment variables BEFORE importing app modules
@@ -16,9 +16,15 @@ os.environ["ENVIRONMENT"] = "development"
 os.environ["LOG_LEVEL"] = "WARNING"
 os.environ["LOG_FORMAT"] = "text"
 os.environ["RATE_LIMIT_ENABLED"] = "false"
+# Cheap, inline password hashing keeps the suite fast
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["REAPER_ENABLED"] = "false"
 
 from app.main import app
 from app.db.session import Base, get_db
+from app.services.principal_cache import principal_cache
+from app.services.token_cache import revoked_tokens, token_cache
 
 
 # Create test database engine
@@ -50,6 +56,17 @@ def setup_test_database():
         os.remove("./test.db")
 
 
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    """Each test rolls back its users, so cached principals must not leak."""
+    caches = (principal_cache, token_cache, revoked_tokens)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
 @pytest.fixture(scope="function")
 def db_session() -> Generator:
     """Provide a test database session."""
@@ -64,6 +81,12 @@ def db_session() -> Generator:
     connection.close()
 
 
+@pytest.fixture
+def session_factory():
+    """Provide the test sessionmaker for tests that need committed data."""
+    return TestingSessionLocal
+
+
 @pytest.fixture(scope="function")
 def client(db_session) -> Generator:
     """Provide a test client with database session override."""
@@ -110,3 +133,39 @@ def auth_headers(client, test_user_data):
 
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def family(client, auth_headers):
+    """Create a family for the authenticated test user and return it."""
+    response = client.post(
+        "/api/families/",
+        json={"name": "Test Family", "admin_password": "adminpassword123"},
+        headers=auth_headers,
+    )
+    return response.json()
+
+
+@pytest.fixture
+def count_queries():
+    """Count SQL statements issued against the test engine inside a block."""
+
+    class QueryCounter:
+        def __init__(self):
+            self.statements = []
+
+        def __enter__(self):
+            event.listen(test_engine, "before_cursor_execute", self._record)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(test_engine, "before_cursor_execute", self._record)
+
+        def _record(self, conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+        @property
+        def count(self):
+            return len(self.statements)
+
+    return QueryCounter
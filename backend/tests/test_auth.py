@@ -2,7 +2,27 @@
 Tests for authentication endpoints.
 """
 
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
 import pytest
+from anyio import to_thread
+from fastapi import HTTPException
+
+from sqlalchemy import event, inspect
+
+from app.config import settings
+from app.models.models import PasswordResetToken, QRCodeSession, RevokedToken, User
+from app.routers import auth
+from app.services import passwords
+from app.services.passwords import PasswordHasher, hash_cost
+from app.services.principal_cache import principal_cache
+from app.services.qr_waiters import qr_waiters
+from app.services.reaper import purge_expired
+from app.services.token_cache import TokenCache, revoked_tokens, token_cache
+from tests.conftest import test_engine
 
 
 class TestSignup:
@@ -119,3 +139,451 @@ class TestAuthenticated:
             "/api/auth/me", headers={"Authorization": "Bearer invalid-token"}
         )
         assert response.status_code == 401
+
+
+def user_selects(statements):
+    return [
+        s for s in statements if s.lstrip().startswith("SELECT") and "FROM users" in s
+    ]
+
+
+class TestPrincipalCache:
+    """Tests for the authenticated-principal cache."""
+
+    def test_repeat_request_skips_user_lookup(
+        self, client, auth_headers, count_queries
+    ):
+        """Only the first authenticated request loads the user row."""
+        with count_queries() as first:
+            client.get("/api/auth/me", headers=auth_headers)
+        with count_queries() as second:
+            response = client.get("/api/auth/me", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["email"] == "test@example.com"
+        assert len(user_selects(first.statements)) == 1
+        assert user_selects(second.statements) == []
+
+    def test_miss_loads_user_off_the_event_loop(self, client, auth_headers):
+        """A cache miss loads the user on a worker thread, not the event loop."""
+        loops = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM users" in statement:
+                try:
+                    loops.append(asyncio.get_running_loop())
+                except RuntimeError:
+                    loops.append(None)
+
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            client.get("/api/auth/me", headers=auth_headers)
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+
+        assert loops == [None]
+
+    def test_update_evicts_cached_user(self, client, auth_headers):
+        """A cached user is reloaded after its row changes."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        client.put(
+            f"/api/users/{me['id']}", json={"name": "Renamed"}, headers=auth_headers
+        )
+
+        response = client.get("/api/auth/me", headers=auth_headers)
+        assert response.json()["name"] == "Renamed"
+
+    def test_user_recached_before_commit_is_evicted(
+        self, client, auth_headers, db_session
+    ):
+        """A row cached between an update's flush and its commit doesn't stick."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        user = db_session.get(User, me["id"])
+        columns = [attr.key for attr in inspect(User).column_attrs]
+        stale = User(**{key: getattr(user, key) for key in columns})
+
+        user.token_generation += 1
+        db_session.flush()
+        # A concurrent request still reads the committed row and caches it
+        principal_cache.put(stale)
+        db_session.commit()
+
+        assert principal_cache.cached(db_session, me["id"]) is None
+
+    def test_disabled_cache_always_loads(
+        self, client, auth_headers, count_queries, monkeypatch
+    ):
+        """With the cache disabled every request loads the user row."""
+        monkeypatch.setattr(principal_cache, "enabled", False)
+        client.get("/api/auth/me", headers=auth_headers)
+        with count_queries() as again:
+            client.get("/api/auth/me", headers=auth_headers)
+
+        assert len(user_selects(again.statements)) == 1
+        assert principal_cache.stats()["size"] == 0
+
+    def test_stats_count_hits_and_misses(self, client, auth_headers):
+        """The metrics endpoint reports cache hits and misses."""
+        before = client.get("/metricz").json()["principal_cache"]
+        for _ in range(3):
+            client.get("/api/auth/me", headers=auth_headers)
+
+        after = client.get("/metricz").json()["principal_cache"]
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 2
+
+
+class TestPasswordHashing:
+    """Tests for the bounded password hashing pool."""
+
+    def test_login_rehashes_at_new_cost(
+        self, client, test_user_data, db_session, monkeypatch
+    ):
+        """A hash made at an older cost is replaced on successful login."""
+        monkeypatch.setattr(auth.password_hasher, "rounds", 5)
+        client.post("/api/auth/signup", json=test_user_data)
+        monkeypatch.setattr(auth.password_hasher, "rounds", 4)
+
+        response = client.post(
+            "/api/auth/login",
+            json={
+                "email": test_user_data["email"],
+                "password": test_user_data["password"],
+            },
+        )
+        assert response.status_code == 200
+
+        user = db_session.query(User).filter_by(email=test_user_data["email"]).one()
+        assert hash_cost(user.password_hash) == 4
+
+    def test_full_queue_sheds_load(self, client, test_user_data, monkeypatch):
+        """Hashing beyond the queue limit is rejected with 503."""
+        busy = PasswordHasher(workers=0, queue_limit=0, rounds=4)
+        busy._slots.acquire()  # the only slot is taken
+        monkeypatch.setattr(auth, "password_hasher", busy)
+
+        response = client.post("/api/auth/signup", json=test_user_data)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert busy.stats()["rejected"] == 1
+
+    def test_login_burst_leaves_request_threads_free(
+        self, client, test_user_data, auth_headers, monkeypatch
+    ):
+        """Logins stuck on bcrypt hold few threads; other routes stay fast."""
+        hasher = PasswordHasher(
+            workers=0, queue_limit=settings.password_hash_queue_limit, rounds=4
+        )
+        monkeypatch.setattr(auth, "password_hasher", hasher)
+        released = threading.Event()
+        check = passwords._check
+
+        def slow_check(password, hashed):
+            released.wait(10)
+            return check(password, hashed)
+
+        monkeypatch.setattr(passwords, "_check", slow_check)
+        credentials = {
+            "email": test_user_data["email"],
+            "password": test_user_data["password"],
+        }
+        statuses = []
+
+        def login():
+            response = client.post("/api/auth/login", json=credentials)
+            statuses.append(response.status_code)
+
+        burst = [threading.Thread(target=login) for _ in range(40)]
+        for thread in burst:
+            thread.start()
+        try:
+            admitted = 1 + settings.password_hash_queue_limit
+            deadline = time.monotonic() + 10
+            while (
+                hasher.stats()["in_flight"] < admitted or len(statuses) < 40 - admitted
+            ) and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            limiter = client.portal.call(to_thread.current_default_thread_limiter)
+            assert limiter.borrowed_tokens <= limiter.total_tokens // 4
+            began = time.monotonic()
+            response = client.get("/api/auth/me", headers=auth_headers)
+            assert response.status_code == 200
+            assert time.monotonic() - began < 1
+        finally:
+            released.set()
+            for thread in burst:
+                thread.join(timeout=10)
+
+        assert statuses.count(200) == admitted
+        assert statuses.count(503) == 40 - admitted
+
+    def test_batches_hold_a_slot_per_password(self):
+        """hash_many counts every password against the queue limit."""
+        hasher = PasswordHasher(workers=0, queue_limit=2, rounds=4)
+        hashes = hasher.hash_many(["a", "b", "c", "d", "e"])
+        assert len(hashes) == 5 and hasher.verify("c", hashes[2])
+        assert hasher.stats()["completed"] == 6  # five hashes and one check
+
+        # A round takes at most one slot per worker, and only free ones
+        pooled = PasswordHasher(workers=2, queue_limit=1, rounds=4)
+        with pooled._admitted(2) as first, pooled._admitted(2) as second:
+            assert (first, second) == (2, 1)
+            assert pooled.stats()["in_flight"] == 3
+            with pytest.raises(HTTPException) as exc:
+                pooled.hash_many(["a"])
+        assert exc.value.status_code == 503
+
+    def test_process_pool_hashes_and_verifies(self):
+        """Hashes made in the worker processes verify, and latency is recorded."""
+        hasher = PasswordHasher(workers=1, queue_limit=1, rounds=4)
+        try:
+            hashed = hasher.hash("correct horse")
+            assert hasher.verify("correct horse", hashed)
+            assert not hasher.verify("wrong horse", hashed)
+        finally:
+            hasher.shutdown()
+
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["in_flight"] == 0
+        assert stats["max_seconds"] > 0
+
+
+class TestTokenCache:
+    """Tests for the verified-JWT cache and token revocation."""
+
+    def test_repeat_request_skips_verification(self, client, auth_headers, monkeypatch):
+        """A token's signature is verified once, then served from the cache."""
+        calls = []
+        verify = auth._verify_token
+        monkeypatch.setattr(
+            auth, "_verify_token", lambda token: calls.append(token) or verify(token)
+        )
+        for _ in range(3):
+            assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+        assert len(calls) == 1
+
+    def test_expired_entries_are_dropped(self):
+        """Claims are only served until the token's exp."""
+        cache = TokenCache(max_size=2)
+        cache.put("live", {"sub": "1", "exp": time.time() + 60})
+        cache.put("dead", {"sub": "2", "exp": time.time() - 1})
+        cache.put("no-exp", {"sub": "3"})
+
+        assert cache.get("live")["sub"] == "1"
+        assert cache.get("dead") is None
+        assert cache.get("no-exp") is None
+
+    def test_logout_revokes_only_that_token(self, client, auth_headers, test_user_data):
+        """A logged-out token is rejected while other sessions keep working."""
+        login = client.post(
+            "/api/auth/login",
+            json={
+                "email": test_user_data["email"],
+                "password": test_user_data["password"],
+            },
+        )
+        other = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        assert client.post("/api/auth/logout", headers=auth_headers).status_code == 200
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 401
+        assert client.get("/api/auth/me", headers=other).status_code == 200
+
+    def test_logout_survives_a_restart(self, client, auth_headers):
+        """A logged-out token stays rejected once the process caches are gone."""
+        assert client.post("/api/auth/logout", headers=auth_headers).status_code == 200
+        # What a restart or another worker starts with
+        token_cache.clear()
+        revoked_tokens.clear()
+
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 401
+
+    def test_logout_elsewhere_applies_after_the_ttl(
+        self, client, auth_headers, db_session, monkeypatch
+    ):
+        """Cached claims are rechecked against the table once the TTL passes."""
+        monkeypatch.setattr(token_cache, "ttl_seconds", 0)
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+        # Another worker logs the token out
+        token = auth_headers["Authorization"].split()[1]
+        claims = auth._verify_token(token)
+        db_session.add(
+            RevokedToken(
+                jti=claims["jti"], expires_at=datetime.utcfromtimestamp(claims["exp"])
+            )
+        )
+        db_session.flush()
+
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 401
+
+    def test_password_reset_revokes_earlier_tokens(
+        self, client, auth_headers, test_user_data, db_session
+    ):
+        """Resetting the password invalidates every token issued before it."""
+        client.post(
+            "/api/auth/forgot-password", json={"email": test_user_data["email"]}
+        )
+        reset = db_session.query(PasswordResetToken).one()
+        response = client.post(
+            "/api/auth/reset-password",
+            json={"token": reset.token, "new_password": "new-password-123"},
+        )
+        assert response.status_code == 200
+
+        stale = client.get("/api/auth/me", headers=auth_headers)
+        assert stale.status_code == 401
+        assert stale.json()["detail"] == "Token has been revoked"
+
+        login = client.post(
+            "/api/auth/login",
+            json={"email": test_user_data["email"], "password": "new-password-123"},
+        )
+        fresh = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        assert client.get("/api/auth/me", headers=fresh).status_code == 200
+
+
+class TestQRCodeWait:
+    """Tests for the QR code login long-poll."""
+
+    def start_session(self, client):
+        return client.post("/api/auth/qr-code/generate").json()["session_token"]
+
+    def test_scan_releases_waiter(self, client, auth_headers):
+        """A waiting kiosk gets its token as soon as the scan commits."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        token = self.start_session(client)
+        result = {}
+
+        def wait():
+            result["response"] = client.get(
+                f"/api/auth/qr-code/wait/{token}", params={"timeout": 30}
+            )
+
+        waiter = threading.Thread(target=wait)
+        began = time.monotonic()
+        waiter.start()
+        while not len(qr_waiters):
+            time.sleep(0.01)
+        client.post(
+            "/api/auth/qr-code/scan",
+            json={"session_token": token, "user_id": me["id"]},
+        )
+        waiter.join(timeout=10)
+
+        assert time.monotonic() - began < 5
+        body = result["response"].json()
+        assert body["status"] == "scanned"
+        access = {"Authorization": f"Bearer {body['access_token']}"}
+        assert client.get("/api/auth/me", headers=access).json()["id"] == me["id"]
+        assert len(qr_waiters) == 0
+
+    def test_times_out_pending(self, client):
+        """Without a scan the wait ends with "pending" after the timeout."""
+        token = self.start_session(client)
+        response = client.get(f"/api/auth/qr-code/wait/{token}", params={"timeout": 1})
+        assert response.json()["status"] == "pending"
+        assert response.json()["expires_at"] is not None
+
+    def test_scan_on_another_worker_found_by_final_check(
+        self, client, auth_headers, db_session
+    ):
+        """A scan that sets no event here is still picked up at timeout."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        token = self.start_session(client)
+        result = {}
+
+        def wait():
+            result["response"] = client.get(
+                f"/api/auth/qr-code/wait/{token}", params={"timeout": 1}
+            )
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        while not len(qr_waiters):
+            time.sleep(0.01)
+        # Scan behind the registry's back, as another worker would
+        qr_session = (
+            db_session.query(QRCodeSession).filter_by(session_token=token).one()
+        )
+        qr_session.scanned = True
+        qr_session.user_id = me["id"]
+        db_session.flush()
+        waiter.join(timeout=10)
+
+        assert result["response"].json()["status"] == "scanned"
+
+    def test_scan_right_after_first_check_releases_waiter(
+        self, client, auth_headers, monkeypatch
+    ):
+        """A scan landing just after the first check still wakes the kiosk."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        token = self.start_session(client)
+        status = auth._qr_code_status
+        checks = []
+
+        def check_then_scan(db, session_token):
+            result = status(db, session_token)
+            if not checks:
+                qr_session = db.query(QRCodeSession).filter_by(
+                    session_token=session_token
+                )
+                qr_session.update({"scanned": True, "user_id": me["id"]})
+                qr_waiters.notify(session_token)
+            checks.append(result.status)
+            return result
+
+        monkeypatch.setattr(auth, "_qr_code_status", check_then_scan)
+        began = time.monotonic()
+        response = client.get(f"/api/auth/qr-code/wait/{token}", params={"timeout": 30})
+
+        assert time.monotonic() - began < 5
+        assert checks == ["pending", "scanned"]
+        assert response.json()["status"] == "scanned"
+
+    def test_unknown_session_is_expired(self, client):
+        """Unknown tokens return immediately."""
+        response = client.get("/api/auth/qr-code/wait/nope", params={"timeout": 30})
+        assert response.json()["status"] == "expired"
+
+
+class TestReaper:
+    """Tests for the purge of expired login artifacts."""
+
+    def test_purges_expired_rows_in_batches(self, client, auth_headers, db_session):
+        """Expired sessions, reset tokens and revocations go; live ones stay."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        now = datetime(2024, 6, 1, 12, 0)
+        past, future = now - timedelta(minutes=1), now + timedelta(minutes=5)
+        db_session.add_all(
+            [QRCodeSession(session_token=f"qr-{i}", expires_at=past) for i in range(5)]
+            + [QRCodeSession(session_token="live", expires_at=future)]
+            + [
+                PasswordResetToken(
+                    user_id=me["id"], token=f"reset-{i}", expires_at=past, used=i == 0
+                )
+                for i in range(2)
+            ]
+            + [RevokedToken(jti=f"jti-{i}", expires_at=past) for i in range(3)]
+            + [RevokedToken(jti="live", expires_at=future)]
+        )
+        db_session.flush()
+
+        purged = purge_expired(db_session, now=now, batch_size=2)
+
+        assert purged == {
+            "qr_code_sessions": 5,
+            "password_reset_tokens": 2,
+            "revoked_tokens": 3,
+        }
+        remaining = db_session.query(QRCodeSession.session_token).all()
+        assert [row.session_token for row in remaining] == ["live"]
+        assert db_session.query(PasswordResetToken).count() == 0
+        assert [row.jti for row in db_session.query(RevokedToken.jti)] == ["live"]
+        assert purge_expired(db_session, now=now) == {
+            "qr_code_sessions": 0,
+            "password_reset_tokens": 0,
+            "revoked_tokens": 0,
+        }
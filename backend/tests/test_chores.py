@@ -0,0 +1,817 @@
+"""
+Tests for chore endpoints.
+"""
+
+import json
+import threading
+import time
+from datetime import date
+
+from fastapi import HTTPException
+
+from app.models.models import (
+    Chore,
+    ChoreDailyCount,
+    DailyPointRollup,
+    FamilyGroup,
+    Point,
+    User,
+    UserPointTotal,
+)
+from app.services.chore_completion import CompletionBatch
+from app.services.chore_counters import rebuild_completion_counters
+from app.services.chore_status import utc_today
+from app.services.recurrence import expand
+from app.services import rollover
+from app.services.rollover import materialize_week
+
+
+def make_chore(client, headers, family_id, **overrides):
+    """Create a chore through the API and return its JSON."""
+    payload = {
+        "family_id": family_id,
+        "title": "Feed the dog",
+        "point_value": 2,
+        "week_start": date.today().isoformat(),
+    }
+    payload.update(overrides)
+    response = client.post("/api/chores/", json=payload, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+class TestListChores:
+    """Tests for listing chores."""
+
+    def test_completed_today_for_recurring_chores(self, client, auth_headers, family):
+        """Recurring chores report completed_today once the daily limit is hit."""
+        done = make_chore(
+            client, auth_headers, family["id"], is_recurring=True, recurrence_count=1
+        )
+        pending = make_chore(
+            client, auth_headers, family["id"], is_recurring=True, recurrence_count=2
+        )
+        for chore in (done, pending):
+            response = client.post(
+                f"/api/chores/{chore['id']}/complete", headers=auth_headers
+            )
+            assert response.status_code == 200
+
+        response = client.get("/api/chores/", headers=auth_headers)
+        assert response.status_code == 200
+        by_id = {c["id"]: c for c in response.json()}
+        assert by_id[done["id"]]["completed_today"] is True
+        assert by_id[pending["id"]]["completed_today"] is False
+
+    def test_query_count_is_constant(self, client, auth_headers, family, count_queries):
+        """Listing chores issues the same number of statements for 1 or 30 chores."""
+        make_chore(client, auth_headers, family["id"], is_recurring=True)
+        with count_queries() as single:
+            client.get("/api/chores/", headers=auth_headers)
+
+        for _ in range(29):
+            make_chore(client, auth_headers, family["id"], is_recurring=True)
+        with count_queries() as many:
+            response = client.get("/api/chores/", headers=auth_headers)
+
+        assert len(response.json()) == 30
+        # chores, assignee and completer links, completion counts; the current
+        # user comes from the principal cache
+        assert single.count == many.count == 4
+
+
+class TestAssignees:
+    """Tests for multi-assignee chores backed by association tables."""
+
+    def test_assigned_to_ids_round_trip(self, client, auth_headers, family):
+        """assigned_to_ids keeps its comma-separated contract."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        chore = make_chore(
+            client, auth_headers, family["id"], assigned_to_ids=f"{me['id']}"
+        )
+        assert chore["assigned_to_ids"] == str(me["id"])
+        assert chore["completed_by_ids"] is None
+
+        response = client.put(
+            f"/api/chores/{chore['id']}",
+            json={"assigned_to_ids": None},
+            headers=auth_headers,
+        )
+        assert response.json()["assigned_to_ids"] is None
+
+    def test_assignees_keep_their_order(self, client, auth_headers, family, db_session):
+        """assigned_to_ids comes back in the order the client stored it."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        kids = [
+            User(family_id=family["id"], name=name, password_hash="x", role="child")
+            for name in ("Ann", "Bob")
+        ]
+        db_session.add_all(kids)
+        db_session.flush()
+        ann, bob = (kid.id for kid in kids)
+
+        stored = f"{bob},{me['id']},{ann}"
+        chore = make_chore(client, auth_headers, family["id"], assigned_to_ids=stored)
+        assert chore["assigned_to_ids"] == stored
+        listed = client.get("/api/chores/", headers=auth_headers).json()
+        assert listed[0]["assigned_to_ids"] == stored
+
+        response = client.put(
+            f"/api/chores/{chore['id']}",
+            json={"assigned_to_ids": f"{ann},{bob},{ann}"},
+            headers=auth_headers,
+        )
+        assert response.json()["assigned_to_ids"] == f"{ann},{bob}"
+
+    def test_individual_completion_tracks_completed_by(
+        self, client, auth_headers, family
+    ):
+        """Individual chores record and clear who completed them."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        chore = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            assigned_to_ids=str(me["id"]),
+            is_group_chore=False,
+        )
+        url = f"/api/chores/{chore['id']}/complete"
+
+        done = client.post(url, headers=auth_headers).json()
+        assert done["completed_by_ids"] == str(me["id"])
+        assert done["completed"] is True
+
+        undone = client.post(url, headers=auth_headers).json()
+        assert undone["completed_by_ids"] is None
+        assert undone["completed"] is False
+
+    def test_my_chores(self, client, auth_headers, family):
+        """/mine returns only chores assigned to the current user."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        mine = make_chore(
+            client, auth_headers, family["id"], assigned_to_ids=str(me["id"])
+        )
+        legacy = make_chore(client, auth_headers, family["id"], assigned_to=me["id"])
+        make_chore(client, auth_headers, family["id"])
+
+        response = client.get("/api/chores/mine", headers=auth_headers)
+        assert response.status_code == 200
+        assert {c["id"] for c in response.json()} == {mine["id"], legacy["id"]}
+
+
+class TestCompletionCounters:
+    """Tests for the denormalized recurring completion counters."""
+
+    def test_daily_limit_is_enforced(self, client, auth_headers, family):
+        """The daily limit is read from the per-day counter."""
+        chore = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            is_recurring=True,
+            recurrence_count=2,
+        )
+        url = f"/api/chores/{chore['id']}/complete"
+
+        assert client.post(url, headers=auth_headers).status_code == 200
+        assert client.post(url, headers=auth_headers).status_code == 200
+        response = client.post(url, headers=auth_headers)
+        assert response.status_code == 400
+        assert "Daily completion limit" in response.json()["detail"]
+
+    def test_rebuild_repairs_drift(self, client, auth_headers, family, db_session):
+        """Rebuilding the counters restores them from the points ledger."""
+        chore = make_chore(client, auth_headers, family["id"], is_recurring=True)
+        client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+
+        row = db_session.get(Chore, chore["id"])
+        row.completion_count = 42
+        db_session.query(ChoreDailyCount).delete()
+        db_session.flush()
+
+        result = rebuild_completion_counters(db_session)
+        db_session.expire_all()
+
+        assert result["drifted_chores"] == 1
+        assert db_session.get(Chore, chore["id"]).completion_count == 1
+        assert db_session.query(ChoreDailyCount).count() == 1
+
+    def test_rescheduling_recounts_from_the_ledger(
+        self, client, auth_headers, family, db_session
+    ):
+        """Counters follow the slots left after a recurring/one-off round trip."""
+        chore = make_chore(
+            client, auth_headers, family["id"], is_recurring=True, max_completions=2
+        )
+        url = f"/api/chores/{chore['id']}"
+        assert client.post(f"{url}/complete", headers=auth_headers).status_code == 200
+
+        # As a one-off chore, completing and uncompleting drops its points
+        client.put(url, json={"is_recurring": False}, headers=auth_headers)
+        client.post(f"{url}/complete", headers=auth_headers)
+        client.post(f"{url}/complete", headers=auth_headers)
+        client.put(url, json={"is_recurring": True}, headers=auth_headers)
+
+        response = client.post(f"{url}/complete", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        db_session.expire_all()
+        slots = db_session.query(Point).filter_by(chore_id=chore["id"]).count()
+        assert db_session.get(Chore, chore["id"]).completion_count == slots == 1
+        today = db_session.get(ChoreDailyCount, (chore["id"], utc_today()))
+        assert today.count == 1
+
+    def test_days_are_utc_whatever_the_server_zone(
+        self, client, auth_headers, family, db_session, monkeypatch
+    ):
+        """Counters and rollups both use the UTC date of the completion."""
+        # At any instant at least one of these zones is on a different date
+        # than UTC
+        try:
+            for zone in ("Etc/GMT-14", "Etc/GMT+12"):
+                monkeypatch.setenv("TZ", zone)
+                time.tzset()
+                chore = make_chore(
+                    client, auth_headers, family["id"], is_recurring=True
+                )
+                client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+
+                point = db_session.query(Point).filter_by(chore_id=chore["id"]).one()
+                bucket = db_session.query(ChoreDailyCount).filter_by(
+                    chore_id=chore["id"]
+                )
+                rollup = db_session.query(DailyPointRollup).filter_by(
+                    user_id=point.user_id
+                )
+                assert point.slot_day == point.awarded_at.date()
+                assert bucket.one().day == point.awarded_at.date()
+                assert point.awarded_at.date() in {r.day for r in rollup}
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+
+class TestCompletionHistory:
+    """Tests for the paginated and streamed completion history."""
+
+    def test_keyset_pages_and_total(self, client, auth_headers, family, count_queries):
+        """Pages walk newest first; the total comes from the counter."""
+        chore = make_chore(
+            client, auth_headers, family["id"], is_recurring=True, recurrence_count=3
+        )
+        url = f"/api/chores/{chore['id']}/completions"
+        for _ in range(3):
+            client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+
+        with count_queries() as counter:
+            first = client.get(url, params={"limit": 2}, headers=auth_headers)
+        assert first.status_code == 200
+        assert first.headers["X-Total-Count"] == "3"
+        assert not any("count(" in s.lower() for s in counter.statements)
+
+        second = client.get(
+            url,
+            params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+            headers=auth_headers,
+        )
+        assert "X-Next-Cursor" not in second.headers
+        ids = [c["id"] for c in first.json() + second.json()]
+        assert ids == sorted(ids, reverse=True) and len(ids) == 3
+
+    def test_ndjson_stream(self, client, auth_headers, family):
+        """format=ndjson streams one completion per line."""
+        chore = make_chore(
+            client, auth_headers, family["id"], is_recurring=True, recurrence_count=2
+        )
+        for _ in range(2):
+            client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+
+        response = client.get(
+            f"/api/chores/{chore['id']}/completions",
+            params={"format": "ndjson"},
+            headers=auth_headers,
+        )
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 2
+        assert lines[0]["points_awarded"] == chore["point_value"]
+
+
+class TestOccurrences:
+    """Tests for server-side occurrence expansion."""
+
+    def test_occurrences_window(self, client, auth_headers, family):
+        """Recurring and one-off chores are expanded within the window."""
+        daily = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-01-01",
+            is_recurring=True,
+            recurrence_type="daily",
+            recurrence_time_of_day="morning",
+        )
+        once = make_chore(client, auth_headers, family["id"], week_start="2024-01-02")
+
+        response = client.get(
+            "/api/chores/occurrences",
+            params={"start": "2024-01-01", "end": "2024-01-03"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        pairs = [(o["chore_id"], o["date"]) for o in response.json()]
+        assert pairs.count((daily["id"], "2024-01-02")) == 1
+        assert len([p for p in pairs if p[0] == daily["id"]]) == 3
+        assert [p for p in pairs if p[0] == once["id"]] == [(once["id"], "2024-01-02")]
+
+    def test_occurrences_rejects_inverted_window(self, client, auth_headers, family):
+        """An end date before the start date is rejected."""
+        response = client.get(
+            "/api/chores/occurrences",
+            params={"start": "2024-01-03", "end": "2024-01-01"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
+
+class TestRollover:
+    """Tests for the weekly rollover of recurring chore templates."""
+
+    def test_rollover_is_idempotent(self, client, auth_headers, family, db_session):
+        """Due templates get one instance per week, with their assignees."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        weekly = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-01-07",
+            is_recurring=True,
+            recurrence_type="weekly",
+            recurrence_days="1",
+            assigned_to_ids=str(me["id"]),
+        )
+        # Monthly on the 7th: not due in the week of 2024-01-14
+        make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-01-07",
+            is_recurring=True,
+            recurrence_type="monthly",
+        )
+
+        first = materialize_week(db_session, date(2024, 1, 17))
+        second = materialize_week(db_session, date(2024, 1, 14))
+
+        assert first == {"instances": 1, "assignee_links": 1}
+        assert second == {"instances": 0, "assignee_links": 0}
+        instance = db_session.query(Chore).filter_by(parent_chore_id=weekly["id"]).one()
+        assert instance.week_start == date(2024, 1, 15)  # the Monday
+        assert instance.recurrence_end_date == date(2024, 1, 20)
+        assert instance.assignee_ids == [me["id"]]
+
+    def test_instances_keep_their_templates_schedule(
+        self, client, auth_headers, family, db_session
+    ):
+        """Each instance occurs on exactly its template's days in that week."""
+        schedules = [
+            # Mon and Fri every other week, counted from a Wednesday
+            dict(
+                recurrence_type="weekly", recurrence_interval=2, recurrence_days="1,5"
+            ),
+            dict(recurrence_type="weekly"),  # the anchor's weekday
+            dict(recurrence_type="monthly"),  # the 17th
+            dict(recurrence_type="daily", recurrence_interval=3),
+        ]
+        templates = [
+            make_chore(
+                client,
+                auth_headers,
+                family["id"],
+                week_start="2023-12-27" if i == 0 else "2023-11-17",
+                is_recurring=True,
+                **schedule,
+            )
+            for i, schedule in enumerate(schedules)
+        ]
+        week = date(2024, 1, 14)
+        week_end = date(2024, 1, 20)
+
+        assert materialize_week(db_session, week)["instances"] == len(templates)
+        for template in templates:
+            instance = (
+                db_session.query(Chore).filter_by(parent_chore_id=template["id"]).one()
+            )
+            expected = [
+                occ.day
+                for occ in expand(
+                    [db_session.get(Chore, template["id"])], week, week_end
+                )
+            ]
+            actual = [occ.day for occ in expand([instance], week, week_end)]
+            assert actual == expected != []
+
+        # Listings show the instances in place of their templates
+        listed = client.get("/api/chores/", headers=auth_headers).json()
+        assert {c["parent_chore_id"] for c in listed} == {t["id"] for t in templates}
+
+    def test_rolled_over_week_is_listed_as_instances(
+        self, client, auth_headers, family, db_session
+    ):
+        """The public listings serve a rolled-over week from its instances."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        template = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-01-07",
+            is_recurring=True,
+            recurrence_type="weekly",
+            recurrence_days="1,3",
+            assigned_to_ids=str(me["id"]),
+        )
+        materialize_week(db_session, date(2024, 1, 14))
+        instance = db_session.query(Chore).filter_by(parent_chore_id=template["id"])
+        instance_id = instance.one().id
+
+        def listed(week_from, week_to):
+            response = client.get(
+                "/api/chores/",
+                params={"week_start_from": week_from, "week_start_to": week_to},
+                headers=auth_headers,
+            )
+            assert response.status_code == 200
+            return [c["id"] for c in response.json()]
+
+        assert listed("2024-01-14", "2024-01-20") == [instance_id]
+        # Weeks that were not rolled over still come from the template
+        assert listed("2024-01-07", "2024-01-13") == [template["id"]]
+        assert listed("2024-01-21", "2024-01-27") == [template["id"]]
+
+        mine = client.get("/api/chores/mine", headers=auth_headers).json()
+        assert [c["id"] for c in mine] == [instance_id]
+
+        occurrences = client.get(
+            "/api/chores/occurrences",
+            params={"start": "2024-01-07", "end": "2024-01-27"},
+            headers=auth_headers,
+        ).json()
+        assert sorted((o["date"], o["chore_id"]) for o in occurrences) == [
+            ("2024-01-08", template["id"]),
+            ("2024-01-10", template["id"]),
+            ("2024-01-15", instance_id),
+            ("2024-01-17", instance_id),
+            ("2024-01-22", template["id"]),
+            ("2024-01-24", template["id"]),
+        ]
+
+        response = client.post(
+            f"/api/chores/{instance_id}/complete", headers=auth_headers
+        )
+        assert response.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Chore, instance_id).completion_count == 1
+
+    def rolled_over_template(self, client, auth_headers, family, db_session):
+        template = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-01-07",
+            is_recurring=True,
+            recurrence_type="daily",
+        )
+        materialize_week(db_session, date(2024, 1, 14))
+        return {
+            "family_id": family["id"],
+            "title": "Feed the dog",
+            "point_value": 2,
+            "week_start": "2024-01-14",
+            "parent_chore_id": template["id"],
+        }
+
+    def test_creating_a_duplicate_instance_is_a_conflict(
+        self, client, auth_headers, family, db_session
+    ):
+        """A client-made instance for a week the rollover filled gets a 409."""
+        payload = self.rolled_over_template(client, auth_headers, family, db_session)
+        response = client.post("/api/chores/", json=payload, headers=auth_headers)
+        assert response.status_code == 409
+
+    def test_linking_a_duplicate_instance_is_a_conflict(
+        self, client, auth_headers, family, db_session
+    ):
+        """Linking a chore to a template's filled week gets a 409."""
+        payload = self.rolled_over_template(client, auth_headers, family, db_session)
+        parent_chore_id = payload.pop("parent_chore_id")
+        own = client.post("/api/chores/", json=payload, headers=auth_headers)
+        assert own.status_code == 200
+
+        response = client.put(
+            f"/api/chores/{own.json()['id']}",
+            json={"parent_chore_id": parent_chore_id},
+            headers=auth_headers,
+        )
+        assert response.status_code == 409
+
+    def test_next_week_follows_the_utc_day(self, monkeypatch):
+        """The default week is computed from the UTC date, not the local one."""
+        monkeypatch.setattr(rollover, "utc_today", lambda: date(2024, 1, 20))
+        assert rollover.next_week_start() == date(2024, 1, 21)
+
+    def test_deleting_a_template_deletes_its_instances(
+        self, client, auth_headers, family, db_session
+    ):
+        """Rolled-over instances go with their template instead of blocking it."""
+        template = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-01-07",
+            is_recurring=True,
+            recurrence_type="daily",
+        )
+        materialize_week(db_session, date(2024, 1, 14))
+        materialize_week(db_session, date(2024, 1, 21))
+
+        response = client.delete(f"/api/chores/{template['id']}", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert db_session.query(Chore).filter_by(family_id=family["id"]).count() == 0
+
+
+class TestChoreFilters:
+    """Tests for filtered, keyset-paginated chore listing."""
+
+    def test_week_range_and_recurring_filters(self, client, auth_headers, family):
+        """week_start range and is_recurring narrow the listing."""
+        old = make_chore(client, auth_headers, family["id"], week_start="2023-01-02")
+        current = make_chore(
+            client, auth_headers, family["id"], week_start="2024-01-01"
+        )
+        recurring = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-01-01",
+            is_recurring=True,
+        )
+
+        response = client.get(
+            "/api/chores/",
+            params={"week_start_from": "2024-01-01", "week_start_to": "2024-01-07"},
+            headers=auth_headers,
+        )
+        ids = [c["id"] for c in response.json()]
+        assert old["id"] not in ids
+        assert ids == [current["id"], recurring["id"]]
+
+        response = client.get(
+            "/api/chores/", params={"is_recurring": "false"}, headers=auth_headers
+        )
+        assert {c["id"] for c in response.json()} == {old["id"], current["id"]}
+
+    def test_week_range_includes_running_recurring_chores(
+        self, client, auth_headers, family
+    ):
+        """A recurring chore anchored weeks ago still shows in later weeks."""
+        running = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2023-11-06",
+            is_recurring=True,
+            recurrence_type="weekly",
+        )
+        ended = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2023-11-06",
+            is_recurring=True,
+            recurrence_type="weekly",
+            recurrence_end_date="2023-12-31",
+        )
+        later = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            week_start="2024-02-05",
+            is_recurring=True,
+        )
+
+        response = client.get(
+            "/api/chores/",
+            params={"week_start_from": "2024-01-01", "week_start_to": "2024-01-07"},
+            headers=auth_headers,
+        )
+        ids = [c["id"] for c in response.json()]
+        assert running["id"] in ids
+        assert ended["id"] not in ids
+        assert later["id"] not in ids
+
+    def test_completed_filter_uses_todays_state(self, client, auth_headers, family):
+        """Recurring chores match completed=true only once today's limit is hit."""
+        done = make_chore(client, auth_headers, family["id"], is_recurring=True)
+        pending = make_chore(
+            client, auth_headers, family["id"], is_recurring=True, recurrence_count=2
+        )
+        one_off = make_chore(client, auth_headers, family["id"])
+        for chore in (done, pending, one_off):
+            client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+        todo = make_chore(client, auth_headers, family["id"])
+
+        def listed(completed):
+            response = client.get(
+                "/api/chores/", params={"completed": completed}, headers=auth_headers
+            )
+            return {c["id"] for c in response.json()}
+
+        assert listed("true") == {done["id"], one_off["id"]}
+        assert listed("false") == {pending["id"], todo["id"]}
+
+    def test_keyset_pagination(self, client, auth_headers, family):
+        """Pages follow (week_start, id) order and end without a cursor."""
+        created = [
+            make_chore(client, auth_headers, family["id"], week_start=f"2024-01-0{d}")
+            for d in (3, 1, 2, 1, 3)
+        ]
+        expected = [
+            c["id"] for c in sorted(created, key=lambda c: (c["week_start"], c["id"]))
+        ]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/chores/", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            seen.extend(c["id"] for c in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert seen == expected
+
+    def test_invalid_cursor(self, client, auth_headers, family):
+        """A malformed cursor is rejected with 400."""
+        response = client.get(
+            "/api/chores/", params={"cursor": "not-a-cursor"}, headers=auth_headers
+        )
+        assert response.status_code == 400
+
+
+class TestBatchCompletion:
+    """Tests for completing many chores in one request."""
+
+    def test_batch_applies_rules_per_item(self, client, auth_headers, family):
+        """Each item follows the single-completion rules and reports its outcome."""
+        child = client.post(
+            "/api/users/",
+            json={"name": "Kid", "role": "child", "family_id": family["id"]},
+            headers=auth_headers,
+        ).json()
+        recurring = make_chore(
+            client, auth_headers, family["id"], is_recurring=True, point_value=3
+        )
+        group = make_chore(client, auth_headers, family["id"], point_value=5)
+
+        response = client.post(
+            "/api/chores/complete-batch",
+            json={
+                "items": [
+                    {"chore_id": recurring["id"], "user_id": child["id"]},
+                    {"chore_id": recurring["id"], "user_id": child["id"]},
+                    {"chore_id": group["id"], "user_id": child["id"]},
+                    {"chore_id": 999999},
+                ]
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        results = response.json()
+        assert [r["status_code"] for r in results] == [200, 400, 200, 404]
+        assert results[0]["chore"]["id"] == recurring["id"]
+        assert results[2]["chore"]["completed"] is True
+
+        points = client.get("/api/points/", headers=auth_headers).json()
+        assert sorted(p["points"] for p in points if p["user_id"] == child["id"]) == [
+            3,
+            5,
+        ]
+
+    def test_batch_reports_each_item_of_a_repeated_chore(
+        self, client, auth_headers, family
+    ):
+        """A chore toggled twice in one batch reports both states in order."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        chore = make_chore(
+            client,
+            auth_headers,
+            family["id"],
+            assigned_to_ids=str(me["id"]),
+            is_group_chore=False,
+        )
+        item = {"chore_id": chore["id"]}
+        response = client.post(
+            "/api/chores/complete-batch",
+            json={"items": [item, item]},
+            headers=auth_headers,
+        )
+        results = response.json()
+        assert [r["chore"]["completed"] for r in results] == [True, False]
+        assert [r["chore"]["completed_by_ids"] for r in results] == [
+            str(me["id"]),
+            None,
+        ]
+
+    def test_batch_rejects_users_outside_family(self, client, auth_headers, family):
+        """Completions cannot be recorded for users in another family."""
+        chore = make_chore(client, auth_headers, family["id"], is_recurring=True)
+        response = client.post(
+            "/api/chores/complete-batch",
+            json={"items": [{"chore_id": chore["id"], "user_id": 999999}]},
+            headers=auth_headers,
+        )
+        assert response.json()[0]["status_code"] == 403
+
+
+class TestConcurrentCompletion:
+    """Stress tests for the contention-safe recurring completion path."""
+
+    def test_parallel_completions_respect_daily_limit(self, session_factory):
+        """Many threads completing at once never exceed recurrence_count."""
+        setup = session_factory()
+        family_row = FamilyGroup(name="Race Family", admin_password_hash="x")
+        setup.add(family_row)
+        setup.flush()
+        user = User(
+            family_id=family_row.id, name="Racer", password_hash="x", role="child"
+        )
+        chore = Chore(
+            family_id=family_row.id,
+            title="Brush teeth",
+            point_value=1,
+            week_start=date.today(),
+            is_recurring=True,
+            recurrence_count=3,
+            max_completions=10,
+        )
+        setup.add_all([user, chore])
+        setup.commit()
+        chore_id, user_id, family_id = chore.id, user.id, family_row.id
+        setup.close()
+
+        threads_count = 8
+        barrier = threading.Barrier(threads_count)
+        outcomes = []
+
+        def worker():
+            db = session_factory()
+            try:
+                row = db.get(Chore, chore_id)
+                barrier.wait()
+                batch = CompletionBatch(db, [row])
+                batch.complete(row, user_id)
+                batch.flush()
+                db.commit()
+                outcomes.append(200)
+            except HTTPException as exc:
+                db.rollback()
+                outcomes.append(exc.status_code)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        check = session_factory()
+        try:
+            assert sorted(outcomes) == [200] * 3 + [400] * 5
+            assert (
+                check.query(Point)
+                .filter(Point.chore_id == chore_id, Point.is_completion())
+                .count()
+                == 3
+            )
+            assert check.get(Chore, chore_id).completion_count == 3
+            assert check.get(ChoreDailyCount, (chore_id, utc_today())).count == 3
+        finally:
+            check.query(Point).filter(Point.chore_id == chore_id).delete()
+            check.query(UserPointTotal).filter(
+                UserPointTotal.user_id == user_id
+            ).delete()
+            check.query(DailyPointRollup).filter(
+                DailyPointRollup.user_id == user_id
+            ).delete()
+            check.query(ChoreDailyCount).filter(
+                ChoreDailyCount.chore_id == chore_id
+            ).delete()
+            check.query(Chore).filter(Chore.id == chore_id).delete()
+            check.query(User).filter(User.id == user_id).delete()
+            check.query(FamilyGroup).filter(FamilyGroup.id == family_id).delete()
+            check.commit()
+            check.close()
@@ -0,0 +1,63 @@
+"""
+Tests for the database session configuration.
+"""
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app.db.session import Base, RoutingSession, create_sqlite_engine
+from app.models.models import FamilyGroup
+
+
+@pytest.fixture
+def wal_engines(tmp_path):
+    """A writer and a reader engine on a throwaway WAL database file."""
+    url = f"sqlite:///{tmp_path / 'wal.db'}"
+    writer = create_sqlite_engine(url, pool_size=1)
+    Base.metadata.create_all(bind=writer)
+    reader = create_sqlite_engine(url, pool_size=2, read_only=True)
+    yield writer, reader
+    reader.dispose()
+    writer.dispose()
+
+
+class TestSqliteWalMode:
+    """Tests for SQLite WAL mode with a reader pool."""
+
+    def test_pragmas(self, wal_engines):
+        """The writer runs in WAL mode and readers refuse to write."""
+        writer, reader = wal_engines
+        with writer.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        with reader.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+            with pytest.raises(OperationalError):
+                conn.execute(
+                    text(
+                        "INSERT INTO family_groups (name, admin_password_hash) "
+                        "VALUES ('x', 'x')"
+                    )
+                )
+
+    def test_reads_use_readers_until_the_transaction_writes(self, wal_engines):
+        """Selects go to a reader; after a write the transaction stays on the writer."""
+        writer, reader = wal_engines
+        session = RoutingSession(writer=writer, reader=reader)
+        try:
+            query = select(FamilyGroup.name)
+            assert session.get_bind(clause=query) is reader
+
+            session.add(FamilyGroup(name="Fam", admin_password_hash="x"))
+            session.flush()
+            # The uncommitted row is only visible on the writer
+            assert session.get_bind(clause=query) is writer
+            assert session.execute(query).scalars().all() == ["Fam"]
+
+            session.commit()
+            assert session.get_bind(clause=query) is reader
+            assert session.execute(query).scalars().all() == ["Fam"]
+        finally:
+            session.close()
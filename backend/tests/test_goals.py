@@ -0,0 +1,55 @@
+"""
+Tests for goal endpoints.
+"""
+
+from datetime import date, timedelta
+
+from app.models.models import Goal
+from app.services.chore_status import utc_today
+from app.services.goal_progress import project_completion
+
+
+class TestGoalProgress:
+    """Tests for bulk goal progress."""
+
+    def test_progress_for_every_goal_and_member(
+        self, client, auth_headers, family, db_session, count_queries
+    ):
+        """Each goal reports each member's progress from their point totals."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        db_session.add_all(
+            [
+                Goal(family_id=family["id"], name="Movie night", point_requirement=20),
+                Goal(family_id=family["id"], name="Be kind"),
+            ]
+        )
+        db_session.flush()
+        client.post(
+            "/api/points/",
+            json={"user_id": me["id"], "points": 7},
+            headers=auth_headers,
+        )
+
+        with count_queries() as counter:
+            response = client.get("/api/goals/progress", headers=auth_headers)
+        assert response.status_code == 200
+        movie, kind = response.json()
+
+        mine = movie["members"][0]
+        assert (mine["points"], mine["remaining"], mine["percent"]) == (7, 13, 35.0)
+        assert mine["achieved"] is False
+        # 7 points over the last 28 days is 0.25 a day -> 52 more days
+        assert (
+            mine["projected_completion_date"]
+            == (utc_today() + timedelta(days=52)).isoformat()
+        )
+        assert kind["members"][0]["remaining"] is None
+        # goals, member totals; the current user comes from the principal cache
+        assert counter.count == 2
+
+    def test_project_completion(self):
+        """Reached goals complete today; members with no recent points never do."""
+        today = date(2024, 1, 1)
+        assert project_completion(0, 0, today) == today
+        assert project_completion(10, 0, today) is None
+        assert project_completion(10, 28, today) == date(2024, 1, 11)
@@ -0,0 +1,383 @@
+"""
+Tests for points and leaderboard endpoints.
+"""
+
+import csv
+import io
+from datetime import date, datetime, timedelta
+
+from app.models.models import Chore, DailyPointRollup, User, UserPointTotal
+from app.services.leaderboard import resolve_window
+from app.services.point_totals import (
+    rebuild_point_rollups,
+    rebuild_point_totals,
+    record_points,
+)
+
+
+def add_member(db_session, family_id, name):
+    """Add a family member directly and return it."""
+    user = User(family_id=family_id, name=name, password_hash="x", role="child")
+    db_session.add(user)
+    db_session.flush()
+    return user
+
+
+def award(db_session, user, chore, count, start=datetime(2024, 1, 1, 8, 0)):
+    """Record count completions of a chore for a user, one minute apart."""
+    record_points(
+        db_session,
+        [
+            {
+                "user_id": user.id,
+                "chore_id": chore.id,
+                "points": chore.point_value,
+                "awarded_at": start + timedelta(minutes=i),
+            }
+            for i in range(count)
+        ],
+    )
+
+
+class TestLeaderboard:
+    """Tests for the family leaderboard."""
+
+    def test_recent_history_is_bounded(self, client, auth_headers, family, db_session):
+        """Totals cover all points while completed_chores honors recent_limit."""
+        chore = Chore(
+            family_id=family["id"],
+            title="Dishes",
+            point_value=3,
+            week_start=date(2024, 1, 1),
+        )
+        db_session.add(chore)
+        kid = add_member(db_session, family["id"], "Kid")
+        award(db_session, kid, chore, 5)
+
+        response = client.get(
+            "/api/points/leaderboard",
+            params={"recent_limit": 2},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        top = response.json()[0]
+        assert top["user_id"] == kid.id
+        assert top["total_points"] == 15
+        assert top["completed_count"] == 5
+        assert [c["awarded_at"] for c in top["completed_chores"]] == [
+            "2024-01-01T08:04:00",
+            "2024-01-01T08:03:00",
+        ]
+
+    def test_query_count_is_constant(
+        self, client, auth_headers, family, db_session, count_queries
+    ):
+        """The leaderboard issues the same statements for 1 or 6 members."""
+        chore = Chore(
+            family_id=family["id"], title="Bins", point_value=1, week_start=date.today()
+        )
+        db_session.add(chore)
+        db_session.flush()
+        client.get("/api/auth/me", headers=auth_headers)  # warm the principal cache
+        with count_queries() as few:
+            client.get("/api/points/leaderboard", headers=auth_headers)
+
+        for i in range(5):
+            award(
+                db_session, add_member(db_session, family["id"], f"Kid {i}"), chore, 3
+            )
+        with count_queries() as many:
+            response = client.get("/api/points/leaderboard", headers=auth_headers)
+
+        assert len(response.json()) == 6
+        assert many.count == few.count
+
+
+class TestPointTotals:
+    """Tests for the incrementally maintained user_point_totals."""
+
+    def test_totals_follow_awards_and_revokes(
+        self, client, auth_headers, family, db_session
+    ):
+        """Manual points and group chore toggles keep the totals in step."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        client.post(
+            "/api/points/",
+            json={"user_id": me["id"], "points": 4},
+            headers=auth_headers,
+        )
+        chore = client.post(
+            "/api/chores/",
+            json={
+                "family_id": family["id"],
+                "title": "Laundry",
+                "point_value": 3,
+                "week_start": date.today().isoformat(),
+            },
+            headers=auth_headers,
+        ).json()
+
+        client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+        totals = db_session.get(UserPointTotal, me["id"])
+        db_session.refresh(totals)
+        assert (totals.total_points, totals.completed_count) == (7, 1)
+
+        client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+        db_session.refresh(totals)
+        assert (totals.total_points, totals.completed_count) == (4, 0)
+
+    def test_rebuild_repairs_drift(self, client, auth_headers, family, db_session):
+        """Reconciliation restores drifted and missing totals from the ledger."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        client.post(
+            "/api/points/",
+            json={"user_id": me["id"], "points": 5},
+            headers=auth_headers,
+        )
+        totals = db_session.get(UserPointTotal, me["id"])
+        totals.total_points = 99
+        db_session.flush()
+
+        assert rebuild_point_totals(db_session) == {
+            "missing_users": 0,
+            "drifted_users": 1,
+        }
+        db_session.refresh(totals)
+        assert totals.total_points == 5
+
+    def test_deleting_a_completed_chore(self, client, auth_headers, family, db_session):
+        """Points outlive a deleted chore but stop counting as completions."""
+        me = client.get("/api/auth/me", headers=auth_headers).json()
+        chore = client.post(
+            "/api/chores/",
+            json={
+                "family_id": family["id"],
+                "title": "Dishes",
+                "point_value": 3,
+                "week_start": date.today().isoformat(),
+                "is_recurring": True,
+            },
+            headers=auth_headers,
+        ).json()
+        client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+
+        response = client.delete(f"/api/chores/{chore['id']}", headers=auth_headers)
+        assert response.status_code == 200
+
+        db_session.expire_all()
+        totals = db_session.get(UserPointTotal, me["id"])
+        assert (totals.total_points, totals.completed_count) == (3, 0)
+        rollup = db_session.query(DailyPointRollup).filter_by(user_id=me["id"]).one()
+        assert (rollup.points, rollup.completions) == (3, 0)
+        assert rebuild_point_totals(db_session) == {
+            "missing_users": 0,
+            "drifted_users": 0,
+        }
+
+
+class TestWindowedLeaderboard:
+    """Tests for week, month and custom leaderboards from daily rollups."""
+
+    def test_custom_window_sums_rollups(self, client, auth_headers, family, db_session):
+        """Only points awarded inside the window count."""
+        chore = Chore(
+            family_id=family["id"],
+            title="Mow",
+            point_value=5,
+            week_start=date(2024, 1, 1),
+        )
+        db_session.add(chore)
+        kid = add_member(db_session, family["id"], "Kid")
+        award(db_session, kid, chore, 2, start=datetime(2024, 1, 2, 9, 0))
+        award(db_session, kid, chore, 3, start=datetime(2024, 2, 2, 9, 0))
+
+        response = client.get(
+            "/api/points/leaderboard",
+            params={"window": "custom", "start": "2024-01-01", "end": "2024-01-31"},
+            headers=auth_headers,
+        )
+        top = response.json()[0]
+        assert (top["total_points"], top["completed_count"]) == (10, 2)
+        assert len(top["completed_chores"]) == 2
+
+    def test_custom_window_requires_range(self, client, auth_headers, family):
+        """A custom window without start and end is rejected."""
+        response = client.get(
+            "/api/points/leaderboard",
+            params={"window": "custom"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
+    def test_resolve_window(self):
+        """Weeks run Sunday to Saturday and months cover the calendar month."""
+        today = date(2024, 2, 14)  # a Wednesday
+        assert resolve_window("week", today=today) == (
+            date(2024, 2, 11),
+            date(2024, 2, 17),
+        )
+        assert resolve_window("month", today=today) == (
+            date(2024, 2, 1),
+            date(2024, 2, 29),
+        )
+        assert resolve_window("all", today=today) is None
+
+    def test_backfill_matches_incremental(
+        self, client, auth_headers, family, db_session
+    ):
+        """Rebuilding the rollups reproduces what was maintained on write."""
+        chore = Chore(
+            family_id=family["id"],
+            title="Sweep",
+            point_value=2,
+            week_start=date.today(),
+        )
+        db_session.add(chore)
+        kid = add_member(db_session, family["id"], "Kid")
+        award(db_session, kid, chore, 3, start=datetime(2024, 3, 1, 23, 58))
+
+        def snapshot():
+            return sorted(
+                (r.day, r.points, r.completions)
+                for r in db_session.query(DailyPointRollup).filter_by(user_id=kid.id)
+            )
+
+        incremental = snapshot()
+        rebuild_point_rollups(db_session)
+        db_session.expire_all()
+        assert (
+            snapshot()
+            == incremental
+            == [
+                (date(2024, 3, 1), 4, 2),
+                (date(2024, 3, 2), 2, 1),
+            ]
+        )
+
+
+class TestPointsLedger:
+    """Tests for the points list and aggregate queries."""
+
+    def test_list_pages_with_cursor(self, client, auth_headers, family, db_session):
+        """The list is scoped by a family join and pages on id."""
+        kid = add_member(db_session, family["id"], "Kid")
+        record_points(
+            db_session,
+            [{"user_id": kid.id, "points": p, "chore_id": None} for p in (1, 2, 3)],
+        )
+
+        first = client.get("/api/points/", params={"limit": 2}, headers=auth_headers)
+        second = client.get(
+            "/api/points/",
+            params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+            headers=auth_headers,
+        )
+        assert [p["points"] for p in first.json() + second.json()] == [1, 2, 3]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_aggregate_groups(self, client, auth_headers, family, db_session):
+        """Points are summed per day, Sunday-based week, user and chore."""
+        chore = Chore(
+            family_id=family["id"], title="Rake", point_value=2, week_start=date.today()
+        )
+        db_session.add(chore)
+        kid = add_member(db_session, family["id"], "Kid")
+        award(db_session, kid, chore, 2, start=datetime(2024, 1, 6, 9, 0))  # Saturday
+        award(db_session, kid, chore, 1, start=datetime(2024, 1, 7, 9, 0))  # Sunday
+
+        def aggregate(group_by, **params):
+            response = client.get(
+                "/api/points/aggregate",
+                params={"group_by": group_by, **params},
+                headers=auth_headers,
+            )
+            assert response.status_code == 200
+            return [
+                (r["day"] or r["name"], r["points"], r["entries"])
+                for r in response.json()
+            ]
+
+        assert aggregate("day") == [("2024-01-06", 4, 2), ("2024-01-07", 2, 1)]
+        assert aggregate("week") == [("2023-12-31", 4, 2), ("2024-01-07", 2, 1)]
+        assert aggregate("user") == [("Kid", 6, 3)]
+        assert aggregate("chore", **{"from": "2024-01-07", "to": "2024-01-07"}) == [
+            ("Rake", 2, 1)
+        ]
+
+
+class TestExport:
+    """Tests for the streaming CSV export."""
+
+    def test_points_csv_with_range(self, client, auth_headers, family, db_session):
+        """Rows inside the date range are exported with a header line."""
+        chore = Chore(
+            family_id=family["id"], title="Dust", point_value=1, week_start=date.today()
+        )
+        db_session.add(chore)
+        kid = add_member(db_session, family["id"], "Kid")
+        award(db_session, kid, chore, 1, start=datetime(2024, 1, 1, 9, 0))
+        award(db_session, kid, chore, 2, start=datetime(2024, 2, 1, 9, 0))
+
+        response = client.get(
+            "/api/points/export",
+            params={"from": "2024-02-01", "to": "2024-02-29"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [(r["user_name"], r["chore_title"], r["points"]) for r in rows] == [
+            ("Kid", "Dust", "1"),
+            ("Kid", "Dust", "1"),
+        ]
+
+    def test_completions_csv(self, client, auth_headers, family):
+        """The completions ledger exports recurring chore history."""
+        chore = client.post(
+            "/api/chores/",
+            json={
+                "family_id": family["id"],
+                "title": "=Water plants",
+                "point_value": 2,
+                "week_start": date.today().isoformat(),
+                "is_recurring": True,
+            },
+            headers=auth_headers,
+        ).json()
+        client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+
+        response = client.get(
+            "/api/points/export",
+            params={"ledger": "completions"},
+            headers=auth_headers,
+        )
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [(r["chore_title"], r["points_awarded"]) for r in rows] == [
+            ("'=Water plants", "2")
+        ]
+
+    def test_csv_escapes_tab_and_carriage_return(self, client, auth_headers, family):
+        """Cells starting with a tab or carriage return are neutralized too."""
+        for title in ("\t=1+1", "\r=1+1"):
+            client.post(
+                "/api/chores/",
+                json={
+                    "family_id": family["id"],
+                    "title": title,
+                    "point_value": 1,
+                    "week_start": date.today().isoformat(),
+                    "is_recurring": True,
+                },
+                headers=auth_headers,
+            )
+        chores = client.get("/api/chores/", headers=auth_headers).json()
+        for chore in chores:
+            client.post(f"/api/chores/{chore['id']}/complete", headers=auth_headers)
+
+        response = client.get(
+            "/api/points/export",
+            params={"ledger": "completions"},
+            headers=auth_headers,
+        )
+        rows = list(csv.DictReader(io.StringIO(response.text, newline="")))
+        assert sorted(r["chore_title"] for r in rows) == ["'\t=1+1", "'\r=1+1"]
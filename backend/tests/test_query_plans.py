@@ -0,0 +1,183 @@
+"""
+Query-plan regression tests for the hot paths.
+
+Drives the routes the app hits constantly, records every SELECT, UPDATE and
+DELETE they send, and runs EXPLAIN on each one. A full scan of a real table
+fails the test, so a dropped index or a query that stops using one shows up
+here rather than in production latency.
+
+The PostgreSQL variant needs a scratch database; set ``TEST_POSTGRES_URL``
+to run it.
+"""
+
+import json
+import os
+import re
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base, get_db
+from app.main import app
+from tests.conftest import test_engine
+
+TABLES = set(Base.metadata.tables)
+_ALIAS = re.compile(r"\b(\w+) AS (\w+)\b")
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def drive_hot_paths(client, engine) -> list:
+    """Exercise the hot routes and return the (statement, params) they sent."""
+    user = {
+        "name": "Plan User",
+        "email": "plans@example.com",
+        "password": "testpassword123",
+        "role": "parent",
+    }
+    token = client.post("/api/auth/signup", json=user).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    family = client.post(
+        "/api/families/",
+        json={"name": "Plan Family", "admin_password": "adminpassword123"},
+        headers=headers,
+    ).json()
+    me = client.get("/api/auth/me", headers=headers).json()
+    client.post(
+        "/api/goals/",
+        json={"name": "Zoo", "family_id": family["id"], "point_requirement": 5},
+        headers=headers,
+    )
+    chore = client.post(
+        "/api/chores/",
+        json={
+            "family_id": family["id"],
+            "title": "Feed the dog",
+            "point_value": 2,
+            "week_start": date.today().isoformat(),
+            "assigned_to_ids": str(me["id"]),
+            "is_group_chore": False,
+        },
+        headers=headers,
+    ).json()
+
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip()[:6].upper()
+        if verb in ("SELECT", "UPDATE", "DELETE") and not executemany:
+            captured.append((statement, parameters))
+
+    requests = [
+        (
+            "GET",
+            "/api/calendars/",
+            {"family_id": family["id"], "week_start": f"{date.today()}T00:00:00"},
+        ),
+        ("GET", "/api/chores/", {}),
+        ("GET", "/api/users/", {}),
+        ("GET", "/api/points/", {}),
+        ("GET", "/api/points/leaderboard", {}),
+        ("GET", "/api/points/leaderboard", {"window": "week"}),
+        ("GET", "/api/points/aggregate", {"group_by": "day"}),
+        ("GET", "/api/goals/", {}),
+        ("GET", "/api/goals/progress", {}),
+        # Completing and then uncompleting revokes by (chore_id, user_id)
+        ("POST", f"/api/chores/{chore['id']}/complete", {}),
+        ("POST", f"/api/chores/{chore['id']}/complete", {}),
+    ]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for method, url, params in requests:
+            response = client.request(method, url, params=params, headers=headers)
+            assert response.status_code == 200, (url, response.text)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert captured
+    return captured
+
+
+def scanned_names(statement: str) -> set:
+    """Real tables in a statement, under their own names and any aliases."""
+    aliases = {alias for table, alias in _ALIAS.findall(statement) if table in TABLES}
+    return TABLES | aliases
+
+
+def sqlite_full_scans(conn, statement, params) -> list:
+    names = scanned_names(statement)
+    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).all()
+    return [
+        row[-1]
+        for row in plan
+        if (match := _SQLITE_SCAN.match(row[-1])) and match.group(1) in names
+    ]
+
+
+def postgres_full_scans(conn, statement, params) -> list:
+    # Tiny test tables are cheaper to scan, so make the planner prefer any
+    # usable index; a Seq Scan left over means there is none
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, params)
+    plan = plan.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans, nodes = [], [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan" and node["Relation Name"] in TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def assert_no_full_scans(captured, explain, conn) -> None:
+    failures = [
+        f"{' '.join(statement.split())}\n    -> {', '.join(scans)}"
+        for statement, params in captured
+        if (scans := explain(conn, statement, params))
+    ]
+    assert not failures, "Full table scans:\n" + "\n".join(failures)
+
+
+@pytest.fixture
+def postgres_client():
+    """A test client bound to a transaction on ``TEST_POSTGRES_URL``."""
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(autoflush=False)(bind=connection)
+
+    def override_get_db_fixture():
+        yield session
+
+    app.dependency_overrides[get_db] = override_get_db_fixture
+    with TestClient(app) as test_client:
+        yield test_client, engine, connection
+    app.dependency_overrides.clear()
+
+    session.close()
+    transaction.rollback()
+    connection.close()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+class TestQueryPlans:
+    """Tests that the hot-path queries are served by indexes."""
+
+    def test_sqlite_plans_use_indexes(self, client, db_session):
+        """No hot-path statement scans a whole table on SQLite."""
+        captured = drive_hot_paths(client, test_engine)
+        assert_no_full_scans(captured, sqlite_full_scans, db_session.connection())
+
+    def test_postgres_plans_use_indexes(self, postgres_client):
+        """No hot-path statement needs a sequential scan on PostgreSQL."""
+        client, engine, connection = postgres_client
+        captured = drive_hot_paths(client, engine)
+        assert_no_full_scans(captured, postgres_full_scans, connection)
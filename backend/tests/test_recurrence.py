@@ -0,0 +1,90 @@
+"""
+Tests for the chore recurrence engine.
+"""
+
+from datetime import date
+
+from app.models.models import Chore
+from app.services.recurrence import compile_rule
+
+
+def make_rule(**fields):
+    chore = Chore(id=1, week_start=date(2024, 1, 1), is_recurring=True, **fields)
+    return compile_rule(chore)
+
+
+def days(rule, start, end):
+    return [occ.day for occ in rule.occurrences(start, end)]
+
+
+def test_one_off_chore_occurs_on_its_date():
+    chore = Chore(id=1, week_start=date(2024, 1, 3), is_recurring=False)
+    rule = compile_rule(chore)
+    assert days(rule, date(2024, 1, 1), date(2024, 1, 31)) == [date(2024, 1, 3)]
+    assert days(rule, date(2024, 1, 4), date(2024, 1, 31)) == []
+
+
+def test_daily_interval_is_aligned_to_anchor():
+    rule = make_rule(recurrence_type="daily", recurrence_interval=3)
+    assert days(rule, date(2024, 1, 2), date(2024, 1, 10)) == [
+        date(2024, 1, 4),
+        date(2024, 1, 7),
+        date(2024, 1, 10),
+    ]
+
+
+def test_weekly_uses_sunday_based_days_and_interval():
+    # 2024-01-01 is a Monday; "1,3" means Monday and Wednesday
+    rule = make_rule(
+        recurrence_type="weekly", recurrence_interval=2, recurrence_days="1,3"
+    )
+    assert days(rule, date(2024, 1, 1), date(2024, 1, 21)) == [
+        date(2024, 1, 1),
+        date(2024, 1, 3),
+        date(2024, 1, 15),
+        date(2024, 1, 17),
+    ]
+
+
+def test_weekly_defaults_to_anchor_weekday():
+    rule = make_rule(recurrence_type="weekly")
+    assert days(rule, date(2024, 1, 2), date(2024, 1, 15)) == [
+        date(2024, 1, 8),
+        date(2024, 1, 15),
+    ]
+
+
+def test_monthly_skips_months_without_the_day():
+    chore = Chore(
+        id=2,
+        week_start=date(2024, 1, 31),
+        is_recurring=True,
+        recurrence_type="monthly",
+    )
+    rule = compile_rule(chore)
+    assert days(rule, date(2024, 1, 1), date(2024, 5, 31)) == [
+        date(2024, 1, 31),
+        date(2024, 3, 31),
+        date(2024, 5, 31),
+    ]
+
+
+def test_end_date_and_slots():
+    rule = make_rule(
+        recurrence_type="daily",
+        recurrence_count=2,
+        recurrence_end_date=date(2024, 1, 2),
+    )
+    occurrences = list(rule.occurrences(date(2024, 1, 1), date(2024, 1, 31)))
+    assert [o.day for o in occurrences] == [date(2024, 1, 1), date(2024, 1, 2)]
+    assert {o.slots for o in occurrences} == {2}
+
+
+def test_rules_are_cached_per_version():
+    chore = Chore(id=3, week_start=date(2024, 1, 1), is_recurring=True)
+    chore.recurrence_type = "daily"
+    first = compile_rule(chore)
+    assert compile_rule(chore) is first
+
+    chore.recurrence_interval = 2
+    assert compile_rule(chore) is not first
@@ -0,0 +1,108 @@
+"""
+Tests for user endpoints.
+"""
+
+from app.models.models import User
+from app.services.passwords import UNUSABLE_PASSWORD, password_hasher
+
+
+class TestBulkCreate:
+    """Tests for bulk family member import."""
+
+    def test_creates_parents_and_children(
+        self, client, auth_headers, family, db_session
+    ):
+        """Parents get real hashes and can log in; children get no usable password."""
+        response = client.post(
+            "/api/users/bulk",
+            json={
+                "users": [
+                    {
+                        "name": "Co-parent",
+                        "email": "coparent@example.com",
+                        "password": "secret-password",
+                        "role": "parent",
+                    },
+                    {"name": "Kid 1", "role": "child", "icon_emoji": "🦊"},
+                    {"name": "Kid 2", "role": "child"},
+                ]
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        created = response.json()
+        assert [u["name"] for u in created] == ["Co-parent", "Kid 1", "Kid 2"]
+        assert {u["family_id"] for u in created} == {family["id"]}
+        assert created[1]["icon_emoji"] == "🦊"
+
+        kid = db_session.get(User, created[1]["id"])
+        assert kid.password_hash == UNUSABLE_PASSWORD
+        assert not password_hasher.verify("", kid.password_hash)
+
+        login = client.post(
+            "/api/auth/login",
+            json={"email": "coparent@example.com", "password": "secret-password"},
+        )
+        assert login.status_code == 200
+
+    def test_existing_email_checked_in_one_query(
+        self, client, auth_headers, family, count_queries
+    ):
+        """Taken emails are found with one query and nothing is created."""
+        users = [
+            {
+                "name": f"Parent {i}",
+                "email": f"parent{i}@example.com",
+                "password": "secret-password",
+                "role": "parent",
+            }
+            for i in range(5)
+        ]
+        users.append(
+            {
+                "name": "Again",
+                "email": "test@example.com",
+                "password": "secret-password",
+                "role": "parent",
+            }
+        )
+        with count_queries() as counter:
+            response = client.post(
+                "/api/users/bulk", json={"users": users}, headers=auth_headers
+            )
+
+        assert response.status_code == 400
+        assert "test@example.com" in response.json()["detail"]
+        email_checks = [s for s in counter.statements if "users.email IN" in s]
+        assert len(email_checks) == 1
+        assert not any(s.startswith("INSERT") for s in counter.statements)
+
+    def test_rejects_duplicate_emails_and_missing_passwords(
+        self, client, auth_headers, family
+    ):
+        """Emails repeated in the request and parents without passwords fail."""
+        parent = {"name": "P", "email": "p@example.com", "password": "x" * 8}
+        duplicate = client.post(
+            "/api/users/bulk",
+            json={"users": [{**parent, "role": "parent"}] * 2},
+            headers=auth_headers,
+        )
+        assert duplicate.status_code == 400
+
+        no_password = client.post(
+            "/api/users/bulk",
+            json={"users": [{"name": "P", "email": "p@example.com", "role": "parent"}]},
+            headers=auth_headers,
+        )
+        assert no_password.status_code == 400
+
+    def test_child_gets_unusable_password(
+        self, client, auth_headers, family, db_session
+    ):
+        """Single member creation skips hashing for children too."""
+        response = client.post(
+            "/api/users/", json={"name": "Kid", "role": "child"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        kid = db_session.get(User, response.json()["id"])
+        assert kid.password_hash == UNUSABLE_PASSWORD
@@ -118,7 +118,7 @@ function LeaderboardPageContent() {
                     <div className="border-t-2 border-border bg-muted/30">
                       <div className="p-4">
                         <h3 className="font-semibold mb-3 text-sm text-muted-foreground uppercase tracking-wide">
-                          Completed Chores ({entry.completed_chores.length})
+                          Completed Chores ({entry.completed_count})
                         </h3>
                         <div className="space-y-2">
                           {entry.completed_chores.map((chore) => (
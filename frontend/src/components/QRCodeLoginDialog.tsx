@@ -29,7 +29,14 @@ export function QRCodeLoginDialog({ open, onOpenChange }: QRCodeLoginDialogProps
   const [qrCodeUrl, setQrCodeUrl] = useState<string | null>(null);
   const [status, setStatus] = useState<"loading" | "pending" | "scanned" | "expired" | "error">("loading");
   const [error, setError] = useState<string | null>(null);
-  const pollingIntervalRef = useRef<NodeJS.Timeout | null>(null);
+  const pollingRef = useRef<{ active: boolean } | null>(null);
+
+  const stopPolling = useCallback(() => {
+    if (pollingRef.current) {
+      pollingRef.current.active = false;
+      pollingRef.current = null;
+    }
+  }, []);
 
   const generateSession = useCallback(async () => {
     try {
@@ -46,46 +53,43 @@ export function QRCodeLoginDialog({ open, onOpenChange }: QRCodeLoginDialogProps
   }, []);
 
   const startPolling = useCallback(() => {
-    if (pollingIntervalRef.current) {
-      clearInterval(pollingIntervalRef.current);
-    }
-
-    pollingIntervalRef.current = setInterval(async () => {
-      if (!sessionToken) return;
-
-      try {
-        const response = await checkQRCodeStatus(sessionToken);
-        
-        if (response.status === "scanned" && response.access_token) {
-          // QR code was scanned, log in the user
-          if (pollingIntervalRef.current) {
-            clearInterval(pollingIntervalRef.current);
-            pollingIntervalRef.current = null;
-          }
-          
-          // Store token
-          localStorage.setItem("auth_token", response.access_token);
-          setStatus("scanned");
-          
-          // Redirect to dashboard after a brief delay
-          setTimeout(() => {
-            onOpenChange(false);
-            // Force a full page reload to refresh auth state
-            window.location.href = "/dashboard";
-          }, 1000);
-        } else if (response.status === "expired") {
-          setStatus("expired");
-          if (pollingIntervalRef.current) {
-            clearInterval(pollingIntervalRef.current);
-            pollingIntervalRef.current = null;
+    stopPolling();
+    const poll = { active: true };
+    pollingRef.current = poll;
+
+    (async () => {
+      // Each request waits on the server until the code is scanned or times out
+      while (poll.active && sessionToken) {
+        try {
+          const response = await checkQRCodeStatus(sessionToken);
+          if (!poll.active) return;
+
+          if (response.status === "scanned" && response.access_token) {
+            // QR code was scanned, log in the user
+            poll.active = false;
+
+            // Store token
+            localStorage.setItem("auth_token", response.access_token);
+            setStatus("scanned");
+
+            // Redirect to dashboard after a brief delay
+            setTimeout(() => {
+              onOpenChange(false);
+              // Force a full page reload to refresh auth state
+              window.location.href = "/dashboard";
+            }, 1000);
+          } else if (response.status === "expired") {
+            poll.active = false;
+            setStatus("expired");
           }
+        } catch (err) {
+          console.error("Error checking QR code status:", err);
+          // Back off briefly, then keep waiting
+          await new Promise((resolve) => setTimeout(resolve, 2000));
         }
-      } catch (err) {
-        console.error("Error checking QR code status:", err);
-        // Continue polling on error
       }
-    }, 2000); // Poll every 2 seconds
-  }, [sessionToken, onOpenChange]);
+    })();
+  }, [sessionToken, onOpenChange, stopPolling]);
 
   // Generate QR code session when dialog opens
   useEffect(() => {
@@ -93,28 +97,21 @@ export function QRCodeLoginDialog({ open, onOpenChange }: QRCodeLoginDialogProps
       generateSession();
     } else {
       // Clean up when dialog closes
-      if (pollingIntervalRef.current) {
-        clearInterval(pollingIntervalRef.current);
-        pollingIntervalRef.current = null;
-      }
+      stopPolling();
       setSessionToken(null);
       setQrCodeUrl(null);
       setStatus("loading");
       setError(null);
     }
-  }, [open, generateSession]);
+  }, [open, generateSession, stopPolling]);
 
   // Poll for status when session token is available
   useEffect(() => {
     if (sessionToken && status === "pending") {
       startPolling();
     }
-    return () => {
-      if (pollingIntervalRef.current) {
-        clearInterval(pollingIntervalRef.current);
-      }
-    };
-  }, [sessionToken, status, startPolling]);
+    return stopPolling;
+  }, [sessionToken, status, startPolling, stopPolling]);
 
   const handleRetry = () => {
     generateSession();
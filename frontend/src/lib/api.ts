@@ -95,8 +95,9 @@ export async function generateQRCodeSession(): Promise<{ session_token: string;
   return response.json();
 }
 
+// Long-poll: resolves as soon as the code is scanned, or "pending" after the server's timeout
 export async function checkQRCodeStatus(sessionToken: string): Promise<{ status: "pending" | "scanned" | "expired"; access_token?: string }> {
-  const response = await apiFetch(`/auth/qr-code/status/${sessionToken}`, {
+  const response = await apiFetch(`/auth/qr-code/wait/${sessionToken}`, {
     method: "GET",
   });
   
@@ -182,5 +182,6 @@ export type LeaderboardEntry = {
   name: string;
   icon_emoji?: string | null;
   total_points: number;
-  completed_chores: CompletedChore[];
+  completed_count: number; // all-time chore completions
+  completed_chores: CompletedChore[]; // most recent only
 };